@@ -4,6 +4,8 @@ import argparse
 import os
 import shutil
 import sys
+import time
+import zipfile
 from pathlib import Path
 
 import nox
@@ -111,6 +113,105 @@ def build_api_docs(session: nox.Session) -> None:
     )
 
 
+@nox.session(default=False)
+def bench_cython(session: nox.Session) -> None:
+    """
+    Compare the size of the generated sources, the build time and the size of
+    the wheel of the CYTHON_BUILD_PROFILE values (or, with --shared-utility,
+    of a build with and without a Cython shared utility module) on the
+    hello-cython sample scaled up to many modules. Check options with "-- -h".
+    """
+
+    parser = argparse.ArgumentParser(prog=f"{Path(sys.argv[0]).name} -s bench_cython")
+    parser.add_argument("--modules", type=int, default=50, help="Number of copies of the hello-cython module")
+    parser.add_argument("--build-type", default="RelWithDebInfo", help="CMAKE_BUILD_TYPE of the builds")
+    parser.add_argument(
+        "--shared-utility", action="store_true", help="Compare RELEASE builds with and without a shared utility module"
+    )
+    args = parser.parse_args(session.posargs)
+
+    session.install("cmake", "ninja", "cython")
+
+    sample = Path("tests/samples/hello-cython/hello/_hello.pyx").resolve()
+    modules_dir = Path("skbuild/resources/cmake").resolve()
+    project = Path(session.create_tmp()).resolve() / "bench-cython"
+    shutil.rmtree(project, ignore_errors=True)
+    project.mkdir(parents=True)
+    lines = [
+        "cmake_minimum_required(VERSION 3.15...3.26)",
+        "project(bench_cython C CXX)",
+        "find_package(PythonExtensions REQUIRED)",
+        "find_package(Cython REQUIRED)",
+        "if(BENCH_SHARED_UTILITY)",
+        "  add_cython_shared_utility(_cyutility CXX)",
+        "  add_library(_cyutility MODULE ${_cyutility})",
+        "  python_extension_module(_cyutility)",
+        "endif()",
+    ]
+    for index in range(args.modules):
+        shutil.copyfile(sample, project / f"_hello{index}.pyx")
+        lines += [
+            f"add_cython_target(_hello{index} CXX)",
+            f"add_library(_hello{index} MODULE ${{_hello{index}}})",
+            f"python_extension_module(_hello{index})",
+        ]
+    (project / "CMakeLists.txt").write_text("\n".join(lines) + "\n")
+
+    configurations = [(profile, profile, False) for profile in ("DEBUG", "RELEASE", "FAST")]
+    if args.shared_utility:
+        configurations = [("RELEASE", "RELEASE", False), ("shared", "RELEASE", True)]
+
+    results = []
+    for name, profile, shared_utility in configurations:
+        build = project / f"build-{name.lower()}"
+        session.run(
+            "cmake",
+            "-S",
+            str(project),
+            "-B",
+            str(build),
+            "-G",
+            "Ninja",
+            f"-DCMAKE_MODULE_PATH={modules_dir}",
+            f"-DCMAKE_BUILD_TYPE={args.build_type}",
+            f"-DCYTHON_BUILD_PROFILE={profile}",
+            f"-DBENCH_SHARED_UTILITY={'ON' if shared_utility else 'OFF'}",
+            silent=True,
+        )
+        # Time the Cython step alone, then the C++ compilation and linking.
+        generated = [f"_hello{index}.cxx" for index in range(args.modules)]
+        if shared_utility:
+            generated.append("_cyutility.cpp")
+        start = time.perf_counter()
+        session.run("ninja", "-C", str(build), *generated, silent=True)
+        cython_time = time.perf_counter() - start
+        start = time.perf_counter()
+        session.run("ninja", "-C", str(build), silent=True)
+        compile_time = time.perf_counter() - start
+        sources = sum((build / path).stat().st_size for path in generated)
+        debug_files = sum(path.stat().st_size for path in (build / "cython_debug").rglob("*") if path.is_file())
+        # A wheel holds the extension modules, deflated.
+        extensions = [path for path in build.iterdir() if path.suffix in {".so", ".pyd"}]
+        wheel = build / "bench.zip"
+        with zipfile.ZipFile(wheel, "w", zipfile.ZIP_DEFLATED) as archive:
+            for path in extensions:
+                archive.write(path, path.name)
+        extensions_size = sum(path.stat().st_size for path in extensions)
+        results.append((name, sources, debug_files, cython_time, compile_time, extensions_size, wheel.stat().st_size))
+
+    session.log(f"{args.modules} modules, CMAKE_BUILD_TYPE={args.build_type}")
+    session.log(
+        f"{'build':<8} {'sources':>12} {'cygdb files':>12} {'cython':>8} {'compile':>8}"
+        f" {'extensions':>12} {'wheel':>12}"
+    )
+    for name, sources, debug_files, cython_time, compile_time, extensions_size, wheel_size in results:
+        session.log(
+            f"{name:<8} {sources / 1024:>9.0f} kB {debug_files / 1024:>9.0f} kB"
+            f" {cython_time:>7.1f}s {compile_time:>7.1f}s"
+            f" {extensions_size / 1024:>9.0f} kB {wheel_size / 1024:>9.0f} kB"
+        )
+
+
 # Sample projects that build with classic scikit-build (the core-*, hatchling-*,
 # and pi-fortran projects do not use the skbuild setup() wrapper; tower-of-babel
 # has no pyproject.toml and needs Boost, so it can't build in isolation).
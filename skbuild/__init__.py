@@ -7,8 +7,16 @@ The build backend is provided by scikit-build-core's setuptools plugin.
 
 from __future__ import annotations
 
-from scikit_build_core.setuptools.wrapper import setup
+import os
+from typing import Any
 
+from setuptools import Distribution
+from scikit_build_core.setuptools import wrapper
+from scikit_build_core.setuptools.build_cmake import BuildCMake
+from setuptools.command.build_ext import build_ext
+
+from ._build_tree import build_cmake_in_tree, build_tree_root
+from ._compiler_cache import compiler_cache_launcher, launcher_build_ext, launcher_environment, report_stats
 from ._version import version as __version__
 
 __author__ = "The scikit-build team"
@@ -20,3 +28,39 @@ __all__ = ["__version__", "setup"]
 
 def __dir__() -> list[str]:
     return __all__
+
+
+def setup(
+    *,
+    compiler_cache: bool | str | None = None,
+    cmake_build_dir: str | os.PathLike[str] | None = None,
+    **kw: Any,
+) -> Distribution:
+    """Wrapper of :func:`scikit_build_core.setuptools.wrapper.setup`.
+
+    ``compiler_cache`` compiles the CMake targets and the plain
+    ``setuptools.Extension`` modules with a compiler cache: ``True`` uses
+    ``ccache`` or ``sccache``, whichever is found first on ``PATH``, and a
+    string names the one to use. The ``SKBUILD_COMPILER_CACHE`` environment
+    variable overrides it. The hits and misses of the cache are printed at the
+    end of the build.
+
+    ``cmake_build_dir`` keeps the CMake build trees in this directory, one per
+    interpreter and configuration, so that the builds after the first one, by
+    ``pip install`` or ``build_ext --inplace``, are incremental. The
+    ``SKBUILD_CMAKE_BUILD_DIR`` environment variable overrides it.
+    """
+    cmdclass = dict(kw.pop("cmdclass", None) or {})
+    build_tree = build_tree_root(cmake_build_dir)
+    if build_tree is not None:
+        cmdclass["build_cmake"] = build_cmake_in_tree(cmdclass.get("build_cmake", BuildCMake), build_tree)
+
+    launcher = compiler_cache_launcher(compiler_cache)
+    if launcher is None:
+        if cmdclass:
+            kw["cmdclass"] = cmdclass
+        return wrapper.setup(**kw)
+
+    cmdclass["build_ext"] = launcher_build_ext(cmdclass.get("build_ext", build_ext), launcher)
+    with launcher_environment(launcher), report_stats(launcher):
+        return wrapper.setup(cmdclass=cmdclass, **kw)
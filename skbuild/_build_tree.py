@@ -0,0 +1,392 @@
+"""
+Persistent CMake build trees for :func:`skbuild.setup`.
+
+scikit-build-core's ``build_cmake`` command configures and builds in a new
+``build/temp.*/_skbuild`` directory every time. With a build tree root, the
+command builds in ``<root>/<tag>-<hash>/_skbuild`` instead, where the hash is
+computed from the interpreter, the source directory and the configure options,
+and keeps the tree between builds so that they are incremental. A lock file
+serializes the builds sharing a tree.
+
+scikit-build-core has no setting for the build directory of its setuptools
+plugin, so the command hooks into its internals: the ``shutil`` module used by
+``build_cmake`` to delete the previous tree, the ``CMaker`` class it configures
+with, and the ``_get_source_dir`` and ``_get_staged_install_prefix`` methods.
+:func:`build_cmake_in_tree` checks that they are all there: with a version of
+scikit-build-core lacking one of them, it warns and keeps the default
+``build_cmake`` command, which builds from scratch. A build also warns if the
+tree was deleted or the ``CMaker`` hook bypassed all the same.
+
+The configure step is skipped when its fingerprint, saved in the tree, is
+unchanged: the CMake command line and init cache, the interpreter, the CMake
+version, the environment variables read by CMake, and the size and mtime of
+the project files read by the last configure, listed by the ``cmakeFiles``
+reply of the CMake file API.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import sys
+import sysconfig
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from scikit_build_core import cmake as core_cmake
+from scikit_build_core.cmake import CMaker
+from scikit_build_core.setuptools import build_cmake
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping, Sequence
+
+__all__ = [
+    "build_cmake_in_tree",
+    "build_tree_root",
+    "configure_fingerprint",
+    "locked",
+    "reconfigure_reason",
+    "tree_fingerprint",
+    "tree_name",
+]
+
+#: Environment variables changing the configuration of a build tree.
+FINGERPRINT_ENVIRONMENT = (
+    "CMAKE_ARGS",
+    "CMAKE_BUILD_TYPE",
+    "CMAKE_GENERATOR",
+    "CMAKE_GENERATOR_PLATFORM",
+    "CMAKE_GENERATOR_TOOLSET",
+    "CMAKE_TOOLCHAIN_FILE",
+    "SKBUILD_CMAKE_BUILD_TYPE",
+    "SKBUILD_CONFIGURE_OPTIONS",
+    "CC",
+    "CXX",
+    "FC",
+)
+
+#: Environment variables read by CMake when configuring, besides the
+#: ``CMAKE_*`` and ``SKBUILD_*`` ones.
+CONFIGURE_ENVIRONMENT = (
+    "ARCHFLAGS",
+    "ASM",
+    "ASMFLAGS",
+    "CC",
+    "CFLAGS",
+    "CPPFLAGS",
+    "CUDACXX",
+    "CUDAFLAGS",
+    "CXX",
+    "CXXFLAGS",
+    "FC",
+    "FFLAGS",
+    "LDFLAGS",
+    "MACOSX_DEPLOYMENT_TARGET",
+)
+
+_BUILD_ENVIRONMENT = ("CMAKE_BUILD_PARALLEL_LEVEL", "SKBUILD_BUILD_OPTIONS", "SKBUILD_CMAKE_BUILD_DIR")
+
+#: File of a build directory keeping the fingerprint of its last configure.
+CONFIGURE_FINGERPRINT = ".skbuild-configure.json"
+
+#: File of a build directory telling whether it was kept since the last build.
+_KEPT = ".skbuild-kept"
+
+# The hooks are set on the build_cmake module, for one build at a time.
+_HOOKS_LOCK = threading.RLock()
+
+
+def build_tree_root(value: str | os.PathLike[str] | None) -> Path | None:
+    """Root of the persistent build trees, or None.
+
+    The ``SKBUILD_CMAKE_BUILD_DIR`` environment variable takes precedence over
+    ``value``; an empty variable disables the persistent build trees.
+    """
+    value = os.environ.get("SKBUILD_CMAKE_BUILD_DIR", value)
+    if not value:
+        return None
+    return Path(value).resolve()
+
+
+def tree_fingerprint(source_dir: Path, configure_args: list[str], debug: bool) -> dict[str, Any]:
+    """What a build tree is keyed on."""
+    return {
+        "python": sys.executable,
+        "ext_suffix": sysconfig.get_config_var("EXT_SUFFIX"),
+        "platform": sysconfig.get_platform(),
+        "source_dir": str(source_dir.resolve()),
+        "configure_args": configure_args,
+        "debug": debug,
+        "environment": {name: os.environ[name] for name in FINGERPRINT_ENVIRONMENT if name in os.environ},
+    }
+
+
+def tree_name(fingerprint: dict[str, Any]) -> str:
+    """Name of the build tree of a fingerprint, such as ``cpython-311-<hash>``."""
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+    return f"{sys.implementation.cache_tag}-{digest[:16]}"
+
+
+def _try_lock(lock: IO[bytes], blocking: bool) -> bool:
+    if sys.platform == "win32":
+        import msvcrt  # noqa: PLC0415
+
+        while True:
+            try:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.1)
+            else:
+                return True
+
+    import fcntl  # noqa: PLC0415
+
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def locked(tree: Path) -> Iterator[None]:
+    """Hold the lock of a build tree, waiting for other builds using it."""
+    tree.mkdir(parents=True, exist_ok=True)
+    with (tree / "build.lock").open("a+b") as lock:
+        if not _try_lock(lock, blocking=False):
+            print(f"waiting for another build to release {tree}", flush=True)
+            _try_lock(lock, blocking=True)
+        # The lock is released when the file is closed.
+        yield
+
+
+class _KeepTree:
+    """``shutil`` module of ``build_cmake`` leaving one tree in place."""
+
+    def __init__(self, tree: Path) -> None:
+        self.tree = tree
+
+    def rmtree(self, path: str | os.PathLike[str], *args: Any, **kwargs: Any) -> None:
+        if Path(path) != self.tree:
+            shutil.rmtree(path, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(shutil, name)
+
+
+def _stat(path: str) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _cmake_inputs(build_dir: Path) -> dict[str, list[int] | None] | None:
+    """Size and mtime of the project files read by the last configure, from
+    the ``cmakeFiles`` reply of the CMake file API, or None if unavailable."""
+    reply = build_dir / ".cmake" / "api" / "v1" / "reply"
+    try:
+        index = json.loads(max(reply.glob("index-*.json")).read_text())
+        cmake_files = json.loads((reply / index["reply"]["cmakeFiles-v1"]["jsonFile"]).read_text())
+        source_dir = Path(cmake_files["paths"]["source"])
+        paths = [
+            str(source_dir / entry["path"])
+            for entry in cmake_files["inputs"]
+            if not entry.get("isCMake") and not entry.get("isGenerated")
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return {path: _stat(path) for path in paths}
+
+
+def configure_fingerprint(cmaker: CMaker, command: list[str]) -> dict[str, Any]:
+    """What the configure step of ``cmaker`` running ``command`` depends on,
+    besides the project files."""
+    init_cache = cmaker.init_cache_file
+    return {
+        "python": sys.executable,
+        "cmake": str(cmaker.cmake.version),
+        "command": command,
+        "build_type": cmaker.build_type,
+        "init_cache": init_cache.read_text(encoding="utf-8") if init_cache.is_file() else "",
+        "environment": {
+            name: value
+            for name, value in sorted(cmaker.env.items())
+            if (name in CONFIGURE_ENVIRONMENT or name.startswith(("CMAKE_", "SKBUILD_")))
+            and name not in _BUILD_ENVIRONMENT
+        },
+    }
+
+
+def reconfigure_reason(build_dir: Path, fingerprint: dict[str, Any]) -> str | None:
+    """Why ``build_dir`` must be configured again, or None if its last
+    configure had the same ``fingerprint`` and project files."""
+    if not (build_dir / "CMakeCache.txt").is_file():
+        return "no CMake cache"
+    try:
+        previous = json.loads((build_dir / CONFIGURE_FINGERPRINT).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return "no configure fingerprint"
+    if not isinstance(previous, dict):
+        return "invalid configure fingerprint"
+    for key, value in fingerprint.items():
+        if previous.get(key) == value:
+            continue
+        if key == "environment" and isinstance(previous.get(key), dict):
+            names = sorted(name for name in {*value, *previous[key]} if value.get(name) != previous[key].get(name))
+            return f"environment variable(s) {', '.join(names)} changed"
+        return f"{key.replace('_', ' ')} changed"
+    inputs = previous.get("inputs")
+    if not isinstance(inputs, dict):
+        return "no record of the project files"
+    for path, stat in inputs.items():
+        if _stat(path) != stat:
+            return f"{path} changed"
+    return None
+
+
+class _CMakerInTree(CMaker):
+    """``CMaker`` skipping the configure step when its fingerprint is unchanged.
+
+    A skipped configure sets the same state as ``CMaker.configure``.
+    """
+
+    #: Whether a build configured through this class, or went around it.
+    used = False
+
+    def configure(
+        self,
+        *,
+        defines: Mapping[str, str | os.PathLike[str] | bool] | None = None,
+        cmake_args: Sequence[str] = (),
+        toolchain: os.PathLike[str] | None = None,
+    ) -> None:
+        _CMakerInTree.used = True
+        command = [os.fspath(self.cmake), *self._compute_cmake_args(defines or {}, toolchain), *cmake_args]
+        fingerprint = configure_fingerprint(self, command)
+        reason = reconfigure_reason(self.build_dir, fingerprint)
+        fingerprint_file = self.build_dir / CONFIGURE_FINGERPRINT
+        if reason is None:
+            print("CMake configuration unchanged, skipping the configure step", flush=True)
+            generator = self.get_generator(*command[1:], defines=defines or {})
+            if generator:
+                self.single_config = generator == "Ninja" or "Makefiles" in generator
+            if self._file_api_query.exists():
+                self.file_api = core_cmake._load_file_api(self._file_api_query)
+            return
+
+        print(f"configuring CMake: {reason}", flush=True)
+        # A configure that fails must not be skipped by the next build.
+        fingerprint_file.unlink(missing_ok=True)
+        super().configure(defines=defines, cmake_args=cmake_args, toolchain=toolchain)
+        fingerprint["inputs"] = _cmake_inputs(self.build_dir)
+        fingerprint_file.write_text(json.dumps(fingerprint, indent=2) + "\n", encoding="utf-8")
+
+
+def _missing_hooks(base: type[Any]) -> list[str]:
+    """The scikit-build-core internals the persistent trees need, and that
+    ``base`` or the ``build_cmake`` module lack."""
+    hooks = {
+        "build_cmake.shutil": getattr(build_cmake, "shutil", None) is shutil,
+        "build_cmake.CMaker": getattr(build_cmake, "CMaker", None) is CMaker,
+        "BuildCMake._get_source_dir": hasattr(base, "_get_source_dir"),
+        "BuildCMake._get_staged_install_prefix": hasattr(base, "_get_staged_install_prefix"),
+        "CMaker._compute_cmake_args": hasattr(CMaker, "_compute_cmake_args"),
+        "CMaker.get_generator": hasattr(CMaker, "get_generator"),
+        "cmake._load_file_api": hasattr(core_cmake, "_load_file_api"),
+    }
+    fields = {field.name for field in dataclasses.fields(CMaker)}
+    hooks.update({f"CMaker.{name}": name in fields for name in ("single_config", "file_api", "_file_api_query")})
+    return [name for name, found in hooks.items() if not found]
+
+
+@contextlib.contextmanager
+def _in_tree(tree: Path) -> Iterator[None]:
+    """Keep ``build_cmake`` from deleting ``tree`` before building in it, and
+    from configuring it again when nothing changed."""
+    with _HOOKS_LOCK:
+        build_cmake.shutil = _KeepTree(tree)  # type: ignore[attr-defined,assignment]
+        build_cmake.CMaker = _CMakerInTree  # type: ignore[attr-defined]
+        try:
+            yield
+        finally:
+            build_cmake.shutil = shutil  # type: ignore[attr-defined]
+            build_cmake.CMaker = CMaker  # type: ignore[attr-defined]
+
+
+def build_cmake_in_tree(base: type[Any], root: Path) -> type[Any]:
+    """Subclass of the ``build_cmake`` command ``base`` building in a
+    persistent tree under ``root``.
+
+    The CMake install prefix stays in ``build/temp.*``, where
+    :func:`skbuild.constants.CMAKE_INSTALL_DIR` points. ``base`` is returned
+    unchanged, with a warning, if scikit-build-core lacks the internals the
+    trees hook into.
+    """
+    missing = _missing_hooks(base)
+    if missing:
+        warnings.warn(
+            "cmake_build_dir is not supported with this version of scikit-build-core, "
+            f"which lacks {', '.join(missing)}: the CMake build tree is not kept",
+            stacklevel=3,
+        )
+        return base
+
+    class BuildCMakeInTree(base):  # type: ignore[misc]
+        build_temp: str
+        _default_build_temp: str
+
+        def _get_staged_install_prefix(self, build_temp: Path) -> Path:  # noqa: ARG002
+            # The default build_temp rather than the persistent tree.
+            prefix: Path = super()._get_staged_install_prefix(Path(self._default_build_temp, "_skbuild"))
+            return prefix
+
+        def run(self) -> None:
+            source_dir = self._get_source_dir()
+            assert source_dir is not None
+            configure_args = [
+                *(self.cmake_args or []),
+                *(getattr(self.distribution, "cmake_args", None) or []),
+            ]
+            fingerprint = tree_fingerprint(Path(source_dir), configure_args, bool(self.debug))
+            tree = root / tree_name(fingerprint)
+            build_temp = self.build_temp
+            self._default_build_temp = build_temp
+            staged = Path(build_temp, "_skbuild")
+            if staged.exists():
+                shutil.rmtree(staged)
+            with locked(tree), _in_tree(tree / "_skbuild"):
+                (tree / "fingerprint.json").write_text(json.dumps(fingerprint, indent=2, sort_keys=True) + "\n")
+                print(f"using the CMake build tree {tree}", flush=True)
+                kept = tree / "_skbuild" / _KEPT
+                built = kept.is_file()
+                self.build_temp = str(tree)
+                _CMakerInTree.used = False
+                try:
+                    super().run()
+                finally:
+                    self.build_temp = build_temp
+                if not _CMakerInTree.used:
+                    warnings.warn(
+                        "scikit-build-core configured without the CMaker of scikit-build, "
+                        "the configure step is never skipped",
+                        stacklevel=1,
+                    )
+                if built and not kept.is_file():
+                    warnings.warn(
+                        f"scikit-build-core deleted the CMake build tree {tree}, builds are not incremental",
+                        stacklevel=1,
+                    )
+                kept.touch()
+
+    return BuildCMakeInTree
@@ -0,0 +1,142 @@
+"""
+Compiler cache (ccache, sccache) support for :func:`skbuild.setup`.
+
+The cache is used as the compiler launcher of the CMake build, through the
+``CMAKE_<LANG>_COMPILER_LAUNCHER`` environment variables (CMake 3.17+), and of
+the plain ``setuptools.Extension`` modules compiled by ``build_ext``. Its hit
+and miss counts are read before and after the build.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["COMPILER_CACHES", "compiler_cache_launcher", "launcher_build_ext", "launcher_environment", "report_stats"]
+
+#: Compiler caches tried, in order, when the cache is enabled without a name.
+COMPILER_CACHES = ("ccache", "sccache")
+
+_DISABLED = ("", "0", "off", "false", "no", "none")
+_ENABLED = ("1", "on", "true", "yes", "auto")
+_LANGUAGES = ("C", "CXX", "Fortran")
+
+
+def compiler_cache_launcher(value: bool | str | None) -> str | None:
+    """Path of the compiler cache to use, or None.
+
+    The ``SKBUILD_COMPILER_CACHE`` environment variable takes precedence over
+    ``value``. Both accept a boolean (``ON``/``OFF``, ``auto``), which detects
+    the first of :data:`COMPILER_CACHES` found on ``PATH``, or the name or path
+    of a compiler cache. A compiler cache that is requested but cannot be found
+    is reported with a warning, and the build goes on without it.
+    """
+    value = os.environ.get("SKBUILD_COMPILER_CACHE", value)
+    if value is None or value is False:
+        return None
+    if value is True or value.lower() in _ENABLED:
+        return next(filter(None, map(shutil.which, COMPILER_CACHES)), None)
+    if value.lower() in _DISABLED:
+        return None
+    launcher = shutil.which(value)
+    if launcher is None:
+        warnings.warn(f"compiler cache {value!r} not found, building without it", stacklevel=3)
+    return launcher
+
+
+def _is_launcher(program: str, launcher: str) -> bool:
+    return Path(program).stem in COMPILER_CACHES or program == launcher
+
+
+@contextlib.contextmanager
+def launcher_environment(launcher: str) -> Iterator[None]:
+    """Set the ``CMAKE_<LANG>_COMPILER_LAUNCHER`` environment variables that
+    are not set already, and restore them on exit.
+
+    With ``SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT``, ``CCACHE_BASEDIR`` is
+    also set to the project directory, unless already set, so that ccache
+    ignores the absolute paths of the compiler command lines.
+    """
+    variables = {f"CMAKE_{language}_COMPILER_LAUNCHER": launcher for language in _LANGUAGES}
+    path_independent = os.environ.get("SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT", "")
+    if Path(launcher).stem == "ccache" and path_independent.lower() in _ENABLED:
+        variables["CCACHE_BASEDIR"] = os.getcwd()
+    names = [name for name in variables if name not in os.environ]
+    os.environ.update({name: variables[name] for name in names})
+    try:
+        yield
+    finally:
+        for name in names:
+            os.environ.pop(name, None)
+
+
+def launcher_build_ext(base: type[Any], launcher: str) -> type[Any]:
+    """Subclass of the ``build_ext`` command ``base`` compiling the plain
+    extension modules with ``launcher``.
+
+    Only the compilers driven like ``gcc`` (``unix``, ``cygwin`` and
+    ``mingw32``) are launched this way; MSVC extension modules are compiled as
+    usual.
+    """
+
+    class BuildExtWithCompilerCache(base):  # type: ignore[misc]
+        def build_extensions(self) -> None:
+            compiler = self.compiler
+            if compiler.compiler_type in ("unix", "cygwin", "mingw32"):
+                for name in ("compiler_so", "compiler_so_cxx"):
+                    command = getattr(compiler, name, None)
+                    if command and not _is_launcher(command[0], launcher):
+                        compiler.set_executable(name, [launcher, *command])
+            super().build_extensions()
+
+    return BuildExtWithCompilerCache
+
+
+def _stats(launcher: str) -> tuple[int, int] | None:
+    """Hit and miss counts of a compiler cache, or None if unavailable."""
+    try:
+        if Path(launcher).stem == "sccache":
+            output = subprocess.run(
+                [launcher, "--show-stats", "--stats-format=json"], check=True, capture_output=True, text=True
+            ).stdout
+            stats = json.loads(output)["stats"]
+            return (
+                sum(stats["cache_hits"]["counts"].values()),
+                sum(stats["cache_misses"]["counts"].values()),
+            )
+        output = subprocess.run([launcher, "--print-stats"], check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError, TypeError):
+        return None
+    counters = dict(line.split("\t", 1) for line in output.splitlines() if "\t" in line)
+    try:
+        hits = int(counters.get("direct_cache_hit", 0)) + int(counters.get("preprocessed_cache_hit", 0))
+        return hits, int(counters.get("cache_miss", 0))
+    except ValueError:
+        return None
+
+
+@contextlib.contextmanager
+def report_stats(launcher: str) -> Iterator[None]:
+    """Print the hits and misses of the compiler cache during the block."""
+    before = _stats(launcher)
+    try:
+        yield
+    finally:
+        after = _stats(launcher)
+        if before is not None and after is not None:
+            hits, misses = after[0] - before[0], after[1] - before[1]
+            if hits + misses > 0:
+                print(
+                    f"compiler cache ({Path(launcher).stem}): {hits} hits, {misses} misses "
+                    f"({hits / (hits + misses):.1%} hit rate)",
+                    flush=True,
+                )
@@ -13,6 +13,10 @@
 #  ``CYTHON_FOUND``
 #    true if the program was found
 #
+# The version of the ``cython`` program installed next to the Python
+# interpreter is read from :doc:`/cmake-modules/PythonProbe`, without running
+# the program.
+#
 # For more information on the Cython project, see https://cython.org/.
 #
 # *Cython is a language that makes writing C extensions for the Python language
@@ -55,7 +59,28 @@ else()
                DOC "path to the cython executable")
 endif()
 
-if(CYTHON_EXECUTABLE)
+# The Cython next to the interpreter is the version of its Cython distribution,
+# known from the cached introspection of the interpreter.
+set(_cython_probed_version "")
+if(CYTHON_EXECUTABLE AND DEFINED _python_path)
+  include(PythonProbe)
+  if(Python_EXECUTABLE)
+    python_probe("${Python_EXECUTABLE}")
+  elseif(Python3_EXECUTABLE)
+    python_probe("${Python3_EXECUTABLE}")
+  else()
+    python_probe("${PYTHON_EXECUTABLE}")
+  endif()
+  file(TO_CMAKE_PATH "${PYTHON_PROBE_SCRIPTS_DIR}" _cython_scripts_dir)
+  get_filename_component(_cython_executable_dir "${CYTHON_EXECUTABLE}" DIRECTORY)
+  if(PYTHON_PROBE_CYTHON_VERSION AND _cython_executable_dir STREQUAL _cython_scripts_dir)
+    set(_cython_probed_version "${PYTHON_PROBE_CYTHON_VERSION}")
+  endif()
+endif()
+
+if(_cython_probed_version)
+  set(CYTHON_VERSION "${_cython_probed_version}")
+elseif(CYTHON_EXECUTABLE)
   set(CYTHON_version_command ${CYTHON_EXECUTABLE} --version)
 
   execute_process(COMMAND ${CYTHON_version_command}
@@ -74,15 +74,11 @@ if(NOT F2PY_EXECUTABLE)
   set(F2PY_EXECUTABLE "${PYTHON_EXECUTABLE}" "-m" "numpy.f2py")
 endif()
 
+include(PythonProbe)
+python_probe("${PYTHON_EXECUTABLE}")
+
 if(NOT F2PY_INCLUDE_DIR)
-  execute_process(
-      COMMAND "${PYTHON_EXECUTABLE}"
-      -c "import os; from numpy import f2py; print(f2py.get_include() if hasattr(f2py, 'get_include') else os.path.join(os.path.dirname(f2py.__file__), 'src'))"
-      OUTPUT_VARIABLE _f2py_directory
-      OUTPUT_STRIP_TRAILING_WHITESPACE
-      ERROR_QUIET
-  )
-  string(REPLACE "\\" "/" _f2py_directory ${_f2py_directory})
+  string(REPLACE "\\" "/" _f2py_directory "${PYTHON_PROBE_F2PY_INCLUDE_DIR}")
 
   set(F2PY_INCLUDE_DIR "${_f2py_directory}" CACHE STRING "F2PY source directory location" FORCE)
 endif()
@@ -100,11 +96,29 @@ set_target_properties(_f2py_runtime_library PROPERTIES POSITION_INDEPENDENT_CODE
 set(F2PY_LIBRARIES _f2py_runtime_library)
 set(F2PY_INCLUDE_DIRS "${F2PY_INCLUDE_DIR}" "${NumPy_INCLUDE_DIRS}")
 
-if(F2PY_EXECUTABLE)
+# The F2PY of NumPy has the version of NumPy: running it is only needed when it
+# does not come with the NumPy of the interpreter.
+set(_f2py_from_numpy FALSE)
+if(F2PY_EXECUTABLE STREQUAL "${PYTHON_EXECUTABLE};-m;numpy.f2py")
+  set(_f2py_from_numpy TRUE)
+elseif(F2PY_EXECUTABLE AND PYTHON_PROBE_SCRIPTS_DIR)
+  file(TO_CMAKE_PATH "${PYTHON_PROBE_SCRIPTS_DIR}" _f2py_scripts_dir)
+  get_filename_component(_f2py_executable_dir "${F2PY_EXECUTABLE}" DIRECTORY)
+  if(_f2py_executable_dir STREQUAL _f2py_scripts_dir)
+    set(_f2py_from_numpy TRUE)
+  endif()
+endif()
+
+if(_f2py_from_numpy AND PYTHON_PROBE_NUMPY_VERSION)
+  set(F2PY_VERSION_STRING "${PYTHON_PROBE_NUMPY_VERSION}")
+elseif(F2PY_EXECUTABLE)
   # extract the version string
   execute_process(COMMAND "${F2PY_EXECUTABLE}" -v
                   OUTPUT_VARIABLE F2PY_VERSION_STRING
                   OUTPUT_STRIP_TRAILING_WHITESPACE)
+endif()
+
+if(F2PY_EXECUTABLE)
   if("${F2PY_VERSION_STRING}" MATCHES "^([0-9]+)(\\.([0-9]+))?(\\.([0-9]+))?$")
     set(F2PY_VERSION_MAJOR ${CMAKE_MATCH_1})
     set(F2PY_VERSION_MINOR "${CMAKE_MATCH_3}")
@@ -16,6 +16,9 @@
 # ``NumPy_FROM_TEMPLATE_EXECUTABLE``
 #   Path to from-template executable.
 #
+# The interpreter is introspected by :doc:`/cmake-modules/PythonProbe`, without
+# running it again when its NumPy installation is unchanged.
+#
 # The module will also explicitly define one cache variable:
 #
 # ``NumPy_INCLUDE_DIR``
@@ -37,39 +40,19 @@ if(NOT NumPy_FOUND)
   find_program(NumPy_FROM_TEMPLATE_EXECUTABLE NAMES from-template)
 
   if(PYTHON_EXECUTABLE)
-    execute_process(COMMAND "${PYTHON_EXECUTABLE}"
-      -c "import numpy; print(numpy.get_include())"
-      OUTPUT_VARIABLE _numpy_include_dir
-      OUTPUT_STRIP_TRAILING_WHITESPACE
-      ERROR_QUIET
-      )
-    execute_process(COMMAND "${PYTHON_EXECUTABLE}"
-      -c "import numpy; print(numpy.__version__)"
-      OUTPUT_VARIABLE NumPy_VERSION
-      OUTPUT_STRIP_TRAILING_WHITESPACE
-      ERROR_QUIET
-      )
+    include(PythonProbe)
+    python_probe("${PYTHON_EXECUTABLE}")
+    set(_numpy_include_dir "${PYTHON_PROBE_NUMPY_INCLUDE_DIR}")
+    set(NumPy_VERSION "${PYTHON_PROBE_NUMPY_VERSION}")
 
     # XXX This is required to support NumPy < v1.15.0. See note in module documentation above.
     if(NOT NumPy_CONV_TEMPLATE_EXECUTABLE)
-      execute_process(COMMAND "${PYTHON_EXECUTABLE}"
-        -c "from numpy.distutils import conv_template; print(conv_template.__file__)"
-        OUTPUT_VARIABLE _numpy_conv_template_file
-        OUTPUT_STRIP_TRAILING_WHITESPACE
-        ERROR_QUIET
-        )
-      set(NumPy_CONV_TEMPLATE_EXECUTABLE "${PYTHON_EXECUTABLE}" "${_numpy_conv_template_file}" CACHE STRING "Command executing conv-template program" FORCE)
+      set(NumPy_CONV_TEMPLATE_EXECUTABLE "${PYTHON_EXECUTABLE}" "${PYTHON_PROBE_NUMPY_CONV_TEMPLATE}" CACHE STRING "Command executing conv-template program" FORCE)
     endif()
 
     # XXX This is required to support NumPy < v1.15.0. See note in module documentation above.
     if(NOT NumPy_FROM_TEMPLATE_EXECUTABLE)
-      execute_process(COMMAND "${PYTHON_EXECUTABLE}"
-        -c "from numpy.distutils import from_template; print(from_template.__file__)"
-        OUTPUT_VARIABLE _numpy_from_template_file
-        OUTPUT_STRIP_TRAILING_WHITESPACE
-        ERROR_QUIET
-        )
-      set(NumPy_FROM_TEMPLATE_EXECUTABLE "${PYTHON_EXECUTABLE}" "${_numpy_from_template_file}" CACHE STRING "Command executing from-template program" FORCE)
+      set(NumPy_FROM_TEMPLATE_EXECUTABLE "${PYTHON_EXECUTABLE}" "${PYTHON_PROBE_NUMPY_FROM_TEMPLATE}" CACHE STRING "Command executing from-template program" FORCE)
     endif()
   endif()
 endif()
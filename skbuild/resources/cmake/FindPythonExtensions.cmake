@@ -21,6 +21,29 @@
 #                                       ``os.pathsep`` in Python.
 #   PYTHON_EXTENSION_MODULE_SUFFIX    - suffix of the compiled module. For example, on
 #                                       Linux, based on environment, it could be ``.cpython-35m-x86_64-linux-gnu.so``.
+#   PYTHON_GIL_DISABLED               - true for a free-threaded interpreter
+#                                       (Python 3.13t or newer, built with
+#                                       ``Py_GIL_DISABLED``).
+#
+# The values are read from the cached introspection of the interpreter, see
+# :doc:`/cmake-modules/PythonProbe`.
+#
+# With CMake 3.18 or newer, the headers are found by
+# ``find_package(Python COMPONENTS Development.Module)``, which does not look
+# for the Python library outside of Windows; the optional
+# ``Development.SABIModule`` component is also requested with CMake 3.26 or
+# newer. The interpreter is ``Python_EXECUTABLE`` or ``PYTHON_EXECUTABLE``, as
+# passed by scikit-build, and is otherwise found with the ``Interpreter``
+# component. The headers are looked up in ``PYTHON_INCLUDE_DIR`` or in the
+# include directory of the interpreter, and the variables of the deprecated ``FindPythonInterp`` and
+# ``FindPythonLibs`` modules (``PYTHON_EXECUTABLE``, ``PYTHON_VERSION_STRING``,
+# ``PYTHON_VERSION_MAJOR``, ``PYTHON_INCLUDE_DIRS``, ``PYTHON_LIBRARIES``...) are
+# still defined. Older versions of CMake use these modules.
+#
+# Free-threaded interpreters are supported: with CMake 3.30 or newer,
+# ``Python_FIND_ABI`` is set to look for their ``t`` ABI unless it is already
+# defined, and ``PYTHON_EXTENSION_MODULE_SUFFIX`` is their suffix (for example
+# ``.cpython-313t-x86_64-linux-gnu.so``).
 #
 #
 #
@@ -36,7 +59,11 @@
 #   python_extension_module(<Target>
 #                           [LINKED_MODULES_VAR <LinkedModVar>]
 #                           [FORWARD_DECL_MODULES_VAR <ForwardDeclModVar>]
-#                           [MODULE_SUFFIX <ModuleSuffix>])
+#                           [MODULE_SUFFIX <ModuleSuffix>]
+#                           [LIMITED_API <Version>]
+#                           [LEAN]
+#                           [SPLIT_DEBUG]
+#                           [LINKER <Linker>])
 #
 # Only extension modules that are configured to be built as MODULE libraries can
 # be runtime-loaded through the standard Python import mechanism.  All other
@@ -57,6 +84,10 @@
 # property is used to set symbol visibility and export only the module init function.
 # This applies to GNU and MSVC compilers.
 #
+# A library compiling a source generated by ``add_cython_target`` with
+# ``CYTHON_PROFILE`` or ``PROFILE`` gets the ``CYTHON_TRACE`` and
+# ``CYTHON_TRACE_NOGIL`` compile definitions, wherever the source was generated.
+#
 # Options:
 #
 # ``LINKED_MODULES_VAR <LinkedModVar>``
@@ -79,6 +110,94 @@
 #   scope defines the value used for all extensions not having a suffix
 #   explicitly specified using ``MODULE_SUFFIX`` parameter.
 #
+# ``LIMITED_API <Version>``
+#   Build against the Python limited API (the stable ABI) of the given Python
+#   version, such as ``3.9``, so that the module can be imported by that
+#   version and all the newer ones.  ``Py_LIMITED_API`` is defined for the
+#   sources of the target, which also turns on the limited API of the sources
+#   generated by Cython 3, and the default suffix of the module becomes
+#   ``.abi3.so`` (``.pyd`` on Windows).  On Windows, the module is linked
+#   against the stable ABI library (``python3.lib``) found by the
+#   ``Development.SABIModule`` component with CMake 3.26 or newer.  An empty
+#   ``<Version>`` builds a regular module, so that the version can be forwarded
+#   from scikit-build-core's ``SKBUILD_SABI_VERSION``.  The free-threaded
+#   interpreters do not support the limited API: a warning is issued and
+#   regular modules are built for them.
+#
+# ``LEAN``
+#   Link a ``MODULE_LIBRARY`` with a profile that makes it smaller and faster
+#   to load: its symbols are hidden (``-fvisibility=hidden``), unused functions
+#   and data are removed (``-ffunction-sections -fdata-sections`` and
+#   ``--gc-sections``, or ``-dead_strip`` on macOS), the references to its own
+#   symbols are bound at link time (``-fno-semantic-interposition`` and
+#   ``-Bsymbolic``), and identical code is folded when the linker supports
+#   ``--icf=safe`` (gold, lld and mold).  With MSVC, ``/Gy /Gw`` and
+#   ``/OPT:REF /OPT:ICF`` are used.  The ``PYTHON_EXTENSION_LEAN`` cache
+#   variable, initialized from the ``SKBUILD_PYTHON_EXTENSION_LEAN``
+#   environment variable, turns it on for all the modules.  The modules are not
+#   stripped: ``cmake --install --strip`` does it.  The
+#   ``python -m skbuild.resources.cmake.lean_report`` command reports the size
+#   and the import time of the modules of a directory, compared with another
+#   build.
+#
+# ``SPLIT_DEBUG``
+#   Move the debug information of a ``MODULE_LIBRARY`` to a separate file once
+#   it is linked, so that the module installed in the wheel is stripped.  The
+#   files are written to ``PYTHON_EXTENSION_DEBUG_DIR``, in the same
+#   sub-directories as the ``CMakeLists.txt`` files of the modules, so that
+#   they can be archived separately: ``<module>.debug`` files with ``objcopy``,
+#   referenced by the GNU debuglink of the module (gdb finds them in its
+#   ``debug-file-directory``, or next to the module), ``<module>.dSYM``
+#   bundles with ``dsymutil`` on macOS, and the PDB files with MSVC.  The
+#   ``PYTHON_EXTENSION_SPLIT_DEBUG`` cache variable, initialized from the
+#   ``SKBUILD_PYTHON_EXTENSION_SPLIT_DEBUG`` environment variable, turns it on
+#   for all the modules.  ``PYTHON_EXTENSION_DEBUG_DIR`` is initialized from
+#   the ``SKBUILD_PYTHON_EXTENSION_DEBUG_DIR`` environment variable, or
+#   ``<build-dir>/debug``.
+#
+# ``LINKER <Linker>``
+#   Link a ``MODULE_LIBRARY`` or a ``SHARED_LIBRARY`` with a faster linker
+#   than the default one (GNU ld), with ``-fuse-ld``: ``mold``, ``lld``,
+#   ``gold`` or ``bfd``, or ``AUTO`` for mold, then lld.  A linker is only used
+#   with GCC and Clang on ELF platforms, and if a check shows that the compiler
+#   can use it and that it honours the version script hiding the symbols of
+#   the modules (the check runs once per build tree); otherwise, the default
+#   linker is used, with a warning unless ``AUTO`` is given.  The
+#   ``PYTHON_EXTENSION_LINKER`` cache variable, initialized from the
+#   ``SKBUILD_PYTHON_EXTENSION_LINKER`` environment variable, sets the linker
+#   of the modules without ``LINKER``.
+#
+# For faster incremental links during development, the
+# ``PYTHON_EXTENSION_SPLIT_DWARF`` cache variable (initialized from the
+# ``SKBUILD_PYTHON_EXTENSION_SPLIT_DWARF`` environment variable) compiles the
+# C and C++ sources of the modules with ``-gsplit-dwarf``, with GCC and Clang:
+# their debug information stays in ``.dwo`` files of the build tree, and is
+# not processed by the linker.
+#
+# For compiler caches to hit across build trees, such as the temporary
+# directories of isolated builds, the ``PYTHON_EXTENSION_PATH_INDEPENDENT``
+# cache variable (initialized from the
+# ``SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT`` environment variable) removes
+# the source and the binary directories from the compiler output: the C and
+# C++ sources compiled in the directory where ``find_package(PythonExtensions)``
+# is called, and in its sub-directories, are compiled with
+# ``-ffile-prefix-map`` (or ``-fdebug-prefix-map`` with older compilers) mapping
+# the source directory to ``.`` and, when it is not inside, the binary
+# directory to ``build``, so that the same sources give the same objects in
+# every build tree.  Paths outside of the two directories, such as the headers
+# of build dependencies, are left unchanged.  It also turns on the
+# ``CYTHON_RELATIVE_PATHS`` option of ``UseCython`` when Cython is found
+# afterwards.  ccache also needs ``CCACHE_BASEDIR`` to be the source directory
+# to ignore the absolute paths of the compiler command lines; the
+# ``compiler_cache`` keyword of ``skbuild.setup`` sets it when the environment
+# variable is set.
+#
+# With a free-threaded interpreter, ``Py_GIL_DISABLED`` is also defined for the
+# target on Windows, where the headers do not define it.  The Cython sources of
+# a module that does not rely on the GIL are declared as such with the
+# ``FREETHREADING_COMPATIBLE`` option of ``add_cython_target`` and
+# ``add_python_extension``; C sources use the ``Py_mod_gil`` module slot.
+#
 #
 # .. cmake:command:: python_standalone_executable
 #
@@ -241,99 +360,182 @@
 # limitations under the License.
 #=============================================================================
 
-find_package(PythonInterp REQUIRED)
-if(SKBUILD AND NOT PYTHON_LIBRARY)
-  set(PYTHON_LIBRARY "no-library-required")
-  find_package(PythonLibs)
-  unset(PYTHON_LIBRARY)
-  unset(PYTHON_LIBRARIES)
+if(CMAKE_VERSION VERSION_LESS 3.18)
+  find_package(PythonInterp REQUIRED)
+  if(SKBUILD AND NOT PYTHON_LIBRARY)
+    set(PYTHON_LIBRARY "no-library-required")
+    find_package(PythonLibs)
+    unset(PYTHON_LIBRARY)
+    unset(PYTHON_LIBRARIES)
+  else()
+    find_package(PythonLibs)
+  endif()
 else()
-  find_package(PythonLibs)
+  # Extension modules only need the headers, and the import library on
+  # Windows: Development.Module does not look for libpython elsewhere.
+  if(NOT Python_EXECUTABLE AND PYTHON_EXECUTABLE)
+    set(Python_EXECUTABLE "${PYTHON_EXECUTABLE}")
+  endif()
+  if(NOT Python_INCLUDE_DIR AND PYTHON_INCLUDE_DIR)
+    set(Python_INCLUDE_DIR "${PYTHON_INCLUDE_DIR}")
+  endif()
+  if(Python_EXECUTABLE)
+    include(PythonProbe)
+    python_probe("${Python_EXECUTABLE}")
+    if(NOT Python_INCLUDE_DIR)
+      set(Python_INCLUDE_DIR "${PYTHON_PROBE_INCLUDE_DIR}")
+    endif()
+    # FindPython ignores the free-threaded ABI unless asked for it.
+    if(PYTHON_PROBE_GIL_DISABLED AND NOT DEFINED Python_FIND_ABI
+       AND NOT CMAKE_VERSION VERSION_LESS 3.30)
+      set(Python_FIND_ABI "ANY" "ANY" "ANY" "ON")
+    endif()
+  endif()
+  # The Interpreter component runs the interpreter several times: it is only
+  # needed to find one, scikit-build passes it.
+  set(_python_components Development.Module)
+  if(NOT Python_EXECUTABLE)
+    list(APPEND _python_components Interpreter)
+  endif()
+  set(_python_optional_components)
+  if(NOT CMAKE_VERSION VERSION_LESS 3.26)
+    list(APPEND _python_optional_components Development.SABIModule)
+  endif()
+  find_package(Python REQUIRED
+    COMPONENTS ${_python_components}
+    OPTIONAL_COMPONENTS ${_python_optional_components})
+
+  # The variables of FindPythonInterp and FindPythonLibs
+  if(NOT PYTHON_EXECUTABLE)
+    set(PYTHON_EXECUTABLE "${Python_EXECUTABLE}" CACHE FILEPATH "Path to a program.")
+  endif()
+  set(PYTHONINTERP_FOUND TRUE)
+  set(PYTHON_VERSION_STRING "${Python_VERSION}")
+  set(PYTHON_VERSION_MAJOR "${Python_VERSION_MAJOR}")
+  set(PYTHON_VERSION_MINOR "${Python_VERSION_MINOR}")
+  set(PYTHON_VERSION_PATCH "${Python_VERSION_PATCH}")
+  set(PYTHONLIBS_FOUND TRUE)
+  set(PYTHONLIBS_VERSION_STRING "${Python_VERSION}")
+  set(PYTHON_INCLUDE_DIRS "${Python_INCLUDE_DIRS}")
+  set(PYTHON_INCLUDE_PATH "${Python_INCLUDE_DIRS}")
+  if(NOT PYTHON_INCLUDE_DIR)
+    set(PYTHON_INCLUDE_DIR "${Python_INCLUDE_DIRS}" CACHE PATH "Path to a file.")
+  endif()
+  set(PYTHON_LIBRARIES "${Python_LIBRARIES}")
 endif()
 include(targetLinkLibrariesWithDynamicLookup)
+include(PythonLimitedAPI)
 
-set(_command "
-import sys
-if sys.version_info >= (3, 10):
-    import sysconfig
-else:
-    import distutils.sysconfig
-
-import itertools
-import os
-import os.path
-import site
-
-result = None
-rel_result = None
-candidate_lists = []
-
-try:
-    if sys.version_info >= (3, 10):
-        candidate_lists.append((sysconfig.get_paths()['purelib'],))
-    else:
-        candidate_lists.append((distutils.sysconfig.get_python_lib(),))
-except AttributeError: pass
-
-try:
-    candidate_lists.append(site.getsitepackages())
-except AttributeError: pass
-
-try:
-    candidate_lists.append((site.getusersitepackages(),))
-except AttributeError: pass
-
-candidates = itertools.chain.from_iterable(candidate_lists)
-
-for candidate in candidates:
-    rel_candidate = os.path.relpath(
-      candidate, sys.prefix)
-    if not rel_candidate.startswith(\"..\"):
-        result = candidate
-        rel_result = rel_candidate
-        break
-
-if sys.version_info >= (3, 10):
-    ext_suffix = sysconfig.get_config_var('EXT_SUFFIX')
-else:
-    ext_suffix = distutils.sysconfig.get_config_var('EXT_SUFFIX')
-sys.stdout.write(\";\".join((
-    os.sep,
-    os.pathsep,
-    sys.prefix,
-    result,
-    rel_result,
-    ext_suffix,
-)))
-")
-
-execute_process(COMMAND "${PYTHON_EXECUTABLE}" -c "${_command}"
-                OUTPUT_VARIABLE _list
-                RESULT_VARIABLE _result)
+include(PythonProbe)
+python_probe("${PYTHON_EXECUTABLE}")
 
-list(GET _list 0 _item)
-set(PYTHON_SEPARATOR "${_item}")
+set(PYTHON_SEPARATOR "${PYTHON_PROBE_SEPARATOR}")
 mark_as_advanced(PYTHON_SEPARATOR)
 
-list(GET _list 1 _item)
-set(PYTHON_PATH_SEPARATOR "${_item}")
+set(PYTHON_PATH_SEPARATOR "${PYTHON_PROBE_PATH_SEPARATOR}")
 mark_as_advanced(PYTHON_PATH_SEPARATOR)
 
-list(GET _list 2 _item)
-set(PYTHON_PREFIX "${_item}")
+set(PYTHON_PREFIX "${PYTHON_PROBE_PREFIX}")
 mark_as_advanced(PYTHON_PREFIX)
 
-list(GET _list 3 _item)
-set(PYTHON_SITE_PACKAGES_DIR "${_item}")
+set(PYTHON_SITE_PACKAGES_DIR "${PYTHON_PROBE_SITE_PACKAGES_DIR}")
 mark_as_advanced(PYTHON_SITE_PACKAGES_DIR)
 
-list(GET _list 4 _item)
-set(PYTHON_RELATIVE_SITE_PACKAGES_DIR "${_item}")
+set(PYTHON_RELATIVE_SITE_PACKAGES_DIR "${PYTHON_PROBE_RELATIVE_SITE_PACKAGES_DIR}")
 mark_as_advanced(PYTHON_RELATIVE_SITE_PACKAGES_DIR)
 
 if(NOT DEFINED PYTHON_EXTENSION_MODULE_SUFFIX)
-  list(GET _list 5 _item)
-  set(PYTHON_EXTENSION_MODULE_SUFFIX "${_item}")
+  set(PYTHON_EXTENSION_MODULE_SUFFIX "${PYTHON_PROBE_EXT_SUFFIX}")
+endif()
+
+if(PYTHON_PROBE_GIL_DISABLED)
+  set(PYTHON_GIL_DISABLED TRUE)
+else()
+  set(PYTHON_GIL_DISABLED FALSE)
+endif()
+
+set(_python_extension_lean_default OFF)
+if("$ENV{SKBUILD_PYTHON_EXTENSION_LEAN}")
+  set(_python_extension_lean_default ON)
+endif()
+set(PYTHON_EXTENSION_LEAN ${_python_extension_lean_default} CACHE BOOL
+    "Build the Python extension modules with the LEAN link profile.")
+mark_as_advanced(PYTHON_EXTENSION_LEAN)
+
+set(PYTHON_EXTENSION_LINKER "$ENV{SKBUILD_PYTHON_EXTENSION_LINKER}" CACHE STRING
+    "Linker of the Python extension modules: AUTO, mold, lld, gold, bfd or empty.")
+set_property(CACHE PYTHON_EXTENSION_LINKER PROPERTY STRINGS "" AUTO mold lld gold bfd)
+mark_as_advanced(PYTHON_EXTENSION_LINKER)
+
+set(_python_extension_split_debug_default OFF)
+if("$ENV{SKBUILD_PYTHON_EXTENSION_SPLIT_DEBUG}")
+  set(_python_extension_split_debug_default ON)
+endif()
+set(PYTHON_EXTENSION_SPLIT_DEBUG ${_python_extension_split_debug_default} CACHE BOOL
+    "Move the debug information of the Python extension modules to PYTHON_EXTENSION_DEBUG_DIR.")
+set(_python_extension_debug_dir_default "$ENV{SKBUILD_PYTHON_EXTENSION_DEBUG_DIR}")
+if(NOT _python_extension_debug_dir_default)
+  set(_python_extension_debug_dir_default "${CMAKE_BINARY_DIR}/debug")
+endif()
+set(PYTHON_EXTENSION_DEBUG_DIR "${_python_extension_debug_dir_default}" CACHE PATH
+    "Directory of the debug information of the Python extension modules.")
+set(_python_extension_split_dwarf_default OFF)
+if("$ENV{SKBUILD_PYTHON_EXTENSION_SPLIT_DWARF}")
+  set(_python_extension_split_dwarf_default ON)
+endif()
+set(PYTHON_EXTENSION_SPLIT_DWARF ${_python_extension_split_dwarf_default} CACHE BOOL
+    "Compile the Python extension modules with -gsplit-dwarf.")
+mark_as_advanced(PYTHON_EXTENSION_SPLIT_DEBUG PYTHON_EXTENSION_DEBUG_DIR
+                 PYTHON_EXTENSION_SPLIT_DWARF)
+
+set(_python_extension_path_independent_default OFF)
+if("$ENV{SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT}")
+  set(_python_extension_path_independent_default ON)
+endif()
+set(PYTHON_EXTENSION_PATH_INDEPENDENT ${_python_extension_path_independent_default} CACHE BOOL
+    "Map the source and binary directories out of the compiler output.")
+mark_as_advanced(PYTHON_EXTENSION_PATH_INDEPENDENT)
+
+# Remap the source and the binary directories in the debug information and the
+# __FILE__ macros of the C and C++ objects compiled from here on.  The binary
+# directory is mapped on its own when it is not in the source directory (GCC
+# uses the last matching option, Clang the longest one).
+function(_python_extension_path_independent)
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  set(_compiler_version "${CMAKE_C_COMPILER_VERSION}")
+  if(NOT _compiler_id)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+    set(_compiler_version "${CMAKE_CXX_COMPILER_VERSION}")
+  endif()
+  if((_compiler_id STREQUAL "GNU" AND NOT _compiler_version VERSION_LESS 8)
+     OR (_compiler_id MATCHES "^(Clang|IntelLLVM)$" AND NOT _compiler_version VERSION_LESS 10)
+     OR (_compiler_id STREQUAL "AppleClang" AND NOT _compiler_version VERSION_LESS 12))
+    set(_flag "-ffile-prefix-map")
+  elseif(_compiler_id MATCHES "^(GNU|Clang|AppleClang)$")
+    # Only the debug information; __FILE__ keeps absolute paths.
+    set(_flag "-fdebug-prefix-map")
+  else()
+    message(WARNING
+      "Path-independent output is not supported with the ${_compiler_id} "
+      "compiler, PYTHON_EXTENSION_PATH_INDEPENDENT is ignored")
+    return()
+  endif()
+
+  set(_maps)
+  string(FIND "${CMAKE_BINARY_DIR}/" "${CMAKE_SOURCE_DIR}/" _index)
+  if(NOT _index EQUAL 0)
+    list(APPEND _maps "${CMAKE_BINARY_DIR}=build")
+  endif()
+  list(APPEND _maps "${CMAKE_SOURCE_DIR}=.")
+  foreach(_map ${_maps})
+    add_compile_options(
+      "$<$<COMPILE_LANGUAGE:C>:${_flag}=${_map}>"
+      "$<$<COMPILE_LANGUAGE:CXX>:${_flag}=${_map}>")
+  endforeach()
+endfunction()
+
+if(PYTHON_EXTENSION_PATH_INDEPENDENT)
+  _python_extension_path_independent()
 endif()
 
 function(_set_python_extension_symbol_visibility _target)
@@ -376,9 +578,286 @@ function(_set_python_extension_symbol_visibility _target)
   endif()
 endfunction()
 
+# Check once per build tree that the linker folds identical code.
+function(_python_extension_linker_icf_supported _language _linker _output_var)
+  set(CMAKE_REQUIRED_FLAGS "-Wl,--icf=safe")
+  set(_result_var _PYTHON_EXTENSION_LINKER_ICF)
+  if(_linker)
+    set(CMAKE_REQUIRED_FLAGS "-fuse-ld=${_linker} ${CMAKE_REQUIRED_FLAGS}")
+    string(TOUPPER "${_result_var}_${_linker}" _result_var)
+  endif()
+  set(CMAKE_REQUIRED_QUIET ON)
+  if(_language STREQUAL "C")
+    include(CheckCSourceCompiles)
+    check_c_source_compiles("int main(void) { return 0; }" ${_result_var})
+  else()
+    include(CheckCXXSourceCompiles)
+    check_cxx_source_compiles("int main() { return 0; }" ${_result_var})
+  endif()
+  set(${_output_var} ${${_result_var}} PARENT_SCOPE)
+endfunction()
+
+# Add the LEAN link profile to a module: hidden symbols, unused sections
+# removed at link time, references to the module's own symbols bound at link
+# time, and identical code folded.
+function(_set_python_extension_lean_profile _target)
+  set(_language C)
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  set(_compiler_version "${CMAKE_C_COMPILER_VERSION}")
+  if(NOT _compiler_id)
+    set(_language CXX)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+    set(_compiler_version "${CMAKE_CXX_COMPILER_VERSION}")
+  endif()
+
+  set_target_properties(${_target} PROPERTIES
+                        C_VISIBILITY_PRESET hidden
+                        CXX_VISIBILITY_PRESET hidden
+                        VISIBILITY_INLINES_HIDDEN ON)
+
+  if(_compiler_id STREQUAL "MSVC")
+    foreach(_flag /Gy /Gw)
+      target_compile_options(${_target} PRIVATE
+        "$<$<COMPILE_LANGUAGE:C>:${_flag}>" "$<$<COMPILE_LANGUAGE:CXX>:${_flag}>")
+    endforeach()
+    set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+      " /OPT:REF /OPT:ICF")
+    return()
+  elseif(NOT _compiler_id MATCHES "^(GNU|Clang|AppleClang|IntelLLVM)$")
+    message(WARNING
+      "The LEAN link profile is not supported with the ${_compiler_id} "
+      "compiler, ${_target} only gets hidden symbols")
+    return()
+  endif()
+
+  target_compile_options(${_target} PRIVATE -ffunction-sections -fdata-sections)
+  if(APPLE)
+    set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+      " -Wl,-dead_strip")
+    return()
+  endif()
+
+  # Calls to the functions of the module do not go through the PLT.
+  if((_compiler_id STREQUAL "GNU" AND NOT _compiler_version VERSION_LESS 5)
+     OR (_compiler_id MATCHES "Clang|IntelLLVM" AND NOT _compiler_version VERSION_LESS 10))
+    target_compile_options(${_target} PRIVATE
+      "$<$<COMPILE_LANGUAGE:C>:-fno-semantic-interposition>"
+      "$<$<COMPILE_LANGUAGE:CXX>:-fno-semantic-interposition>")
+  endif()
+  set(_link_flags "-Wl,--gc-sections -Wl,-Bsymbolic")
+  get_target_property(_linker ${_target} _PYTHON_EXTENSION_LINKER)
+  if(NOT _linker)
+    set(_linker)
+  endif()
+  _python_extension_linker_icf_supported(${_language} "${_linker}" _icf)
+  if(_icf)
+    string(APPEND _link_flags " -Wl,--icf=safe")
+  endif()
+  set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+    " ${_link_flags}")
+endfunction()
+
+# Check that the compiler can link with a linker, and that the linker honours
+# the version script of the modules: a project linking a library exporting a
+# symbol and hiding another one, then programs calling them, is built with
+# try_compile.  The project uses the compiler and the toolchain of the build,
+# and is given its flags and launcher; the result is cached for them.
+function(_python_extension_linker_supported _linker _output_var)
+  set(_language C)
+  set(_extension c)
+  if(NOT CMAKE_C_COMPILER)
+    set(_language CXX)
+    set(_extension cpp)
+  endif()
+  set(_cmake_flags)
+  foreach(_variable
+      CMAKE_${_language}_FLAGS CMAKE_${_language}_COMPILER_LAUNCHER
+      CMAKE_${_language}_COMPILER_TARGET CMAKE_SYSROOT
+      CMAKE_EXE_LINKER_FLAGS CMAKE_SHARED_LINKER_FLAGS)
+    list(APPEND _cmake_flags "-D${_variable}=${${_variable}}")
+  endforeach()
+  string(MD5 _key
+    "${CMAKE_${_language}_COMPILER};${CMAKE_${_language}_COMPILER_ID};${_cmake_flags}")
+
+  string(TOUPPER "_PYTHON_EXTENSION_LINKER_${_linker}" _cache_var)
+  if(NOT DEFINED ${_cache_var} OR NOT "${${_cache_var}_KEY}" STREQUAL _key)
+    set(_dir "${CMAKE_BINARY_DIR}${CMAKE_FILES_DIRECTORY}/PythonExtensionLinker/${_linker}")
+    set(_extern_c_begin "#ifdef __cplusplus\nextern \"C\" {\n#endif\n")
+    set(_extern_c_end "#ifdef __cplusplus\n}\n#endif\n")
+    file(WRITE "${_dir}/src/module.${_extension}"
+      "${_extern_c_begin}int exported(void) { return 1; }\nint hidden(void) { return 2; }\n${_extern_c_end}")
+    file(WRITE "${_dir}/src/module.map" "{global: exported; local: *;};\n")
+    foreach(_function exported hidden)
+      file(WRITE "${_dir}/src/${_function}.${_extension}"
+        "${_extern_c_begin}int ${_function}(void);\n${_extern_c_end}int main(void) { return ${_function}(); }\n")
+    endforeach()
+    file(WRITE "${_dir}/src/CMakeLists.txt" "
+cmake_minimum_required(VERSION ${CMAKE_VERSION})
+project(python_extension_linker ${_language})
+add_link_options(-fuse-ld=${_linker})
+add_library(module SHARED module.${_extension})
+target_link_options(module PRIVATE \"-Wl,--version-script=\${CMAKE_CURRENT_SOURCE_DIR}/module.map\")
+add_executable(exported exported.${_extension})
+target_link_libraries(exported PRIVATE module)
+add_executable(hidden hidden.${_extension})
+target_link_libraries(hidden PRIVATE module)
+")
+
+    foreach(_function exported hidden)
+      file(REMOVE_RECURSE "${_dir}/${_function}")
+      try_compile(_${_function}_result "${_dir}/${_function}" "${_dir}/src"
+        python_extension_linker ${_function}
+        CMAKE_FLAGS ${_cmake_flags}
+        OUTPUT_VARIABLE _output)
+    endforeach()
+    set(_supported FALSE)
+    if(_exported_result AND NOT _hidden_result)
+      set(_supported TRUE)
+      message(STATUS "Linker of Python extensions (${_linker}): supported")
+    endif()
+    set(${_cache_var} ${_supported} CACHE INTERNAL "")
+    set(${_cache_var}_KEY ${_key} CACHE INTERNAL "")
+  endif()
+  set(${_output_var} ${${_cache_var}} PARENT_SCOPE)
+endfunction()
+
+# Link a target with the first supported linker of AUTO (mold, then lld), or
+# with the given one, or with the default linker if they are not supported.
+function(_set_python_extension_linker _target _linker)
+  string(TOLOWER "${_linker}" _linker)
+  if(_linker STREQUAL "auto")
+    set(_candidates mold lld)
+  elseif(_linker MATCHES "^(mold|lld|gold|bfd)$")
+    set(_candidates ${_linker})
+  else()
+    message(FATAL_ERROR
+      "LINKER must be AUTO, mold, lld, gold or bfd (got \"${_linker}\")")
+  endif()
+
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  if(NOT _compiler_id)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+  endif()
+  if(APPLE OR WIN32 OR NOT _compiler_id MATCHES "^(GNU|Clang|IntelLLVM)$")
+    if(NOT _linker STREQUAL "auto")
+      message(WARNING
+        "The ${_linker} linker is only used with GCC and Clang on ELF "
+        "platforms, ${_target} is linked with the default linker")
+    endif()
+    return()
+  endif()
+
+  foreach(_candidate IN LISTS _candidates)
+    _python_extension_linker_supported(${_candidate} _supported)
+    if(_supported)
+      set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+        " -fuse-ld=${_candidate}")
+      set_property(TARGET ${_target} PROPERTY _PYTHON_EXTENSION_LINKER ${_candidate})
+      return()
+    endif()
+  endforeach()
+
+  get_property(_warned GLOBAL PROPERTY _PYTHON_EXTENSION_LINKER_WARNING_${_linker})
+  if(NOT _warned)
+    set_property(GLOBAL PROPERTY _PYTHON_EXTENSION_LINKER_WARNING_${_linker} ON)
+    if(_linker STREQUAL "auto")
+      message(STATUS
+        "Linker of Python extensions: neither mold nor lld is supported, "
+        "using the default linker")
+    else()
+      message(WARNING
+        "The ${_linker} linker is not installed, or does not honour the "
+        "version scripts of the Python extensions: the default linker is used")
+    endif()
+  endif()
+endfunction()
+
+# Move the debug information of a module to PYTHON_EXTENSION_DEBUG_DIR once it
+# is linked, so that the installed module is stripped.
+function(_set_python_extension_split_debug _target)
+  file(TO_CMAKE_PATH "${PYTHON_EXTENSION_DEBUG_DIR}" _dir)
+  file(RELATIVE_PATH _relative "${CMAKE_SOURCE_DIR}" "${CMAKE_CURRENT_SOURCE_DIR}")
+  if(_relative)
+    set(_dir "${_dir}/${_relative}")
+  endif()
+  file(MAKE_DIRECTORY "${_dir}")
+
+  if(MSVC)
+    # The debug information is already in a PDB file, next to the module.
+    set_target_properties(${_target} PROPERTIES PDB_OUTPUT_DIRECTORY "${_dir}")
+    return()
+  elseif(APPLE)
+    find_program(PYTHON_EXTENSION_DSYMUTIL dsymutil)
+    mark_as_advanced(PYTHON_EXTENSION_DSYMUTIL)
+    if(NOT PYTHON_EXTENSION_DSYMUTIL OR NOT CMAKE_STRIP)
+      message(WARNING
+        "dsymutil and strip are needed to split the debug information of ${_target}")
+      return()
+    endif()
+    add_custom_command(TARGET ${_target} POST_BUILD
+      COMMAND "${PYTHON_EXTENSION_DSYMUTIL}" "$<TARGET_FILE:${_target}>"
+              -o "${_dir}/$<TARGET_FILE_NAME:${_target}>.dSYM"
+      COMMAND "${CMAKE_STRIP}" -S "$<TARGET_FILE:${_target}>"
+      COMMENT "Moving the debug information of ${_target} to ${_dir}"
+      VERBATIM)
+    return()
+  endif()
+
+  if(NOT CMAKE_OBJCOPY)
+    message(WARNING
+      "objcopy is needed to split the debug information of ${_target}")
+    return()
+  endif()
+  # The module keeps the name and the checksum of its debug file.
+  set(_debug_file "${_dir}/$<TARGET_FILE_NAME:${_target}>.debug")
+  add_custom_command(TARGET ${_target} POST_BUILD
+    COMMAND "${CMAKE_OBJCOPY}" --only-keep-debug "$<TARGET_FILE:${_target}>" "${_debug_file}"
+    COMMAND "${CMAKE_OBJCOPY}" --strip-debug "--add-gnu-debuglink=${_debug_file}"
+            "$<TARGET_FILE:${_target}>"
+    COMMENT "Moving the debug information of ${_target} to ${_dir}"
+    VERBATIM)
+endfunction()
+
+# Compile a module with -gsplit-dwarf: the debug information of the objects
+# stays in .dwo files, which the linker does not process.
+function(_set_python_extension_split_dwarf _target)
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  if(NOT _compiler_id)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+  endif()
+  if(APPLE OR NOT _compiler_id MATCHES "^(GNU|Clang|IntelLLVM)$")
+    message(WARNING
+      "-gsplit-dwarf is not supported with the ${_compiler_id} compiler, "
+      "PYTHON_EXTENSION_SPLIT_DWARF is ignored for ${_target}")
+    return()
+  endif()
+  target_compile_options(${_target} PRIVATE
+    "$<$<COMPILE_LANGUAGE:C>:-gsplit-dwarf>"
+    "$<$<COMPILE_LANGUAGE:CXX>:-gsplit-dwarf>")
+endfunction()
+
+# Compile the target with tracing when it has sources generated by
+# add_cython_target with CYTHON_PROFILE or PROFILE.
+function(_set_python_extension_cython_trace _target)
+  get_property(_traced GLOBAL PROPERTY _CYTHON_TRACED_SOURCES)
+  if(NOT _traced)
+    return()
+  endif()
+  get_target_property(_sources ${_target} SOURCES)
+  get_target_property(_source_dir ${_target} SOURCE_DIR)
+  foreach(_source IN LISTS _sources)
+    get_filename_component(_source "${_source}" ABSOLUTE BASE_DIR "${_source_dir}")
+    list(FIND _traced "${_source}" _index)
+    if(NOT _index EQUAL -1)
+      target_compile_definitions(${_target} PRIVATE CYTHON_TRACE=1 CYTHON_TRACE_NOGIL=1)
+      return()
+    endif()
+  endforeach()
+endfunction()
+
 function(python_extension_module _target)
-  set(one_ops LINKED_MODULES_VAR FORWARD_DECL_MODULES_VAR MODULE_SUFFIX)
-  cmake_parse_arguments(_args "" "${one_ops}" "" ${ARGN})
+  set(one_ops LINKED_MODULES_VAR FORWARD_DECL_MODULES_VAR MODULE_SUFFIX LIMITED_API LINKER)
+  cmake_parse_arguments(_args "LEAN;SPLIT_DEBUG" "${one_ops}" "" ${ARGN})
 
   set(_lib_type "NA")
   if(TARGET ${_target})
@@ -429,6 +908,26 @@ function(python_extension_module _target)
     include_directories("${PYTHON_INCLUDE_DIRS}")
   endif()
 
+  if(NOT _is_non_lib)
+    _set_python_extension_cython_trace(${_target})
+  endif()
+
+  if(PYTHON_GIL_DISABLED AND WIN32 AND NOT CYGWIN AND NOT _is_non_lib)
+    target_compile_definitions(${_target} PRIVATE Py_GIL_DISABLED=1)
+  endif()
+
+  set(_python_libraries ${PYTHON_LIBRARIES})
+  if(_args_LIMITED_API)
+    python_limited_api_hex("${_args_LIMITED_API}" _limited_api_hex)
+    set(_args_LIMITED_API "${_limited_api_hex}")
+  endif()
+  if(_args_LIMITED_API AND NOT _is_non_lib)
+    target_compile_definitions(${_target} PRIVATE Py_LIMITED_API=${_limited_api_hex})
+    if(Python_SABI_LIBRARIES)
+      set(_python_libraries ${Python_SABI_LIBRARIES})
+    endif()
+  endif()
+
   if(_is_module_lib)
     set_target_properties(${_target} PROPERTIES
                           PREFIX "${PYTHON_MODULE_PREFIX}")
@@ -437,6 +936,17 @@ function(python_extension_module _target)
   if(_is_module_lib OR _is_shared_lib)
     if(_is_module_lib)
 
+      if(NOT _args_MODULE_SUFFIX AND _args_LIMITED_API AND NOT (WIN32 AND NOT CYGWIN))
+        # .cpython-311-x86_64-linux-gnu.so -> .abi3.so
+        string(REGEX MATCH "\\.[^.]*$" _extension "${PYTHON_EXTENSION_MODULE_SUFFIX}")
+        if(NOT _extension)
+          set(_extension "${CMAKE_SHARED_MODULE_SUFFIX}")
+        endif()
+        set(_args_MODULE_SUFFIX ".abi3${_extension}")
+      elseif(NOT _args_MODULE_SUFFIX AND _args_LIMITED_API)
+        set(_args_MODULE_SUFFIX ".pyd")
+      endif()
+
       if(NOT _args_MODULE_SUFFIX)
         set(_args_MODULE_SUFFIX "${PYTHON_EXTENSION_MODULE_SUFFIX}")
       endif()
@@ -451,17 +961,42 @@ function(python_extension_module _target)
       endif()
     endif()
 
-    target_link_libraries_with_dynamic_lookup(${_target} ${PYTHON_LIBRARIES})
+    target_link_libraries_with_dynamic_lookup(${_target} ${_python_libraries})
+
+    set(_linker "${PYTHON_EXTENSION_LINKER}")
+    if(_args_LINKER)
+      set(_linker "${_args_LINKER}")
+    endif()
+    if(_linker)
+      _set_python_extension_linker(${_target} "${_linker}")
+    endif()
 
     if(_is_module_lib)
       _set_python_extension_symbol_visibility(${_target})
+      if(_args_LEAN OR PYTHON_EXTENSION_LEAN)
+        _set_python_extension_lean_profile(${_target})
+      endif()
+      if(PYTHON_EXTENSION_SPLIT_DWARF)
+        _set_python_extension_split_dwarf(${_target})
+      endif()
+      if(_args_SPLIT_DEBUG OR PYTHON_EXTENSION_SPLIT_DEBUG)
+        _set_python_extension_split_debug(${_target})
+      endif()
     endif()
   endif()
 endfunction()
 
 function(python_standalone_executable _target)
-  include_directories(${PYTHON_INCLUDE_DIRS})
-  target_link_libraries(${_target} ${SKBUILD_LINK_LIBRARIES_KEYWORD} ${PYTHON_LIBRARIES})
+  if(CMAKE_VERSION VERSION_LESS 3.18)
+    include_directories(${PYTHON_INCLUDE_DIRS})
+    target_link_libraries(${_target} ${SKBUILD_LINK_LIBRARIES_KEYWORD} ${PYTHON_LIBRARIES})
+    return()
+  endif()
+  # Embedding the interpreter needs libpython, which is only looked up here.
+  if(NOT TARGET Python::Python)
+    find_package(Python REQUIRED COMPONENTS Interpreter Development.Embed)
+  endif()
+  target_link_libraries(${_target} ${SKBUILD_LINK_LIBRARIES_KEYWORD} Python::Python)
 endfunction()
 
 function(python_modules_header _name)
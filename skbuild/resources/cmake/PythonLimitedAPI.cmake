@@ -0,0 +1,39 @@
+#.rst:
+#
+# Limited API (stable ABI) version shared by ``UsePythonExtensions``,
+# ``FindPythonExtensions`` and ``UseCython``.
+#
+# .. cmake:command:: python_limited_api_hex
+#
+#   Compute the ``Py_LIMITED_API`` value of a Python version::
+#
+#     python_limited_api_hex(<version> <output_var>)
+#
+#   ``<version>`` is a Python 3 version such as ``3.9``, for which
+#   ``<output_var>`` is set to ``0x03090000``. The free-threaded interpreters
+#   (``PYTHON_GIL_DISABLED``) do not support the limited API: ``<output_var>``
+#   is then set to an empty string, with a warning given once.
+
+function(python_limited_api_hex _version _output_var)
+  if(NOT _version MATCHES "^3\\.([0-9]|[1-9][0-9])$")
+    message(FATAL_ERROR
+      "LIMITED_API expects a Python 3 version such as 3.9 (got \"${_version}\")")
+  endif()
+  if(PYTHON_GIL_DISABLED)
+    get_property(_warned GLOBAL PROPERTY _PYTHON_LIMITED_API_GIL_WARNING)
+    if(NOT _warned)
+      set_property(GLOBAL PROPERTY _PYTHON_LIMITED_API_GIL_WARNING ON)
+      message(WARNING
+        "The free-threaded Python interpreters do not support the limited "
+        "API: LIMITED_API is ignored")
+    endif()
+    set(${_output_var} "" PARENT_SCOPE)
+    return()
+  endif()
+  set(_digits 0 1 2 3 4 5 6 7 8 9 a b c d e f)
+  math(EXPR _high "${CMAKE_MATCH_1} / 16")
+  math(EXPR _low "${CMAKE_MATCH_1} % 16")
+  list(GET _digits ${_high} _high)
+  list(GET _digits ${_low} _low)
+  set(${_output_var} "0x03${_high}${_low}0000" PARENT_SCOPE)
+endfunction()
@@ -0,0 +1,172 @@
+#.rst:
+#
+# Introspection of a Python interpreter shared by ``FindPythonExtensions``,
+# ``FindNumPy``, ``FindF2PY`` and ``FindCython``.
+#
+# The modules need the paths, the extension suffix and the versions of NumPy
+# and Cython of the interpreter. Instead of running it several times, each
+# time they are configured, the values are gathered by a single run of
+# ``python_probe.py`` and stored in a file per interpreter, which later
+# configures and other build trees use as long as:
+#
+# * the interpreter has the same path and modification time,
+# * the ``PYTHONPATH``, ``PYTHONHOME``, ``PYTHONUSERBASE`` and
+#   ``PYTHONNOUSERSITE`` environment variables are unchanged,
+# * the NumPy and Cython distributions found in its ``sys.path`` are the same
+#   (same ``.dist-info`` or ``.egg-info`` directories).
+#
+# .. cmake:command:: python_probe
+#
+#   Set the ``PYTHON_PROBE_<NAME>`` variables describing an interpreter::
+#
+#     python_probe(<python>)
+#
+#   ``PYTHON_PROBE_FOUND``
+#     True if the interpreter could be probed.
+#   ``PYTHON_PROBE_SEPARATOR``, ``PYTHON_PROBE_PATH_SEPARATOR``
+#     ``os.sep`` and ``os.pathsep``.
+#   ``PYTHON_PROBE_PREFIX``
+#     ``sys.prefix``.
+#   ``PYTHON_PROBE_SITE_PACKAGES_DIR``, ``PYTHON_PROBE_RELATIVE_SITE_PACKAGES_DIR``
+#     The site-packages directory, absolute and relative to the prefix.
+#   ``PYTHON_PROBE_EXT_SUFFIX``
+#     The suffix of the extension modules.
+#   ``PYTHON_PROBE_SCRIPTS_DIR``
+#     The directory of the scripts of the installed packages.
+#   ``PYTHON_PROBE_INCLUDE_DIR``
+#     The directory of the Python headers.
+#   ``PYTHON_PROBE_GIL_DISABLED``
+#     ``1`` for a free-threaded interpreter (``Py_GIL_DISABLED``), else ``0``.
+#   ``PYTHON_PROBE_PATH``
+#     The directories of ``sys.path``.
+#   ``PYTHON_PROBE_NUMPY_VERSION``, ``PYTHON_PROBE_NUMPY_INCLUDE_DIR``
+#     The version and include directory of NumPy, empty if it is not installed.
+#   ``PYTHON_PROBE_NUMPY_CONV_TEMPLATE``, ``PYTHON_PROBE_NUMPY_FROM_TEMPLATE``
+#     The ``numpy.distutils`` template scripts, empty if they do not exist.
+#   ``PYTHON_PROBE_F2PY_INCLUDE_DIR``
+#     The source directory of F2PY.
+#   ``PYTHON_PROBE_CYTHON_VERSION``
+#     The version of the Cython distribution, empty if it is not installed.
+#
+# Cache variables:
+#
+# ``PYTHON_PROBE_CACHE_DIR``
+#   The directory of the stored probes. It defaults to the value of the
+#   ``SKBUILD_PYTHON_PROBE_CACHE_DIR`` environment variable, or to the
+#   ``scikit-build`` directory of the user cache directory. Set it to an empty
+#   string to only reuse the probes within the build tree.
+#
+
+if(NOT DEFINED PYTHON_PROBE_CACHE_DIR)
+  if(DEFINED ENV{SKBUILD_PYTHON_PROBE_CACHE_DIR})
+    set(_python_probe_cache_dir "$ENV{SKBUILD_PYTHON_PROBE_CACHE_DIR}")
+  elseif(DEFINED ENV{XDG_CACHE_HOME})
+    set(_python_probe_cache_dir "$ENV{XDG_CACHE_HOME}/scikit-build")
+  elseif(WIN32 AND DEFINED ENV{LOCALAPPDATA})
+    set(_python_probe_cache_dir "$ENV{LOCALAPPDATA}/scikit-build/Cache")
+  elseif(APPLE AND DEFINED ENV{HOME})
+    set(_python_probe_cache_dir "$ENV{HOME}/Library/Caches/scikit-build")
+  elseif(DEFINED ENV{HOME})
+    set(_python_probe_cache_dir "$ENV{HOME}/.cache/scikit-build")
+  else()
+    set(_python_probe_cache_dir "")
+  endif()
+  file(TO_CMAKE_PATH "${_python_probe_cache_dir}" _python_probe_cache_dir)
+  set(PYTHON_PROBE_CACHE_DIR "${_python_probe_cache_dir}" CACHE PATH
+    "Directory of the Python interpreter probes shared by the build trees")
+  mark_as_advanced(PYTHON_PROBE_CACHE_DIR)
+endif()
+
+set(_python_probe_script "${CMAKE_CURRENT_LIST_DIR}/python_probe.py")
+
+set(_PYTHON_PROBE_NAMES
+  SEPARATOR PATH_SEPARATOR PREFIX SITE_PACKAGES_DIR RELATIVE_SITE_PACKAGES_DIR
+  EXT_SUFFIX SCRIPTS_DIR INCLUDE_DIR GIL_DISABLED PATH NUMPY_VERSION NUMPY_INCLUDE_DIR NUMPY_CONV_TEMPLATE
+  NUMPY_FROM_TEMPLATE F2PY_INCLUDE_DIR CYTHON_VERSION
+  )
+
+# Compute what a stored probe is valid for. The distributions are looked up in
+# the sys.path of the last probe.
+function(_python_probe_key _python _path _out)
+  file(TIMESTAMP "${_python}" _mtime "%s" UTC)
+  file(SHA256 "${_python_probe_script}" _script_hash)
+  set(_key "${_python}|${_mtime}|${_script_hash}")
+  foreach(_env PYTHONPATH PYTHONHOME PYTHONUSERBASE PYTHONNOUSERSITE)
+    string(APPEND _key "|$ENV{${_env}}")
+  endforeach()
+  foreach(_dir IN LISTS _path)
+    file(TO_CMAKE_PATH "${_dir}" _dir)
+    file(GLOB _distributions RELATIVE "${_dir}" "${_dir}/[Nn]um[Pp]y-*" "${_dir}/[Cc]ython-*")
+    string(APPEND _key "|${_distributions}")
+  endforeach()
+  string(SHA256 _key "${_key}")
+  set(${_out} "${_key}" PARENT_SCOPE)
+endfunction()
+
+function(python_probe _python)
+  foreach(_name FOUND ${_PYTHON_PROBE_NAMES})
+    set(PYTHON_PROBE_${_name} "" PARENT_SCOPE)
+  endforeach()
+  if(NOT _python OR NOT EXISTS "${_python}")
+    set(PYTHON_PROBE_FOUND FALSE PARENT_SCOPE)
+    return()
+  endif()
+
+  get_filename_component(_python "${_python}" ABSOLUTE)
+  string(SHA256 _python_hash "${_python}")
+  string(SUBSTRING "${_python_hash}" 0 16 _python_hash)
+
+  # Within a configure, the first validation holds.
+  get_property(_file GLOBAL PROPERTY _PYTHON_PROBE_${_python_hash})
+  if(NOT _file)
+    if(PYTHON_PROBE_CACHE_DIR)
+      set(_dir "${PYTHON_PROBE_CACHE_DIR}")
+    else()
+      set(_dir "${CMAKE_BINARY_DIR}/CMakeFiles")
+    endif()
+    set(_candidate "${_dir}/python-probe-${_python_hash}.cmake")
+
+    if(EXISTS "${_candidate}")
+      set(_python_probe_key "")
+      include("${_candidate}")
+      _python_probe_key("${_python}" "${PYTHON_PROBE_PATH}" _key)
+      if(_key STREQUAL _python_probe_key)
+        set(_file "${_candidate}")
+      endif()
+    endif()
+
+    if(NOT _file)
+      string(RANDOM LENGTH 8 _suffix)
+      set(_temporary "${_candidate}.${_suffix}.tmp")
+      execute_process(COMMAND "${_python}" "${_python_probe_script}" "${_temporary}"
+                      RESULT_VARIABLE _result
+                      ERROR_VARIABLE _error)
+      if(NOT _result EQUAL 0 AND PYTHON_PROBE_CACHE_DIR)
+        # The cache directory may not be writable: keep the probe in the build tree.
+        set(_candidate "${CMAKE_BINARY_DIR}/CMakeFiles/python-probe-${_python_hash}.cmake")
+        set(_temporary "${_candidate}.${_suffix}.tmp")
+        execute_process(COMMAND "${_python}" "${_python_probe_script}" "${_temporary}"
+                        RESULT_VARIABLE _result
+                        ERROR_VARIABLE _error)
+      endif()
+      if(NOT _result EQUAL 0)
+        message(WARNING "Failed to probe the Python interpreter ${_python}:\n${_error}")
+        set(PYTHON_PROBE_FOUND FALSE PARENT_SCOPE)
+        return()
+      endif()
+      include("${_temporary}")
+      _python_probe_key("${_python}" "${PYTHON_PROBE_PATH}" _key)
+      file(APPEND "${_temporary}" "set(_python_probe_key \"${_key}\")\n")
+      # Renaming is atomic, concurrent configures never read a partial file.
+      file(RENAME "${_temporary}" "${_candidate}")
+      set(_file "${_candidate}")
+    endif()
+    set_property(GLOBAL PROPERTY _PYTHON_PROBE_${_python_hash} "${_file}")
+  endif()
+
+  include("${_file}")
+  foreach(_name ${_PYTHON_PROBE_NAMES})
+    set(PYTHON_PROBE_${_name} "${PYTHON_PROBE_${_name}}" PARENT_SCOPE)
+  endforeach()
+  set(PYTHON_PROBE_FOUND TRUE PARENT_SCOPE)
+endfunction()
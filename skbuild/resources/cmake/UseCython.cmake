@@ -11,6 +11,13 @@
 #                     [EMBED_MAIN]
 #                     [C | CXX]
 #                     [PY2 | PY3]
+#                     [PROFILE]
+#                     [BUILD_PROFILE <Profile>]
+#                     [DIRECTIVES_PRESET <Preset>]
+#                     [DIRECTIVES <Directive>=<Value>...]
+#                     [SHARED_UTILITY <ModuleName> | NO_SHARED_UTILITY]
+#                     [LIMITED_API <Version>]
+#                     [FREETHREADING_COMPATIBLE]
 #                     [OUTPUT_VAR <OutputVar>])
 #
 # ``<Name>`` is the name of the new target, and ``<CythonInput>``
@@ -46,6 +53,44 @@
 #   version of Python found is 2.  Otherwise, Python-3 syntax and semantics are
 #   used.
 #
+# ``PROFILE``
+#   Build this target for profiling and line tracing, as with
+#   ``CYTHON_PROFILE``.
+#
+# ``BUILD_PROFILE <Profile>``
+#   Override ``CYTHON_BUILD_PROFILE`` for this target.
+#
+# ``DIRECTIVES_PRESET <Preset>``
+#   Compile with the directives of a preset defined with
+#   ``add_cython_directives_preset``, instead of the ``CYTHON_DIRECTIVES_PRESET``
+#   default.
+#
+# ``DIRECTIVES <Directive>=<Value>...``
+#   Compiler directives for this target, for example ``boundscheck=False``.
+#   They take precedence over the directives of the preset.
+#
+# ``SHARED_UTILITY <ModuleName> | NO_SHARED_UTILITY``
+#   Import the Cython utility code from the shared utility module with the
+#   fully qualified name ``<ModuleName>``, or include it in the generated
+#   source.  By default, the module defined by ``add_cython_shared_utility``,
+#   if any, is used.
+#
+# ``LIMITED_API <Version>``
+#   Compile the generated source against the Python limited API of the given
+#   Python version, such as ``3.9``: ``Py_LIMITED_API`` and
+#   ``CYTHON_LIMITED_API`` are defined for it.  Requires Cython 3.0 or newer.
+#   Pass the same version to ``python_extension_module`` for the module to get
+#   the ``.abi3`` suffix.  An empty ``<Version>`` is ignored, and so is the
+#   option for the free-threaded interpreters, which do not support the
+#   limited API.
+#
+# ``FREETHREADING_COMPATIBLE``
+#   Declare that the module does not rely on the GIL, with the
+#   ``freethreading_compatible`` directive, so that importing it in a
+#   free-threaded interpreter (Python 3.13t or newer) does not enable the GIL
+#   again.  The module must be thread-safe without the GIL.  Requires Cython
+#   3.1 or newer.
+#
 # ``OUTPUT_VAR <OutputVar>``
 #   Set the variable ``<OutputVar>`` in the parent scope to the path to the
 #   generated source file.  By default, ``<Name>`` is used as the output
@@ -56,14 +101,191 @@
 # ``<OutputVar>``
 #   The path of the generated source file.
 #
+# The directives of a target can be overridden for its source file with the
+# ``CYTHON_DIRECTIVES_PRESET`` and ``CYTHON_DIRECTIVES`` source file
+# properties, which is useful for the Cython sources of ``add_python_library``.
+# From the lowest to the highest precedence, the directives passed to Cython
+# come from the target preset, the ``DIRECTIVES`` argument, the source preset
+# and the ``CYTHON_DIRECTIVES`` source property.  Directives given in a
+# ``# cython:`` comment at the top of the source still override all of these.
+#
+# The effective directives are written to ``<OutputVar>.directives.json`` (for
+# example ``_module.c.directives.json``), with the target preset (``preset``),
+# the source preset (``source_preset``) and the origin of each directive, so
+# that they can be audited.
+#
+# Each module is also recorded in ``cython_dependencies.jsonl`` at the top of
+# the build tree, with the ``.pxd`` and ``.pxi`` files it depends on (or its
+# depfile, with ``CYTHON_USE_DEPFILE``).  Build the ``cython_dependency_graph``
+# target to write the dependency graph to ``cython_dependency_graph.json`` and
+# ``cython_dependency_graph.dot``, and print the files whose edits rebuild the
+# most modules, with the estimated recompile cost.  The cost is measured from
+# ``.ninja_log`` with the Ninja generator, so build the modules first.  The
+# same report is available with
+# ``python -m skbuild.resources.cmake.cython_fanout <build-dir>``.
+#
+# .. cmake:command:: add_cython_directives_preset
+#
+# Define a named set of compiler directives::
+#
+#   add_cython_directives_preset(<Name> [<Directive>=<Value>...])
+#
+# Names are case-insensitive.  The following presets are predefined:
+#
+# ``SAFE``
+#   No directives: the Cython defaults, with bounds, wraparound, and
+#   initialization checks.
+#
+# ``FAST``
+#   ``boundscheck=False``, ``wraparound=False``, ``initializedcheck=False``,
+#   ``nonecheck=False`` and ``cdivision=True``, for hot loops whose indices are
+#   known to be valid.
+#
+# .. cmake:command:: add_cython_shared_utility
+#
+# Create a custom rule to generate the source code of a Cython shared utility
+# module::
+#
+#   add_cython_shared_utility(<Name>
+#                             [MODULE_NAME <ModuleName>]
+#                             [C | CXX]
+#                             [OUTPUT_VAR <OutputVar>])
+#
+# By default, every Cython module includes its own copy of the utility code of
+# Cython (reference counting helpers, type conversions, memoryviews, ...).
+# With a shared utility module, this code is compiled once, in an extension
+# module of its own, and the modules import it at runtime, so that their
+# generated sources are smaller and compile faster.  Requires Cython 3.1 or
+# newer.
+#
+# The source is generated with ``cython --generate-shared``, and the path to it
+# is stored in ``<OutputVar>`` (``<Name>`` by default).  As with
+# ``add_cython_target``, no target is created: build it as an extension module
+# installed as ``<ModuleName>``, which defaults to ``<Name>`` in the package of
+# the current source directory (for example ``pkg._cyutility`` for
+# ``pkg/CMakeLists.txt``).  The ``add_cython_target`` calls that follow compile
+# their module with ``--shared=<ModuleName>``, unless they use
+# ``NO_SHARED_UTILITY``; call it before ``add_subdirectory`` for the modules of
+# subpackages.  Only one shared utility module can be defined.
+#
+# ``C | CXX``
+#   Force the generation of either a C or C++ file, as for
+#   ``add_cython_target``.
+#
+# .. code-block:: cmake
+#
+#   add_cython_shared_utility(_cyutility)
+#   add_python_extension(_cyutility SOURCES ${_cyutility})
+#
+#   add_cython_target(_module _module.pyx)
+#   add_python_extension(_module SOURCES ${_module})
+#
 # Cache variables that affect the behavior include:
 #
 # ``CYTHON_ANNOTATE``
-#   Whether to create an annotated .html file when compiling.
+#   Whether to create an annotated .html file when compiling.  Each module also
+#   gets a JSON summary, ``<OutputVar>.annotation.json``, listing for each
+#   function the number of lines interacting with the Python C-API and the sum
+#   of their Cython scores (the weighted number of C-API calls), with the
+#   functions ranked by score.  The summary is written by the ``cython``
+#   command, and is therefore only updated when the module is re-cythonized.
+#   Build the ``cython_annotation_report`` target after the extension modules
+#   to aggregate the summaries of the project into
+#   ``cython_annotation_report.json`` in the top-level binary directory, and
+#   print the functions with the highest scores.
 #
 # ``CYTHON_FLAGS``
 #   Additional flags to pass to the Cython compiler.
 #
+# ``CYTHON_PROFILE``
+#   Whether to build all the targets for ``cProfile`` and ``line_profiler``:
+#   the ``profile``, ``linetrace`` and ``binding`` directives are set (over any
+#   other directive, except those of ``# cython:`` comments), and the
+#   ``CYTHON_TRACE`` and ``CYTHON_TRACE_NOGIL`` compile definitions are set on
+#   the library compiling the generated source by ``python_extension_module``
+#   (or ``add_python_extension``), so that it is traced.  Tracing makes the modules much slower; when this is
+#   off (the default) and ``PROFILE`` is not given, none of this is added.  A
+#   traced module contains the ``skbuild-cython-trace`` marker string, so
+#   that a release check can reject it, for example with
+#   ``grep -c skbuild-cython-trace``; the origin of the directives is also
+#   ``profile`` in ``<OutputVar>.directives.json``.  Initialized from the
+#   ``SKBUILD_CYTHON_PROFILE`` environment variable.
+#
+# ``CYTHON_DIRECTIVES_PRESET``
+#   Name of the directives preset used by targets without a
+#   ``DIRECTIVES_PRESET``.  Empty by default.
+#
+# ``CYTHON_BUILD_PROFILE``
+#   Debug output and size of the generated sources.  One of:
+#
+#   ``DEBUG``
+#     Write the debug information used by ``cygdb`` (``--gdb``) and ``#line``
+#     directives pointing to the Cython sources (``--line-directives``).
+#
+#   ``RELEASE``
+#     Neither of these.
+#
+#   ``FAST``
+#     Like ``RELEASE``, and also leave out the Cython source lines quoted in
+#     comments (``-X emit_code_comments=False``) and the docstrings
+#     (``--no-docstrings``), for smaller sources that compile faster.  Note
+#     that the compiled module has no docstrings.
+#
+#   When empty (the default), ``DEBUG`` is used for the ``Debug`` and
+#   ``RelWithDebInfo`` build types, and ``RELEASE`` otherwise.  Setting it
+#   decouples the Cython output from ``CMAKE_BUILD_TYPE``, for example to
+#   avoid the large ``cygdb`` files in ``RelWithDebInfo`` builds.
+#
+# ``CYTHON_USE_DEPFILE``
+#   Whether to let Cython write a depfile (``--depfile``) listing the ``.pxd``
+#   and ``.pxi`` files each module depends on, instead of scanning for
+#   ``cimport`` and ``include`` statements when configuring.  The depfile is
+#   written at build time, so edits to transitively cimported files are picked
+#   up without reconfiguring.  Requires Cython 3.0 or newer and CMake 3.20
+#   (Ninja and Makefile generators) or 3.21 (other generators).  Off by
+#   default, so that the dependencies of existing projects are tracked as
+#   before; initialized from the ``SKBUILD_CYTHON_USE_DEPFILE`` environment
+#   variable.
+#
+# ``CYTHON_CACHE_DIR``
+#   Directory of a persistent cache of the sources generated by Cython, shared
+#   between build trees.  Initialized from the ``SKBUILD_CYTHON_CACHE_DIR``
+#   environment variable; caching is disabled when empty.  Entries are keyed on
+#   the contents of the ``.pyx`` file and of the ``.pxd``/``.pxi`` files it
+#   depends on, the Cython version and the Cython command line.  On a hit, the
+#   cached source is copied instead of running Cython, and an existing output
+#   with identical contents is left untouched so that it is not recompiled.
+#   Commands using ``--annotate`` or ``--gdb`` are not cached.  Run
+#   ``python cython_driver.py --cache-dir <dir> --show-stats`` (the script is
+#   installed next to this module) for hit and miss statistics.
+#
+# ``CYTHON_CACHE_MAX_SIZE``
+#   Size in megabytes above which the least recently used entries of
+#   ``CYTHON_CACHE_DIR`` are evicted.  Defaults to 512.
+#
+# ``CYTHON_COMPILE_SERVER``
+#   Whether to run Cython in a compile server shared by all the ``cython``
+#   commands, instead of starting a new interpreter and importing Cython for
+#   each module.  The server is started by the first command, forks a process
+#   for each module (so parallel builds are unaffected), and exits after being
+#   idle for 15 minutes.  Commands fall back to running Cython directly when
+#   the server cannot be used, for example when the interpreter found by
+#   CMake cannot import the same Cython version.  Initialized from the
+#   ``SKBUILD_CYTHON_COMPILE_SERVER`` environment variable; not available on
+#   Windows.
+#
+# ``CYTHON_RELATIVE_PATHS``
+#   Whether to give the ``cython`` commands the paths of the sources, of the
+#   include directories and of the output relative to their working directory
+#   (the current binary directory), when they are in the source or the binary
+#   directory of the project.  The command lines are then the same in every
+#   build tree, so that ``CYTHON_CACHE_DIR`` hits across them, for example
+#   across the temporary directories of isolated builds; the ``cygdb``
+#   information written by the ``DEBUG`` build profile keeps absolute paths.
+#   Initialized from the ``SKBUILD_CYTHON_RELATIVE_PATHS`` environment
+#   variable, or from ``PYTHON_EXTENSION_PATH_INDEPENDENT`` (see
+#   ``FindPythonExtensions``).
+#
 # Example usage
 # ^^^^^^^^^^^^^
 #
@@ -100,18 +322,273 @@ set(CYTHON_ANNOTATE OFF
 
 set(CYTHON_FLAGS "" CACHE STRING
     "Extra flags to the cython compiler.")
-mark_as_advanced(CYTHON_ANNOTATE CYTHON_FLAGS)
+
+set(_cython_profile_default OFF)
+if("$ENV{SKBUILD_CYTHON_PROFILE}")
+  set(_cython_profile_default ON)
+endif()
+set(CYTHON_PROFILE ${_cython_profile_default} CACHE BOOL
+    "Build Cython modules for profiling and line tracing (slow; not for release builds).")
+
+set(CYTHON_DIRECTIVES_PRESET "" CACHE STRING
+    "Default preset of Cython compiler directives (see add_cython_directives_preset).")
+
+set(_cython_build_profiles DEBUG RELEASE FAST)
+set(CYTHON_BUILD_PROFILE "" CACHE STRING
+    "Cython debug output and source size: DEBUG, RELEASE or FAST (empty to follow CMAKE_BUILD_TYPE).")
+set_property(CACHE CYTHON_BUILD_PROFILE PROPERTY STRINGS "" ${_cython_build_profiles})
+
+set(_cython_depfile_supported OFF)
+if(CYTHON_VERSION VERSION_GREATER_EQUAL "3.0")
+  if(CMAKE_VERSION VERSION_GREATER_EQUAL "3.21" OR
+     (CMAKE_VERSION VERSION_GREATER_EQUAL "3.20" AND
+      CMAKE_GENERATOR MATCHES "Ninja|Makefiles"))
+    set(_cython_depfile_supported ON)
+  endif()
+endif()
+set(_cython_use_depfile_default OFF)
+if("$ENV{SKBUILD_CYTHON_USE_DEPFILE}")
+  set(_cython_use_depfile_default ON)
+endif()
+set(CYTHON_USE_DEPFILE ${_cython_use_depfile_default} CACHE BOOL
+    "Track *.pxd/*.pxi dependencies with a depfile written by cython.")
+
+set(CYTHON_CACHE_DIR "$ENV{SKBUILD_CYTHON_CACHE_DIR}" CACHE PATH
+    "Directory caching the sources generated by cython (empty to disable).")
+set(CYTHON_CACHE_MAX_SIZE "512" CACHE STRING
+    "Maximum size of CYTHON_CACHE_DIR, in megabytes.")
+
+set(_cython_compile_server_default OFF)
+if("$ENV{SKBUILD_CYTHON_COMPILE_SERVER}")
+  set(_cython_compile_server_default ON)
+endif()
+set(CYTHON_COMPILE_SERVER ${_cython_compile_server_default} CACHE BOOL
+    "Run cython in a compile server instead of one process per module.")
+set(_cython_relative_paths_default OFF)
+if("$ENV{SKBUILD_CYTHON_RELATIVE_PATHS}" OR PYTHON_EXTENSION_PATH_INDEPENDENT)
+  set(_cython_relative_paths_default ON)
+endif()
+set(CYTHON_RELATIVE_PATHS ${_cython_relative_paths_default} CACHE BOOL
+    "Pass the project paths to cython relative to its working directory.")
+mark_as_advanced(CYTHON_ANNOTATE CYTHON_FLAGS CYTHON_PROFILE CYTHON_DIRECTIVES_PRESET
+                 CYTHON_BUILD_PROFILE CYTHON_USE_DEPFILE
+                 CYTHON_CACHE_DIR CYTHON_CACHE_MAX_SIZE CYTHON_COMPILE_SERVER
+                 CYTHON_RELATIVE_PATHS)
+
+include(PythonLimitedAPI)
+
+set(_cython_driver "${CMAKE_CURRENT_LIST_DIR}/cython_driver.py")
+set(_cython_annotation "${CMAKE_CURRENT_LIST_DIR}/cython_annotation.py")
+set(_cython_fanout "${CMAKE_CURRENT_LIST_DIR}/cython_fanout.py")
 
 set(CYTHON_CXX_EXTENSION "cxx")
 set(CYTHON_C_EXTENSION "c")
 
 get_property(languages GLOBAL PROPERTY ENABLED_LANGUAGES)
 
-function(add_cython_target _name)
-  set(options EMBED_MAIN C CXX PY2 PY3)
-  set(options1 OUTPUT_VAR)
+function(add_cython_directives_preset _name)
+  string(TOUPPER "${_name}" _name)
+  foreach(_directive ${ARGN})
+    if(NOT _directive MATCHES "^[A-Za-z_][A-Za-z0-9_.]*=")
+      message(FATAL_ERROR
+        "Invalid directive \"${_directive}\" in Cython directives preset "
+        "${_name}; expected <Directive>=<Value>")
+    endif()
+  endforeach()
+  set_property(GLOBAL PROPERTY _CYTHON_DIRECTIVES_PRESET_${_name} "${ARGN}")
+endfunction()
+
+add_cython_directives_preset(SAFE)
+add_cython_directives_preset(FAST
+  boundscheck=False wraparound=False initializedcheck=False nonecheck=False
+  cdivision=True)
+
+function(_cython_directives_preset _name _output_var)
+  string(TOUPPER "${_name}" _name)
+  get_property(_defined GLOBAL PROPERTY _CYTHON_DIRECTIVES_PRESET_${_name} SET)
+  if(NOT _defined)
+    message(FATAL_ERROR
+      "Unknown Cython directives preset \"${_name}\"; define it with "
+      "add_cython_directives_preset")
+  endif()
+  get_property(_directives GLOBAL PROPERTY _CYTHON_DIRECTIVES_PRESET_${_name})
+  set(${_output_var} "${_directives}" PARENT_SCOPE)
+endfunction()
+
+# Merge <Directive>=<Value> items into _directive_names, _directive_value_<name>
+# and _directive_origin_<name> of the caller.
+macro(_cython_merge_directives _origin)
+  foreach(_directive ${ARGN})
+    if(NOT _directive MATCHES "^([A-Za-z_][A-Za-z0-9_.]*)=(.*)$")
+      message(FATAL_ERROR
+        "Invalid Cython directive \"${_directive}\" (${_origin}); expected "
+        "<Directive>=<Value>")
+    endif()
+    set(_directive_name "${CMAKE_MATCH_1}")
+    if(NOT _directive_name IN_LIST _directive_names)
+      list(APPEND _directive_names "${_directive_name}")
+    endif()
+    set(_directive_value_${_directive_name} "${CMAKE_MATCH_2}")
+    set(_directive_origin_${_directive_name} "${_origin}")
+  endforeach()
+endmacro()
+
+# Set <_output_var> to the interpreter found by FindPython, FindPython3 or
+# FindPythonInterp (through FindPythonExtensions), or to an empty string.
+function(_cython_python_executable _output_var)
+  set(_python_executable "")
+  if(Python_EXECUTABLE)
+    set(_python_executable "${Python_EXECUTABLE}")
+  elseif(Python3_EXECUTABLE)
+    set(_python_executable "${Python3_EXECUTABLE}")
+  elseif(PYTHON_EXECUTABLE)
+    set(_python_executable "${PYTHON_EXECUTABLE}")
+  endif()
+  set(${_output_var} "${_python_executable}" PARENT_SCOPE)
+endfunction()
+
+# Add <_summary> to the summaries aggregated by the cython_annotation_report
+# target, creating the target with the first summary.
+function(_cython_add_annotation_summary _python_executable _summary)
+  if(NOT TARGET cython_annotation_report)
+    add_custom_target(cython_annotation_report
+      COMMAND "${_python_executable}" "${_cython_annotation}" report
+              --output "${CMAKE_BINARY_DIR}/cython_annotation_report.json"
+              "$<TARGET_PROPERTY:cython_annotation_report,CYTHON_ANNOTATION_SUMMARIES>"
+      COMMAND_EXPAND_LISTS
+      VERBATIM
+      COMMENT "Aggregating the Cython annotation summaries")
+  endif()
+  set_property(TARGET cython_annotation_report APPEND
+               PROPERTY CYTHON_ANNOTATION_SUMMARIES "${_summary}")
+endfunction()
+
+function(add_cython_shared_utility _name)
+  set(options C CXX)
+  set(options1 MODULE_NAME OUTPUT_VAR)
   cmake_parse_arguments(_args "${options}" "${options1}" "" ${ARGN})
 
+  if(CYTHON_VERSION VERSION_LESS "3.1")
+    message(FATAL_ERROR
+      "add_cython_shared_utility requires Cython >= 3.1 (found ${CYTHON_VERSION})")
+  endif()
+
+  set(_module_name "${_args_MODULE_NAME}")
+  if(NOT _module_name)
+    file(RELATIVE_PATH _package "${CMAKE_SOURCE_DIR}" "${CMAKE_CURRENT_SOURCE_DIR}")
+    string(REPLACE "/" "." _package "${_package}")
+    set(_module_name "${_name}")
+    if(_package)
+      set(_module_name "${_package}.${_name}")
+    endif()
+  endif()
+
+  get_property(_defined GLOBAL PROPERTY _CYTHON_SHARED_UTILITY)
+  if(_defined)
+    message(FATAL_ERROR
+      "Cannot define the Cython shared utility module ${_module_name}: "
+      "${_defined} is already defined")
+  endif()
+
+  if("C" IN_LIST languages)
+    set(_output_syntax "C")
+  elseif("CXX" IN_LIST languages)
+    set(_output_syntax "CXX")
+  else()
+    message(FATAL_ERROR "Either C or CXX must be enabled to use Cython")
+  endif()
+  if(_args_C)
+    set(_output_syntax "C")
+  endif()
+  if(_args_CXX)
+    set(_output_syntax "CXX")
+  endif()
+
+  # Named like the outputs of add_cython_target: without --output-file,
+  # cython would pick the .cpp extension for C++.
+  set(cxx_arg "")
+  set(extension "${CYTHON_C_EXTENSION}")
+  if(_output_syntax STREQUAL "CXX")
+    set(cxx_arg "--cplus")
+    set(extension "${CYTHON_CXX_EXTENSION}")
+  endif()
+
+  set(generated_file "${CMAKE_CURRENT_BINARY_DIR}/${_name}.${extension}")
+  set_source_files_properties(${generated_file} PROPERTIES GENERATED TRUE)
+
+  set(_output_var ${_name})
+  if(_args_OUTPUT_VAR)
+    set(_output_var ${_args_OUTPUT_VAR})
+  endif()
+  set(${_output_var} ${generated_file} PARENT_SCOPE)
+
+  file(RELATIVE_PATH generated_file_relative
+      ${CMAKE_BINARY_DIR} ${generated_file})
+
+  add_custom_command(OUTPUT ${generated_file}
+                     COMMAND ${CYTHON_EXECUTABLE}
+                     ARGS ${cxx_arg} --generate-shared=${generated_file}
+                          --output-file ${generated_file}
+                     DEPENDS ${CYTHON_EXECUTABLE}
+                     WORKING_DIRECTORY ${CMAKE_CURRENT_BINARY_DIR}
+                     COMMENT "Generating ${_output_syntax} source ${generated_file_relative} for ${_module_name}")
+
+  set_property(GLOBAL PROPERTY _CYTHON_SHARED_UTILITY "${_module_name}")
+endfunction()
+
+# Record a module in cython_dependencies.jsonl, creating the file and the
+# cython_dependency_graph target with the first module of the build tree.
+function(_cython_add_dependency_record _record)
+  set(_records_file "${CMAKE_BINARY_DIR}/cython_dependencies.jsonl")
+  get_property(_initialized GLOBAL PROPERTY _CYTHON_DEPENDENCY_RECORDS SET)
+  if(NOT _initialized)
+    set_property(GLOBAL PROPERTY _CYTHON_DEPENDENCY_RECORDS ON)
+    file(WRITE "${_records_file}" "")
+    _cython_python_executable(_python_executable)
+    if(_python_executable AND NOT TARGET cython_dependency_graph)
+      add_custom_target(cython_dependency_graph
+        COMMAND "${_python_executable}" "${_cython_fanout}" "${CMAKE_BINARY_DIR}"
+                --json "${CMAKE_BINARY_DIR}/cython_dependency_graph.json"
+                --dot "${CMAKE_BINARY_DIR}/cython_dependency_graph.dot"
+        VERBATIM
+        COMMENT "Analyzing the rebuild fan-out of the Cython .pxd files")
+    endif()
+  endif()
+  file(APPEND "${_records_file}" "${_record}\n")
+endfunction()
+
+function(_cython_json_string _value _output_var)
+  string(REPLACE "\\" "\\\\" _value "${_value}")
+  string(REPLACE "\"" "\\\"" _value "${_value}")
+  set(${_output_var} "\"${_value}\"" PARENT_SCOPE)
+endfunction()
+
+# Path given to a cython command: with CYTHON_RELATIVE_PATHS, the paths in the
+# source or the binary directory of the project are made relative to the
+# working directory of the command (the current binary directory).
+function(_cython_command_path _path _output_var)
+  set(_command_path "${_path}")
+  if(CYTHON_RELATIVE_PATHS)
+    foreach(_root "${CMAKE_SOURCE_DIR}" "${CMAKE_BINARY_DIR}")
+      string(FIND "${_path}/" "${_root}/" _index)
+      if(_index EQUAL 0)
+        file(RELATIVE_PATH _command_path "${CMAKE_CURRENT_BINARY_DIR}" "${_path}")
+        if(NOT _command_path)
+          set(_command_path ".")
+        endif()
+        break()
+      endif()
+    endforeach()
+  endif()
+  set(${_output_var} "${_command_path}" PARENT_SCOPE)
+endfunction()
+
+function(add_cython_target _name)
+  set(options EMBED_MAIN C CXX PY2 PY3 PROFILE NO_SHARED_UTILITY FREETHREADING_COMPATIBLE)
+  set(options1 BUILD_PROFILE DIRECTIVES_PRESET SHARED_UTILITY LIMITED_API OUTPUT_VAR)
+  set(multiValueArgs DIRECTIVES)
+  cmake_parse_arguments(_args "${options}" "${options1}" "${multiValueArgs}" ${ARGN})
+
   list(GET _args_UNPARSED_ARGUMENTS 0 _arg0)
 
   # if provided, use _arg0 as the input file path
@@ -179,6 +656,15 @@ function(add_cython_target _name)
     set(extension "cxx")
   endif()
 
+  get_property(_shared_utility GLOBAL PROPERTY _CYTHON_SHARED_UTILITY)
+  if(_args_SHARED_UTILITY)
+    set(_shared_utility "${_args_SHARED_UTILITY}")
+  endif()
+  set(shared_utility_arg "")
+  if(_shared_utility AND NOT _args_NO_SHARED_UTILITY)
+    set(shared_utility_arg "--shared=${_shared_utility}")
+  endif()
+
   set(py_version_arg "")
   if(_input_syntax STREQUAL "PY2")
     set(py_version_arg "-2")
@@ -209,135 +695,273 @@ function(add_cython_target _name)
                          INCLUDE_DIRECTORIES)
   list(APPEND cython_include_directories ${cmake_include_directories})
 
-  # Determine dependencies.
-  # Add the pxd file with the same basename as the given pyx file.
   get_source_file_property(pyx_location ${_source_file} LOCATION)
   get_filename_component(pyx_path ${pyx_location} PATH)
-  get_filename_component(pyx_file_basename ${_source_file} NAME_WE)
-  unset(corresponding_pxd_file CACHE)
-  find_file(corresponding_pxd_file ${pyx_file_basename}.pxd
-            PATHS "${pyx_path}" ${cmake_include_directories}
-            NO_DEFAULT_PATH)
-  if(corresponding_pxd_file)
-    list(APPEND pxd_dependencies "${corresponding_pxd_file}")
-  endif()
-
-  # pxd files to check for additional dependencies
-  set(pxds_to_check "${_source_file}" "${pxd_dependencies}")
-  set(pxds_checked "")
-  set(number_pxds_to_check 1)
-  while(number_pxds_to_check GREATER 0)
-    foreach(pxd ${pxds_to_check})
-      list(APPEND pxds_checked "${pxd}")
-      list(REMOVE_ITEM pxds_to_check "${pxd}")
-
-      # look for C headers
-      file(STRINGS "${pxd}" extern_from_statements
-           REGEX "cdef[ ]+extern[ ]+from.*$")
-      foreach(statement ${extern_from_statements})
-        # Had trouble getting the quote in the regex
-        string(REGEX REPLACE
-               "cdef[ ]+extern[ ]+from[ ]+[\"]([^\"]+)[\"].*" "\\1"
-               header "${statement}")
-        unset(header_location CACHE)
-        find_file(header_location ${header} PATHS ${cmake_include_directories})
-        if(header_location)
-          list(FIND c_header_dependencies "${header_location}" header_idx)
-          if(${header_idx} LESS 0)
-            list(APPEND c_header_dependencies "${header_location}")
-          endif()
-        endif()
-      endforeach()
 
-      # check for pxd dependencies
-      # Look for cimport statements.
-      set(module_dependencies "")
-      file(STRINGS "${pxd}" cimport_statements REGEX cimport)
-      foreach(statement ${cimport_statements})
-        if(${statement} MATCHES from)
+  if(CYTHON_USE_DEPFILE AND NOT _cython_depfile_supported)
+    message(FATAL_ERROR
+      "CYTHON_USE_DEPFILE requires Cython >= 3.0 (found ${CYTHON_VERSION}) "
+      "and CMake >= 3.20 with a Ninja or Makefile generator, or CMake >= 3.21")
+  endif()
+
+  # With a depfile, cython reports the dependencies itself at build time.
+  if(NOT CYTHON_USE_DEPFILE)
+    # Determine dependencies.
+    # Add the pxd file with the same basename as the given pyx file.
+    get_filename_component(pyx_file_basename ${_source_file} NAME_WE)
+    unset(corresponding_pxd_file CACHE)
+    find_file(corresponding_pxd_file ${pyx_file_basename}.pxd
+              PATHS "${pyx_path}" ${cmake_include_directories}
+              NO_DEFAULT_PATH)
+    if(corresponding_pxd_file)
+      list(APPEND pxd_dependencies "${corresponding_pxd_file}")
+    endif()
+
+    # pxd files to check for additional dependencies
+    set(pxds_to_check "${_source_file}" "${pxd_dependencies}")
+    set(pxds_checked "")
+    set(number_pxds_to_check 1)
+    while(number_pxds_to_check GREATER 0)
+      foreach(pxd ${pxds_to_check})
+        list(APPEND pxds_checked "${pxd}")
+        list(REMOVE_ITEM pxds_to_check "${pxd}")
+
+        # look for C headers
+        file(STRINGS "${pxd}" extern_from_statements
+             REGEX "cdef[ ]+extern[ ]+from.*$")
+        foreach(statement ${extern_from_statements})
+          # Had trouble getting the quote in the regex
           string(REGEX REPLACE
-                 "from[ ]+([^ ]+).*" "\\1"
-                 module "${statement}")
-        else()
+                 "cdef[ ]+extern[ ]+from[ ]+[\"]([^\"]+)[\"].*" "\\1"
+                 header "${statement}")
+          unset(header_location CACHE)
+          find_file(header_location ${header} PATHS ${cmake_include_directories})
+          if(header_location)
+            list(FIND c_header_dependencies "${header_location}" header_idx)
+            if(${header_idx} LESS 0)
+              list(APPEND c_header_dependencies "${header_location}")
+            endif()
+          endif()
+        endforeach()
+
+        # check for pxd dependencies
+        # Look for cimport statements.
+        set(module_dependencies "")
+        file(STRINGS "${pxd}" cimport_statements REGEX cimport)
+        foreach(statement ${cimport_statements})
+          if(${statement} MATCHES from)
+            string(REGEX REPLACE
+                   "from[ ]+([^ ]+).*" "\\1"
+                   module "${statement}")
+          else()
+            string(REGEX REPLACE
+                   "cimport[ ]+([^ ]+).*" "\\1"
+                   module "${statement}")
+          endif()
+          list(APPEND module_dependencies ${module})
+        endforeach()
+
+        # check for pxi dependencies
+        # Look for include statements.
+        set(include_dependencies "")
+        file(STRINGS "${pxd}" include_statements REGEX include)
+        foreach(statement ${include_statements})
           string(REGEX REPLACE
-                 "cimport[ ]+([^ ]+).*" "\\1"
+                 "include[ ]+[\"]([^\"]+)[\"].*" "\\1"
                  module "${statement}")
-        endif()
-        list(APPEND module_dependencies ${module})
-      endforeach()
+          list(APPEND include_dependencies ${module})
+        endforeach()
 
-      # check for pxi dependencies
-      # Look for include statements.
-      set(include_dependencies "")
-      file(STRINGS "${pxd}" include_statements REGEX include)
-      foreach(statement ${include_statements})
-        string(REGEX REPLACE
-               "include[ ]+[\"]([^\"]+)[\"].*" "\\1"
-               module "${statement}")
-        list(APPEND include_dependencies ${module})
-      endforeach()
+        list(REMOVE_DUPLICATES module_dependencies)
+        list(REMOVE_DUPLICATES include_dependencies)
 
-      list(REMOVE_DUPLICATES module_dependencies)
-      list(REMOVE_DUPLICATES include_dependencies)
-
-      # Add modules to the files to check, if appropriate.
-      foreach(module ${module_dependencies})
-        unset(pxd_location CACHE)
-        find_file(pxd_location ${module}.pxd
-                  PATHS "${pyx_path}" ${cmake_include_directories}
-                  NO_DEFAULT_PATH)
-        if(pxd_location)
-          list(FIND pxds_checked ${pxd_location} pxd_idx)
-          if(${pxd_idx} LESS 0)
-            list(FIND pxds_to_check ${pxd_location} pxd_idx)
+        # Add modules to the files to check, if appropriate.
+        foreach(module ${module_dependencies})
+          unset(pxd_location CACHE)
+          find_file(pxd_location ${module}.pxd
+                    PATHS "${pyx_path}" ${cmake_include_directories}
+                    NO_DEFAULT_PATH)
+          if(pxd_location)
+            list(FIND pxds_checked ${pxd_location} pxd_idx)
             if(${pxd_idx} LESS 0)
-              list(APPEND pxds_to_check ${pxd_location})
-              list(APPEND pxd_dependencies ${pxd_location})
-            endif() # if it is not already going to be checked
-          endif() # if it has not already been checked
-        endif() # if pxd file can be found
-      endforeach() # for each module dependency discovered
-
-      # Add includes to the files to check, if appropriate.
-      foreach(_include ${include_dependencies})
-        unset(pxi_location CACHE)
-        find_file(pxi_location ${_include}
-                  PATHS "${pyx_path}" ${cmake_include_directories}
-                  NO_DEFAULT_PATH)
-        if(pxi_location)
-          list(FIND pxds_checked ${pxi_location} pxd_idx)
-          if(${pxd_idx} LESS 0)
-            list(FIND pxds_to_check ${pxi_location} pxd_idx)
+              list(FIND pxds_to_check ${pxd_location} pxd_idx)
+              if(${pxd_idx} LESS 0)
+                list(APPEND pxds_to_check ${pxd_location})
+                list(APPEND pxd_dependencies ${pxd_location})
+              endif() # if it is not already going to be checked
+            endif() # if it has not already been checked
+          endif() # if pxd file can be found
+        endforeach() # for each module dependency discovered
+
+        # Add includes to the files to check, if appropriate.
+        foreach(_include ${include_dependencies})
+          unset(pxi_location CACHE)
+          find_file(pxi_location ${_include}
+                    PATHS "${pyx_path}" ${cmake_include_directories}
+                    NO_DEFAULT_PATH)
+          if(pxi_location)
+            list(FIND pxds_checked ${pxi_location} pxd_idx)
             if(${pxd_idx} LESS 0)
-              list(APPEND pxds_to_check ${pxi_location})
-              list(APPEND pxd_dependencies ${pxi_location})
-            endif() # if it is not already going to be checked
-          endif() # if it has not already been checked
-        endif() # if include file can be found
-      endforeach() # for each include dependency discovered
-    endforeach() # for each include file to check
+              list(FIND pxds_to_check ${pxi_location} pxd_idx)
+              if(${pxd_idx} LESS 0)
+                list(APPEND pxds_to_check ${pxi_location})
+                list(APPEND pxd_dependencies ${pxi_location})
+              endif() # if it is not already going to be checked
+            endif() # if it has not already been checked
+          endif() # if include file can be found
+        endforeach() # for each include dependency discovered
+      endforeach() # for each include file to check
 
-    list(LENGTH pxds_to_check number_pxds_to_check)
-  endwhile()
+      list(LENGTH pxds_to_check number_pxds_to_check)
+    endwhile()
+  endif()
 
   # Set additional flags.
   set(annotate_arg "")
+  set(annotation_outputs "")
+  set(annotation_command "")
   if(CYTHON_ANNOTATE)
     set(annotate_arg "--annotate")
+
+    # Summarize the HTML written next to the generated file in the same
+    # command, so that the summary is only updated when Cython runs.
+    _cython_python_executable(_python_executable)
+    if(_python_executable)
+      set(annotation_summary "${generated_file}.annotation.json")
+      set(annotation_outputs "${annotation_summary}")
+      set(annotation_command
+          COMMAND "${_python_executable}" "${_cython_annotation}" summarize
+                  "${CMAKE_CURRENT_BINARY_DIR}/${_name}.html"
+                  --source "${pyx_location}" --name "${_name}"
+                  --output "${annotation_summary}")
+      _cython_add_annotation_summary("${_python_executable}" "${annotation_summary}")
+    else()
+      message(WARNING
+        "No Python interpreter found; the annotation summary of ${_name} is "
+        "not generated.  Call find_package(PythonExtensions) or "
+        "find_package(Python) first.")
+    endif()
+  endif()
+
+  set(_build_profile "${CYTHON_BUILD_PROFILE}")
+  if(_args_BUILD_PROFILE)
+    set(_build_profile "${_args_BUILD_PROFILE}")
+  endif()
+  string(TOUPPER "${_build_profile}" _build_profile)
+  if(NOT _build_profile)
+    if(CMAKE_BUILD_TYPE STREQUAL "Debug" OR
+       CMAKE_BUILD_TYPE STREQUAL "RelWithDebInfo")
+      set(_build_profile "DEBUG")
+    else()
+      set(_build_profile "RELEASE")
+    endif()
+  elseif(NOT _build_profile IN_LIST _cython_build_profiles)
+    message(FATAL_ERROR
+      "Unknown Cython build profile \"${_build_profile}\" for ${_name}; "
+      "expected one of: ${_cython_build_profiles}")
   endif()
 
   set(cython_debug_arg "")
   set(line_directives_arg "")
-  if(CMAKE_BUILD_TYPE STREQUAL "Debug" OR
-     CMAKE_BUILD_TYPE STREQUAL "RelWithDebInfo")
+  set(lean_output_args "")
+  if(_build_profile STREQUAL "DEBUG")
     set(cython_debug_arg "--gdb")
     set(line_directives_arg "--line-directives")
+  elseif(_build_profile STREQUAL "FAST")
+    set(lean_output_args "--no-docstrings" "-X" "emit_code_comments=False")
+  endif()
+
+  # Compiler directives, from the lowest to the highest precedence.
+  set(_directive_names "")
+  set(_preset "${CYTHON_DIRECTIVES_PRESET}")
+  if(_args_DIRECTIVES_PRESET)
+    set(_preset "${_args_DIRECTIVES_PRESET}")
+  endif()
+  if(_preset)
+    string(TOUPPER "${_preset}" _preset)
+    _cython_directives_preset("${_preset}" _preset_directives)
+    _cython_merge_directives("preset ${_preset}" ${_preset_directives})
+  endif()
+  _cython_merge_directives("target" ${_args_DIRECTIVES})
+  get_source_file_property(_source_preset ${_source_file} CYTHON_DIRECTIVES_PRESET)
+  if(_source_preset)
+    string(TOUPPER "${_source_preset}" _source_preset)
+    _cython_directives_preset("${_source_preset}" _preset_directives)
+    _cython_merge_directives("source preset ${_source_preset}" ${_preset_directives})
+  else()
+    set(_source_preset "")
+  endif()
+  get_source_file_property(_source_directives ${_source_file} CYTHON_DIRECTIVES)
+  if(_source_directives)
+    _cython_merge_directives("source" ${_source_directives})
+  endif()
+
+  # Profiling and line tracing: the directives make Cython generate the
+  # tracing code, which the CYTHON_TRACE definitions compile in.
+  set(_profile OFF)
+  if(CYTHON_PROFILE OR _args_PROFILE)
+    set(_profile ON)
+    _cython_merge_directives("profile" profile=True linetrace=True binding=True)
+    # Read by python_extension_module, which can run in another directory.
+    set_property(GLOBAL APPEND PROPERTY _CYTHON_TRACED_SOURCES "${generated_file}")
+  endif()
+
+  # Limited API: the generated code only uses the stable ABI of the version.
+  if(_args_LIMITED_API)
+    if(CYTHON_VERSION VERSION_LESS "3.0")
+      message(FATAL_ERROR
+        "LIMITED_API requires Cython >= 3.0 (found ${CYTHON_VERSION})")
+    endif()
+    python_limited_api_hex("${_args_LIMITED_API}" _limited_api_hex)
+    if(_limited_api_hex)
+      set_property(SOURCE ${generated_file} APPEND PROPERTY
+                   COMPILE_DEFINITIONS Py_LIMITED_API=${_limited_api_hex} CYTHON_LIMITED_API=1)
+    endif()
+  endif()
+
+  # Free threading: the module sets the Py_mod_gil slot to Py_MOD_GIL_NOT_USED.
+  if(_args_FREETHREADING_COMPATIBLE)
+    if(CYTHON_VERSION VERSION_LESS "3.1")
+      message(FATAL_ERROR
+        "FREETHREADING_COMPATIBLE requires Cython >= 3.1 (found ${CYTHON_VERSION})")
+    endif()
+    _cython_merge_directives("freethreading" freethreading_compatible=True)
+  endif()
+
+  set(directive_args "")
+  set(_json_directives "")
+  foreach(_directive_name ${_directive_names})
+    set(_value "${_directive_value_${_directive_name}}")
+    list(APPEND directive_args "-X" "${_directive_name}=${_value}")
+    _cython_json_string("${_value}" _json_value)
+    _cython_json_string("${_directive_origin_${_directive_name}}" _json_origin)
+    list(APPEND _json_directives
+         "    \"${_directive_name}\": {\"value\": ${_json_value}, \"origin\": ${_json_origin}}")
+  endforeach()
+  string(REPLACE ";" ",\n" _json_directives "${_json_directives}")
+  if(_json_directives)
+    set(_json_directives "\n${_json_directives}\n  ")
+  endif()
+  _cython_json_string("${pyx_location}" _json_source)
+  _cython_json_string("${generated_file}" _json_output)
+  set(_json_preset "null")
+  if(_preset)
+    _cython_json_string("${_preset}" _json_preset)
+  endif()
+  set(_json_source_preset "null")
+  if(_source_preset)
+    _cython_json_string("${_source_preset}" _json_source_preset)
   endif()
+  file(WRITE "${generated_file}.directives.json"
+       "{\n  \"source\": ${_json_source},\n  \"output\": ${_json_output},\n"
+       "  \"preset\": ${_json_preset},\n  \"source_preset\": ${_json_source_preset},\n"
+       "  \"directives\": {${_json_directives}}\n}\n")
 
   # Include directory arguments.
   list(REMOVE_DUPLICATES cython_include_directories)
   set(include_directory_arg "")
   foreach(_include_dir ${cython_include_directories})
+    _cython_command_path("${_include_dir}" _include_dir)
     set(include_directory_arg
         ${include_directory_arg} "--include-dir" "${_include_dir}")
   endforeach()
@@ -345,21 +969,101 @@ function(add_cython_target _name)
   list(REMOVE_DUPLICATES pxd_dependencies)
   list(REMOVE_DUPLICATES c_header_dependencies)
 
+  # Record the module for the dependency graph.
+  set(_json_dependencies "")
+  foreach(_dependency ${pxd_dependencies})
+    _cython_json_string("${_dependency}" _json_dependency)
+    list(APPEND _json_dependencies "${_json_dependency}")
+  endforeach()
+  string(REPLACE ";" ", " _json_dependencies "${_json_dependencies}")
+  _cython_json_string("${_name}" _json_name)
+  set(_json_depfile "null")
+  if(CYTHON_USE_DEPFILE)
+    _cython_json_string("${generated_file}.dep" _json_depfile)
+  endif()
+  string(CONCAT _record
+         "{\"name\": ${_json_name}, \"source\": ${_json_source}, "
+         "\"output\": ${_json_output}, \"depfile\": ${_json_depfile}, "
+         "\"dependencies\": [${_json_dependencies}]}")
+  _cython_add_dependency_record("${_record}")
+
   string(REGEX REPLACE " " ";" CYTHON_FLAGS_LIST "${CYTHON_FLAGS}")
 
+  # Route the command through the driver script when caching, using the
+  # compile server or marking a traced build.
+  set(_use_compile_server OFF)
+  if(CYTHON_COMPILE_SERVER AND NOT WIN32)
+    set(_use_compile_server ON)
+  endif()
+  set(cython_launcher "")
+  if(CYTHON_CACHE_DIR OR _use_compile_server OR _profile)
+    _cython_python_executable(_python_executable)
+    if(NOT _python_executable)
+      message(FATAL_ERROR
+        "CYTHON_CACHE_DIR, CYTHON_COMPILE_SERVER and CYTHON_PROFILE require a "
+        "Python interpreter; call find_package(PythonExtensions) or "
+        "find_package(Python) first")
+    endif()
+    set(cython_launcher "${_python_executable}" "${_cython_driver}"
+        --cython-version "${CYTHON_VERSION}")
+    if(CYTHON_CACHE_DIR)
+      list(APPEND cython_launcher
+           --cache-dir "${CYTHON_CACHE_DIR}"
+           --cache-max-size "${CYTHON_CACHE_MAX_SIZE}")
+      foreach(_dependency ${pxd_dependencies})
+        list(APPEND cython_launcher --dep "${_dependency}")
+      endforeach()
+    endif()
+    if(_use_compile_server)
+      list(APPEND cython_launcher --server)
+    endif()
+    if(_profile)
+      list(APPEND cython_launcher
+           --marker "skbuild-cython-trace:${_name}")
+    endif()
+    list(APPEND cython_launcher --)
+  endif()
+
+  if(CYTHON_USE_DEPFILE)
+    # Cython writes the depfile next to the output, with paths relative to its
+    # working directory (the current binary directory). CMP0116 makes CMake
+    # interpret them that way for every generator.
+    set(depfile_arg "--depfile")
+    set(dependency_args DEPENDS ${_source_file}
+                        DEPFILE ${generated_file}.dep)
+    if(POLICY CMP0116)
+      cmake_policy(PUSH)
+      cmake_policy(SET CMP0116 NEW)
+    endif()
+  else()
+    set(depfile_arg "")
+    set(dependency_args DEPENDS ${_source_file}
+                                ${pxd_dependencies}
+                        IMPLICIT_DEPENDS ${_output_syntax}
+                                         ${c_header_dependencies})
+  endif()
+
+  _cython_command_path("${pyx_location}" pyx_command_path)
+  _cython_command_path("${generated_file}" generated_command_path)
+
   # Add the command to run the compiler.
-  add_custom_command(OUTPUT ${generated_file}
-                     COMMAND ${CYTHON_EXECUTABLE}
+  add_custom_command(OUTPUT ${generated_file} ${annotation_outputs}
+                     COMMAND ${cython_launcher} ${CYTHON_EXECUTABLE}
                      ARGS ${cxx_arg} ${include_directory_arg} ${py_version_arg}
                           ${embed_arg} ${annotate_arg} ${cython_debug_arg}
-                          ${line_directives_arg} ${CYTHON_FLAGS_LIST} ${pyx_location}
-                          --output-file ${generated_file}
-                     DEPENDS ${_source_file}
-                             ${pxd_dependencies}
-                     IMPLICIT_DEPENDS ${_output_syntax}
-                                      ${c_header_dependencies}
+                          ${line_directives_arg} ${lean_output_args}
+                          ${shared_utility_arg} ${depfile_arg}
+                          ${CYTHON_FLAGS_LIST} ${directive_args} ${pyx_command_path}
+                          --output-file ${generated_command_path}
+                     ${annotation_command}
+                     ${dependency_args}
+                     WORKING_DIRECTORY ${CMAKE_CURRENT_BINARY_DIR}
                      COMMENT ${comment})
 
+  if(CYTHON_USE_DEPFILE AND POLICY CMP0116)
+    cmake_policy(POP)
+  endif()
+
   # NOTE(opadron): I thought about making a proper target, but after trying it
   # out, I decided that it would be far too convenient to use the same name as
   # the target for the extension module (e.g.: for single-file modules):
@@ -14,7 +14,47 @@
 #                      SOURCES [source1 [source2 ...]]
 #                      [INCLUDE_DIRECTORIES [dir1 [dir2 ...]]
 #                      [LINK_LIBRARIES [lib1 [lib2 ...]]
-#                      [DEPENDS [source1 [source2 ...]]])
+#                      [DEPENDS [source1 [source2 ...]]]
+#                      [PROFILE]
+#                      [LIMITED_API <Version>]
+#                      [FREETHREADING_COMPATIBLE]
+#                      [IPO | NO_IPO]
+#                      [OPENMP]
+#                      [CPU_DISPATCH <target>...
+#                       CPU_DISPATCH_SOURCES <source>...])
+#
+# ``PROFILE`` builds the Cython sources for profiling and line tracing (see
+# ``add_cython_target``).
+#
+# ``LIMITED_API <Version>`` builds the library against the Python limited API
+# of the given version, such as ``3.9``, including its Cython sources (see
+# ``python_extension_module``).
+#
+# ``FREETHREADING_COMPATIBLE`` declares that the Cython sources do not rely on
+# the GIL, so that the free-threaded interpreters keep it disabled when they
+# import the module (see ``add_cython_target``).
+#
+# ``IPO`` builds the library with interprocedural optimization (link-time
+# optimization, or LTO), and ``NO_IPO`` without it; by default,
+# ``PYTHON_EXTENSION_IPO`` decides.  It applies to all the sources of the
+# library, including the sources generated by Cython and F2PY, and the library
+# is linked to a copy of the F2PY runtime library built with it, so that the
+# whole module is optimized together.  IPO is only enabled if
+# ``check_ipo_supported`` succeeds for the enabled C, C++ and Fortran
+# languages: otherwise, a warning is issued and the library is built without
+# it.  The check runs once per build tree.
+#
+# ``OPENMP`` compiles all the sources of the library with OpenMP, including
+# the sources generated by Cython (for ``prange``) and the CPU dispatch
+# variants, and links it with the OpenMP runtime, for the enabled C, C++ and
+# Fortran languages.  If OpenMP is not found for one of them, a warning is
+# issued and its sources are built without it.  The
+# ``python -m skbuild.resources.cmake.openmp_scaling`` command checks that the
+# built extensions actually scale with the number of threads.
+#
+# ``CPU_DISPATCH`` and ``CPU_DISPATCH_SOURCES`` compile the given C or C++
+# sources once per CPU target and for the baseline, and select the best variant
+# for the CPU when the module is loaded (see ``python_cpu_dispatch``).
 #
 #
 # Example usage
@@ -44,7 +84,31 @@
 #                        SOURCES [source1 [source2 ...]]
 #                        [INCLUDE_DIRECTORIES [dir1 [dir2 ...]]
 #                        [LINK_LIBRARIES [lib1 [lib2 ...]]
-#                        [DEPENDS [source1 [source2 ...]]])
+#                        [DEPENDS [source1 [source2 ...]]]
+#                        [PROFILE]
+#                        [LIMITED_API <Version>]
+#                        [FREETHREADING_COMPATIBLE]
+#                        [IPO | NO_IPO]
+#                        [OPENMP]
+#                        [LEAN]
+#                        [SPLIT_DEBUG]
+#                        [LINKER <Linker>]
+#                        [CPU_DISPATCH <target>...
+#                         CPU_DISPATCH_SOURCES <source>...])
+#
+# With ``LIMITED_API``, the extension is named with the ``.abi3`` suffix and
+# can be imported by the given version of Python and the newer ones.  For
+# example, to build for the stable ABI when scikit-build-core is asked to:
+#
+# .. code-block:: cmake
+#
+#   add_python_extension(_speedups SOURCES _speedups.pyx
+#                        LIMITED_API "${SKBUILD_SABI_VERSION}")
+#
+# ``LEAN`` links the extension with the size and load-time profile of
+# ``python_extension_module``, ``SPLIT_DEBUG`` moves its debug information out
+# of the installed module, and ``LINKER`` links it with mold or lld (see
+# ``python_extension_module``).
 #
 #
 # Example usage
@@ -62,6 +126,106 @@
 #      INCLUDE_DIRECTORIES ARPACK/SRC
 #    )
 #
+# .. cmake:command:: python_cpu_dispatch
+#
+# Compile C or C++ sources of a target once per CPU target, in addition to the
+# baseline of the compiler, and add a dispatcher that selects the best variant
+# the CPU supports, like the dispatch of NumPy.  The baseline runs on any CPU
+# of the architecture.
+#
+#   python_cpu_dispatch(<Target>
+#                       SOURCES <source>...
+#                       TARGETS <target>...)
+#
+# The targets are the x86-64 micro-architecture levels ``x86-64-v2``,
+# ``x86-64-v3`` and ``x86-64-v4``, or the feature sets ``AVX2`` (with FMA) and
+# ``AVX512`` (the F, CD, BW, DQ and VL extensions).  They are listed from the
+# most widely supported to the most specific, and tried in the reverse order.
+# They are compiled with the ``-m`` flags of GCC and Clang, or the ``/arch``
+# flags of MSVC.  On other architectures and compilers, only the baseline is
+# built.
+#
+# The variants are compiled with the include directories and the compile
+# definitions of ``<Target>``, and the ``SKBUILD_CPU_DISPATCH_SUFFIX``
+# definition.  The ``skbuild_cpu_dispatch.h`` header defines:
+#
+# ``SKBUILD_CPU_DISPATCH_CURFX(name)``
+#   The name of a function in the variant being compiled, in the dispatched
+#   sources.
+#
+# ``SKBUILD_CPU_DISPATCH_DECLARE(ret, name, params)``
+#   Declare all the variants of a function.
+#
+# ``SKBUILD_CPU_DISPATCH_CALL(name, args)``
+#   Call the variant of a function selected for the CPU.
+#
+# ``SKBUILD_CPU_DISPATCH_NAME()``
+#   The name of the selected target, or ``baseline``.
+#
+# The variant is selected when the module is loaded (on the first call with
+# MSVC).  The ``SKBUILD_CPU_DISPATCH`` environment variable can name a target,
+# or ``baseline``, to skip the better ones, for testing and benchmarking.
+#
+# Cython sources call the dispatched functions through a C function of the
+# target, declared in a header:
+#
+# .. code-block:: c
+#
+#   /* kernel.c, compiled once per variant */
+#   #include "skbuild_cpu_dispatch.h"
+#   double SKBUILD_CPU_DISPATCH_CURFX(kernel_sum)(const double *x, long n) {
+#     /* ... */
+#   }
+#
+#   /* kernel_dispatch.c, compiled once */
+#   #include "skbuild_cpu_dispatch.h"
+#   SKBUILD_CPU_DISPATCH_DECLARE(double, kernel_sum, (const double *x, long n));
+#   double sum(const double *x, long n) {
+#     return SKBUILD_CPU_DISPATCH_CALL(kernel_sum, (x, n));
+#   }
+#
+# .. code-block:: cmake
+#
+#   add_python_extension(_kernels
+#                        SOURCES _kernels.pyx kernel_dispatch.c
+#                        CPU_DISPATCH x86-64-v2 x86-64-v3 x86-64-v4
+#                        CPU_DISPATCH_SOURCES kernel.c)
+#
+# Cache variables that affect the behavior include:
+#
+# ``PYTHON_EXTENSION_IPO``
+#   Whether to build the targets of ``add_python_library`` and
+#   ``add_python_extension`` without ``IPO`` or ``NO_IPO`` with
+#   interprocedural optimization.  Initialized from the
+#   ``SKBUILD_PYTHON_EXTENSION_IPO`` environment variable, off otherwise.
+#
+# ``PYTHON_EXTENSION_PGO``
+#   Profile-guided optimization of the targets of ``add_python_library`` and
+#   ``add_python_extension``, with GCC or Clang.  One of:
+#
+#   ``GENERATE``
+#     Instrument the targets, so that running them writes profiles to
+#     ``PYTHON_EXTENSION_PGO_DIR`` (``-fprofile-generate``).
+#
+#   ``USE``
+#     Optimize the targets with the profiles of ``PYTHON_EXTENSION_PGO_DIR``
+#     (``-fprofile-use``).  With Clang, the ``.profraw`` files must first be
+#     merged into ``default.profdata`` with ``llvm-profdata``.  If there is no
+#     profile, a warning is issued and the targets are built without them.
+#
+#   An empty value (the default) disables it.  Initialized from the
+#   ``SKBUILD_PYTHON_EXTENSION_PGO`` environment variable.  The
+#   ``python -m skbuild.resources.cmake.pgo`` command runs the whole workflow
+#   for a ``setup.py`` project: an instrumented in-place build, a training
+#   command, and the optimized build, reusing the profiles until the sources
+#   change.
+#
+# ``PYTHON_EXTENSION_PGO_DIR``
+#   The directory of the profiles.  Initialized from the
+#   ``SKBUILD_PYTHON_EXTENSION_PGO_DIR`` environment variable, or
+#   ``<build-dir>/pgo``.  The profiles of GCC 11 or newer are named relative to
+#   the build tree, so that they can be used by another build tree.
+#
 #
 #=============================================================================
 # Copyright 2011 Kitware, Inc.
@@ -79,15 +243,374 @@
 # limitations under the License.
 #=============================================================================
 
+set(_python_extension_ipo_default OFF)
+if("$ENV{SKBUILD_PYTHON_EXTENSION_IPO}")
+  set(_python_extension_ipo_default ON)
+endif()
+set(PYTHON_EXTENSION_IPO ${_python_extension_ipo_default} CACHE BOOL
+    "Build the Python extensions with interprocedural (link-time) optimization.")
+mark_as_advanced(PYTHON_EXTENSION_IPO)
+
+set(PYTHON_EXTENSION_PGO "$ENV{SKBUILD_PYTHON_EXTENSION_PGO}" CACHE STRING
+    "Profile-guided optimization of the Python extensions: GENERATE, USE or empty.")
+set_property(CACHE PYTHON_EXTENSION_PGO PROPERTY STRINGS "" GENERATE USE)
+set(_python_extension_pgo_dir_default "$ENV{SKBUILD_PYTHON_EXTENSION_PGO_DIR}")
+if(NOT _python_extension_pgo_dir_default)
+  set(_python_extension_pgo_dir_default "${CMAKE_BINARY_DIR}/pgo")
+endif()
+set(PYTHON_EXTENSION_PGO_DIR "${_python_extension_pgo_dir_default}" CACHE PATH
+    "Directory of the profiles of the Python extensions.")
+mark_as_advanced(PYTHON_EXTENSION_PGO PYTHON_EXTENSION_PGO_DIR)
+
 macro(_remove_whitespace _output)
   string(REGEX REPLACE "[ \r\n\t]+" " " ${_output} "${${_output}}")
   string(STRIP "${${_output}}" ${_output})
 endmacro()
 
+# Check once per build tree that the compilers of the enabled languages support
+# interprocedural optimization.
+function(_python_extension_ipo_supported _output_var)
+  if(CMAKE_VERSION VERSION_LESS 3.9)
+    set(${_output_var} FALSE PARENT_SCOPE)
+    return()
+  endif()
+  get_property(_enabled_languages GLOBAL PROPERTY ENABLED_LANGUAGES)
+  set(_languages)
+  foreach(_language C CXX Fortran)
+    if(_language IN_LIST _enabled_languages)
+      list(APPEND _languages ${_language})
+    endif()
+  endforeach()
+  if(NOT DEFINED _PYTHON_EXTENSION_IPO_SUPPORTED
+     OR NOT _PYTHON_EXTENSION_IPO_LANGUAGES STREQUAL "${_languages}")
+    cmake_policy(PUSH)
+    cmake_policy(SET CMP0069 NEW)
+    include(CheckIPOSupported)
+    check_ipo_supported(RESULT _supported OUTPUT _output LANGUAGES ${_languages})
+    cmake_policy(POP)
+    if(_supported)
+      message(STATUS "Interprocedural optimization of Python extensions (${_languages}): supported")
+    else()
+      message(WARNING
+        "Interprocedural optimization of Python extensions is not supported "
+        "by the ${_languages} compilers, IPO is ignored:\n${_output}")
+    endif()
+    set(_PYTHON_EXTENSION_IPO_SUPPORTED ${_supported} CACHE INTERNAL "")
+    set(_PYTHON_EXTENSION_IPO_LANGUAGES "${_languages}" CACHE INTERNAL "")
+  endif()
+  set(${_output_var} ${_PYTHON_EXTENSION_IPO_SUPPORTED} PARENT_SCOPE)
+endfunction()
+
+# Set the F2PY libraries of a library built with IPO: the F2PY runtime library
+# is replaced with a copy built with IPO too.
+function(_python_extension_ipo_f2py_libraries _output_var)
+  set(_libraries ${F2PY_LIBRARIES})
+  if(TARGET _f2py_runtime_library AND "_f2py_runtime_library" IN_LIST _libraries)
+    if(NOT TARGET _f2py_runtime_library_ipo)
+      get_target_property(_sources _f2py_runtime_library SOURCES)
+      get_target_property(_include_dirs _f2py_runtime_library INCLUDE_DIRECTORIES)
+      cmake_policy(PUSH)
+      cmake_policy(SET CMP0069 NEW)
+      add_library(_f2py_runtime_library_ipo STATIC ${_sources})
+      cmake_policy(POP)
+      target_include_directories(_f2py_runtime_library_ipo PRIVATE ${_include_dirs})
+      set_target_properties(_f2py_runtime_library_ipo PROPERTIES
+                            POSITION_INDEPENDENT_CODE ON
+                            INTERPROCEDURAL_OPTIMIZATION ON)
+    endif()
+    list(REMOVE_ITEM _libraries _f2py_runtime_library)
+    list(APPEND _libraries _f2py_runtime_library_ipo)
+  endif()
+  set(${_output_var} ${_libraries} PARENT_SCOPE)
+endfunction()
+
+# Add the profile-guided optimization flags of PYTHON_EXTENSION_PGO to a target.
+function(_python_extension_pgo _target)
+  string(TOUPPER "${PYTHON_EXTENSION_PGO}" _mode)
+  if(NOT _mode)
+    return()
+  endif()
+  if(NOT _mode MATCHES "^(GENERATE|USE)$")
+    message(FATAL_ERROR
+      "PYTHON_EXTENSION_PGO must be GENERATE, USE or empty (got \"${PYTHON_EXTENSION_PGO}\")")
+  endif()
+
+  # The compiler of the C sources, or of the C++ ones.
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  set(_compiler_version "${CMAKE_C_COMPILER_VERSION}")
+  if(NOT _compiler_id)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+    set(_compiler_version "${CMAKE_CXX_COMPILER_VERSION}")
+  endif()
+
+  file(TO_CMAKE_PATH "${PYTHON_EXTENSION_PGO_DIR}" _dir)
+  set(_flags)
+  if(_compiler_id STREQUAL "GNU")
+    if(_mode STREQUAL "GENERATE")
+      set(_flags "-fprofile-generate=${_dir}" "-fprofile-update=prefer-atomic")
+    else()
+      file(GLOB_RECURSE _profiles "${_dir}/*.gcda")
+      set(_flags "-fprofile-use=${_dir}" "-fprofile-correction"
+                 "-Wno-missing-profile" "-Wno-error=coverage-mismatch")
+      if(NOT _compiler_version VERSION_LESS 10)
+        list(APPEND _flags "-fprofile-partial-training")
+      endif()
+    endif()
+    if(NOT _compiler_version VERSION_LESS 11)
+      list(APPEND _flags "-fprofile-prefix-path=${CMAKE_BINARY_DIR}")
+    endif()
+  elseif(_compiler_id MATCHES "Clang")
+    if(_mode STREQUAL "GENERATE")
+      set(_flags "-fprofile-generate=${_dir}")
+    else()
+      file(GLOB _profiles "${_dir}/default.profdata")
+      set(_flags "-fprofile-use=${_dir}/default.profdata"
+                 "-Wno-profile-instr-unprofiled" "-Wno-profile-instr-out-of-date")
+    endif()
+  else()
+    message(WARNING
+      "Profile-guided optimization is not supported with the ${_compiler_id} "
+      "compiler, PYTHON_EXTENSION_PGO is ignored for ${_target}")
+    return()
+  endif()
+
+  if(_mode STREQUAL "USE" AND NOT _profiles)
+    get_property(_warned GLOBAL PROPERTY _PYTHON_EXTENSION_PGO_WARNING)
+    if(NOT _warned)
+      set_property(GLOBAL PROPERTY _PYTHON_EXTENSION_PGO_WARNING ON)
+      message(WARNING
+        "No profile in ${_dir}: the Python extensions are built without "
+        "profile-guided optimization")
+    endif()
+    return()
+  endif()
+
+  target_compile_options(${_target} PRIVATE ${_flags})
+  if(_mode STREQUAL "GENERATE")
+    # Link the profiling runtime.
+    set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+      " -fprofile-generate=\"${_dir}\"")
+  endif()
+endfunction()
+
+# Compile and link a target with OpenMP, for the enabled C, C++ and Fortran
+# languages.
+function(_python_extension_openmp _target)
+  get_property(_enabled_languages GLOBAL PROPERTY ENABLED_LANGUAGES)
+  set(_languages)
+  foreach(_language C CXX Fortran)
+    if(_language IN_LIST _enabled_languages)
+      list(APPEND _languages ${_language})
+    endif()
+  endforeach()
+  find_package(OpenMP QUIET COMPONENTS ${_languages})
+
+  get_target_property(_type ${_target} TYPE)
+  set(_missing)
+  foreach(_language IN LISTS _languages)
+    if(NOT OpenMP_${_language}_FOUND AND NOT OPENMP_FOUND)
+      list(APPEND _missing ${_language})
+    elseif(TARGET OpenMP::OpenMP_${_language} AND NOT _type STREQUAL "OBJECT_LIBRARY")
+      target_link_libraries(${_target} ${SKBUILD_LINK_LIBRARIES_KEYWORD}
+                            OpenMP::OpenMP_${_language})
+    elseif(TARGET OpenMP::OpenMP_${_language})
+      # The objects are linked by another target.
+      target_compile_options(${_target} PRIVATE
+        "$<TARGET_PROPERTY:OpenMP::OpenMP_${_language},INTERFACE_COMPILE_OPTIONS>")
+      target_include_directories(${_target} PRIVATE
+        "$<TARGET_PROPERTY:OpenMP::OpenMP_${_language},INTERFACE_INCLUDE_DIRECTORIES>")
+    else()
+      # FindOpenMP of CMake older than 3.9 only sets the flags.
+      separate_arguments(_flags UNIX_COMMAND "${OpenMP_${_language}_FLAGS}")
+      foreach(_flag IN LISTS _flags)
+        target_compile_options(${_target} PRIVATE "$<$<COMPILE_LANGUAGE:${_language}>:${_flag}>")
+      endforeach()
+      if(NOT _type STREQUAL "OBJECT_LIBRARY")
+        set_property(TARGET ${_target} APPEND_STRING PROPERTY LINK_FLAGS
+          " ${OpenMP_${_language}_FLAGS}")
+      endif()
+    endif()
+  endforeach()
+
+  if(_missing)
+    get_property(_warned GLOBAL PROPERTY _PYTHON_EXTENSION_OPENMP_WARNING)
+    if(NOT _warned)
+      set_property(GLOBAL PROPERTY _PYTHON_EXTENSION_OPENMP_WARNING ON)
+      message(WARNING
+        "OpenMP was not found for ${_missing}: the Python extensions are "
+        "built without it, and their parallel loops run on one thread")
+    endif()
+  endif()
+  set_property(TARGET ${_target} PROPERTY _PYTHON_EXTENSION_OPENMP ON)
+endfunction()
+
+set(_python_cpu_dispatch_templates "${CMAKE_CURRENT_LIST_DIR}")
+
+# Get the name, the identifier and the compiler flags of a CPU dispatch target.
+function(_python_cpu_dispatch_target _isa _name_var _id_var _flags_var)
+  string(TOUPPER "${_isa}" _upper)
+  string(REPLACE "_" "-" _upper "${_upper}")
+  if(_upper MATCHES "^X86-64-V([234])$")
+    set(_name "x86-64-v${CMAKE_MATCH_1}")
+  elseif(_upper MATCHES "^(AVX2|AVX512)$")
+    set(_name "${_upper}")
+  else()
+    message(FATAL_ERROR
+      "Unknown CPU dispatch target \"${_isa}\": expected x86-64-v2, "
+      "x86-64-v3, x86-64-v4, AVX2 or AVX512")
+  endif()
+  string(MAKE_C_IDENTIFIER "${_name}" _id)
+  string(TOLOWER "${_id}" _id)
+
+  set(_v2 -msse3 -mssse3 -msse4.1 -msse4.2 -mpopcnt -mcx16 -msahf)
+  set(_avx2 -mavx -mavx2 -mfma)
+  set(_v3 ${_v2} ${_avx2} -mf16c -mbmi -mbmi2 -mlzcnt -mmovbe)
+  set(_avx512 -mavx512f -mavx512cd -mavx512bw -mavx512dq -mavx512vl)
+  if(MSVC)
+    # MSVC only targets AVX2 and AVX-512: the x86-64-v2 variant is the baseline
+    # code under another name.
+    set(_flags_x86_64_v2)
+    set(_flags_avx2 /arch:AVX2)
+    set(_flags_x86_64_v3 /arch:AVX2)
+    set(_flags_avx512 /arch:AVX512)
+    set(_flags_x86_64_v4 /arch:AVX512)
+  else()
+    set(_flags_x86_64_v2 ${_v2})
+    set(_flags_avx2 ${_avx2})
+    set(_flags_x86_64_v3 ${_v3})
+    set(_flags_avx512 ${_avx2} ${_avx512})
+    set(_flags_x86_64_v4 ${_v3} ${_avx512})
+  endif()
+
+  set(${_name_var} "${_name}" PARENT_SCOPE)
+  set(${_id_var} "${_id}" PARENT_SCOPE)
+  set(${_flags_var} ${_flags_${_id}} PARENT_SCOPE)
+endfunction()
+
+function(python_cpu_dispatch _target)
+  set(multiValueArgs SOURCES TARGETS)
+  cmake_parse_arguments(_args "" "" "${multiValueArgs}" ${ARGN})
+
+  if(NOT TARGET ${_target})
+    message(FATAL_ERROR "python_cpu_dispatch: ${_target} is not a target")
+  endif()
+  if(NOT _args_SOURCES)
+    message(FATAL_ERROR "python_cpu_dispatch: no SOURCES for ${_target}")
+  endif()
+
+  # The variants, from the best one to the baseline.
+  set(_names)
+  set(_ids)
+  set(_reversed ${_args_TARGETS})
+  if(_reversed)
+    list(REVERSE _reversed)
+  endif()
+  foreach(_isa IN LISTS _reversed)
+    _python_cpu_dispatch_target("${_isa}" _name _id _flags)
+    if(NOT _id IN_LIST _ids)
+      list(APPEND _names "${_name}")
+      list(APPEND _ids ${_id})
+      set(_flags_${_id} ${_flags})
+    endif()
+  endforeach()
+
+  # The variants need an x86-64 compiler supporting the GCC or MSVC flags.
+  set(_compiler_id "${CMAKE_C_COMPILER_ID}")
+  if(NOT _compiler_id)
+    set(_compiler_id "${CMAKE_CXX_COMPILER_ID}")
+  endif()
+  set(_x86_64 FALSE)
+  if(CMAKE_SYSTEM_PROCESSOR MATCHES "^(x86_64|AMD64|amd64|x64|EM64T)$"
+     AND CMAKE_SIZEOF_VOID_P EQUAL 8
+     AND (NOT APPLE OR NOT CMAKE_OSX_ARCHITECTURES
+          OR CMAKE_OSX_ARCHITECTURES STREQUAL "x86_64"))
+    set(_x86_64 TRUE)
+  endif()
+  if(_ids AND NOT _x86_64)
+    message(STATUS "CPU dispatch of ${_target}: baseline only (not x86-64)")
+    set(_names)
+    set(_ids)
+  elseif(_ids AND NOT MSVC AND NOT _compiler_id MATCHES "^(GNU|Clang|AppleClang|IntelLLVM)$")
+    message(WARNING
+      "CPU dispatch is not supported with the ${_compiler_id} compiler, "
+      "${_target} is only built for the baseline")
+    set(_names)
+    set(_ids)
+  endif()
+  if(_ids)
+    string(REPLACE ";" " " _description "${_names}")
+    message(STATUS "CPU dispatch of ${_target}: ${_description} baseline")
+  endif()
+  list(APPEND _names "baseline")
+  list(APPEND _ids baseline)
+  set(_flags_baseline)
+
+  # The header declaring the variants and the dispatcher selecting one of them.
+  string(MAKE_C_IDENTIFIER "${_target}" _prefix)
+  list(LENGTH _ids _count)
+  set(_declare)
+  set(_call "  (")
+  set(_table)
+  set(_index 0)
+  foreach(_id IN LISTS _ids)
+    list(GET _names ${_index} _name)
+    string(TOUPPER "${_id}" _mask)
+    string(APPEND _table "  {\"${_name}\", SKBUILD_CPU_TARGET_${_mask}},\n")
+    if(_id STREQUAL "baseline")
+      string(APPEND _declare "  ret name##_${_id} params")
+      string(APPEND _call "name##_${_id} args)")
+    else()
+      string(APPEND _declare "  ret name##_${_id} params; \\\n")
+      string(APPEND _call
+        "SKBUILD_CPU_DISPATCH_INDEX() == ${_index} ? name##_${_id} args : \\\n   ")
+    endif()
+    math(EXPR _index "${_index} + 1")
+  endforeach()
+  string(REGEX REPLACE ",\n$" "" _table "${_table}")
+
+  get_property(_enabled_languages GLOBAL PROPERTY ENABLED_LANGUAGES)
+  set(_extension c)
+  if(NOT "C" IN_LIST _enabled_languages)
+    set(_extension cpp)
+  endif()
+  set(_dir "${CMAKE_CURRENT_BINARY_DIR}/${_target}_cpu_dispatch")
+  configure_file("${_python_cpu_dispatch_templates}/cpu_dispatch.h.in"
+                 "${_dir}/skbuild_cpu_dispatch.h" @ONLY)
+  configure_file("${_python_cpu_dispatch_templates}/cpu_dispatch.c.in"
+                 "${_dir}/skbuild_cpu_dispatch.${_extension}" @ONLY)
+
+  # Compile the sources once per variant, with the suffix of its functions.
+  foreach(_id IN LISTS _ids)
+    set(_variant ${_target}_cpu_${_id})
+    add_library(${_variant} OBJECT ${_args_SOURCES})
+    # The variants are not optimized together, so that no code of a variant is
+    # inlined in another one.
+    set_target_properties(${_variant} PROPERTIES
+                          POSITION_INDEPENDENT_CODE ON
+                          INTERPROCEDURAL_OPTIMIZATION OFF)
+    target_include_directories(${_variant} PRIVATE
+      "${_dir}" "$<TARGET_PROPERTY:${_target},INCLUDE_DIRECTORIES>")
+    target_compile_definitions(${_variant} PRIVATE
+      "SKBUILD_CPU_DISPATCH_SUFFIX=_${_id}"
+      "$<TARGET_PROPERTY:${_target},COMPILE_DEFINITIONS>")
+    target_compile_options(${_variant} PRIVATE ${_flags_${_id}})
+    _python_extension_pgo(${_variant})
+    get_target_property(_openmp ${_target} _PYTHON_EXTENSION_OPENMP)
+    if(_openmp)
+      _python_extension_openmp(${_variant})
+    endif()
+    target_sources(${_target} PRIVATE $<TARGET_OBJECTS:${_variant}>)
+  endforeach()
+  target_sources(${_target} PRIVATE "${_dir}/skbuild_cpu_dispatch.${_extension}")
+  target_include_directories(${_target} PRIVATE "${_dir}")
+endfunction()
+
 function(add_python_library _name)
-  set(options STATIC SHARED MODULE)
-  set(multiValueArgs SOURCES INCLUDE_DIRECTORIES LINK_LIBRARIES COMPILE_DEFINITIONS DEPENDS)
-  cmake_parse_arguments(_args "${options}" "" "${multiValueArgs}" ${ARGN} )
+  set(options STATIC SHARED MODULE PROFILE FREETHREADING_COMPATIBLE IPO NO_IPO OPENMP)
+  set(oneValueArgs LIMITED_API)
+  set(multiValueArgs SOURCES INCLUDE_DIRECTORIES LINK_LIBRARIES COMPILE_DEFINITIONS DEPENDS
+                     CPU_DISPATCH CPU_DISPATCH_SOURCES)
+  cmake_parse_arguments(_args "${options}" "${oneValueArgs}" "${multiValueArgs}" ${ARGN} )
 
   # Validate arguments to allow simpler debugging
   if(NOT _args_SOURCES)
@@ -224,8 +747,19 @@ function(add_python_library _name)
       endif()
       string(REGEX REPLACE "\\.[^.]*$" "" _pyx_target_name ${_source})
       set(_has_cython_targets ON)
+      set(_pyx_profile_arg)
+      if(_args_PROFILE)
+        set(_pyx_profile_arg PROFILE)
+      endif()
+      set(_pyx_freethreading_arg)
+      if(_args_FREETHREADING_COMPATIBLE)
+        set(_pyx_freethreading_arg FREETHREADING_COMPATIBLE)
+      endif()
       add_cython_target(${_pyx_target_name}
           ${_source}
+          ${_pyx_profile_arg}
+          ${_pyx_freethreading_arg}
+          LIMITED_API "${_args_LIMITED_API}"
           OUTPUT_VAR _pyx_target_output
           DEPENDS ${_args_DEPENDS}
       )
@@ -251,6 +785,11 @@ function(add_python_library _name)
   endforeach()
   set(_sources ${_processed})
 
+  # The IPO property is honored for the targets created with CMP0069.
+  if(POLICY CMP0069)
+    cmake_policy(PUSH)
+    cmake_policy(SET CMP0069 NEW)
+  endif()
   if(_args_SHARED)
     add_library(${_name} SHARED ${_sources})
   elseif(_args_MODULE)
@@ -259,19 +798,62 @@ function(add_python_library _name)
     # Assume static
     add_library(${_name} STATIC ${_sources})
   endif()
+  if(POLICY CMP0069)
+    cmake_policy(POP)
+  endif()
+
+  set(_ipo ${PYTHON_EXTENSION_IPO})
+  if(_args_IPO)
+    set(_ipo ON)
+  elseif(_args_NO_IPO)
+    set(_ipo OFF)
+  endif()
+  if(_ipo)
+    _python_extension_ipo_supported(_ipo)
+  endif()
+  if(_ipo OR _args_NO_IPO)
+    set_target_properties(${_name} PROPERTIES INTERPROCEDURAL_OPTIMIZATION ${_ipo})
+  endif()
+
+  _python_extension_pgo(${_name})
+
+  if(_args_OPENMP)
+    _python_extension_openmp(${_name})
+  endif()
 
   target_include_directories(${_name} PRIVATE ${_args_INCLUDE_DIRECTORIES})
   target_link_libraries(${_name} ${SKBUILD_LINK_LIBRARIES_KEYWORD} ${_args_LINK_LIBRARIES})
 
   if(_has_f2py_targets)
+    set(_f2py_libraries ${F2PY_LIBRARIES})
+    if(_ipo)
+      _python_extension_ipo_f2py_libraries(_f2py_libraries)
+    endif()
     target_include_directories(${_name} PRIVATE ${F2PY_INCLUDE_DIRS})
-    target_link_libraries(${_name} ${SKBUILD_LINK_LIBRARIES_KEYWORD} ${F2PY_LIBRARIES})
+    target_link_libraries(${_name} ${SKBUILD_LINK_LIBRARIES_KEYWORD} ${_f2py_libraries})
   endif()
 
   if(_args_COMPILE_DEFINITIONS)
     target_compile_definitions(${_name} PRIVATE ${_args_COMPILE_DEFINITIONS})
   endif()
 
+  if(_args_LIMITED_API)
+    python_limited_api_hex("${_args_LIMITED_API}" _limited_api_hex)
+    if(_limited_api_hex)
+      target_compile_definitions(${_name} PRIVATE Py_LIMITED_API=${_limited_api_hex})
+    endif()
+  endif()
+
+  if(_args_CPU_DISPATCH_SOURCES)
+    python_cpu_dispatch(${_name}
+      SOURCES ${_args_CPU_DISPATCH_SOURCES}
+      TARGETS ${_args_CPU_DISPATCH}
+    )
+  elseif(_args_CPU_DISPATCH)
+    message(FATAL_ERROR
+      "CPU_DISPATCH is given for ${_name} without CPU_DISPATCH_SOURCES")
+  endif()
+
   if(_args_DEPENDS)
     add_custom_target(
       "${_name}_depends"
@@ -285,8 +867,11 @@ function(add_python_extension _name)
   # FIXME: make sure that extensions with the same name can happen
   # in multiple directories
 
-  set(multiValueArgs SOURCES INCLUDE_DIRECTORIES LINK_LIBRARIES COMPILE_DEFINITIONS DEPENDS)
-  cmake_parse_arguments(_args "" "" "${multiValueArgs}" ${ARGN} )
+  set(options PROFILE FREETHREADING_COMPATIBLE IPO NO_IPO OPENMP LEAN SPLIT_DEBUG)
+  set(oneValueArgs LIMITED_API LINKER)
+  set(multiValueArgs SOURCES INCLUDE_DIRECTORIES LINK_LIBRARIES COMPILE_DEFINITIONS DEPENDS
+                     CPU_DISPATCH CPU_DISPATCH_SOURCES)
+  cmake_parse_arguments(_args "${options}" "${oneValueArgs}" "${multiValueArgs}" ${ARGN} )
 
   # Validate arguments to allow simpler debugging
   if(NOT _args_SOURCES)
@@ -298,14 +883,47 @@ function(add_python_extension _name)
     )
   endif()
 
-  add_python_library(${_name} MODULE
+  set(_profile_arg)
+  if(_args_PROFILE)
+    set(_profile_arg PROFILE)
+  endif()
+  set(_freethreading_arg)
+  if(_args_FREETHREADING_COMPATIBLE)
+    set(_freethreading_arg FREETHREADING_COMPATIBLE)
+  endif()
+  set(_ipo_arg)
+  if(_args_IPO)
+    set(_ipo_arg IPO)
+  elseif(_args_NO_IPO)
+    set(_ipo_arg NO_IPO)
+  endif()
+  set(_openmp_arg)
+  if(_args_OPENMP)
+    set(_openmp_arg OPENMP)
+  endif()
+
+  add_python_library(${_name} MODULE ${_profile_arg} ${_freethreading_arg} ${_ipo_arg}
+    ${_openmp_arg}
     SOURCES ${_args_SOURCES}
     INCLUDE_DIRECTORIES ${_args_INCLUDE_DIRECTORIES}
     LINK_LIBRARIES ${_args_LINK_LIBRARIES}
     COMPILE_DEFINITIONS ${_args_COMPILE_DEFINITIONS}
     DEPENDS ${_args_DEPENDS}
+    LIMITED_API "${_args_LIMITED_API}"
+    CPU_DISPATCH ${_args_CPU_DISPATCH}
+    CPU_DISPATCH_SOURCES ${_args_CPU_DISPATCH_SOURCES}
   )
-  python_extension_module(${_name})
+  set(_lean_arg)
+  if(_args_LEAN)
+    set(_lean_arg LEAN)
+  endif()
+  set(_split_debug_arg)
+  if(_args_SPLIT_DEBUG)
+    set(_split_debug_arg SPLIT_DEBUG)
+  endif()
+  python_extension_module(${_name} LIMITED_API "${_args_LIMITED_API}"
+                          LINKER "${_args_LINKER}"
+                          ${_lean_arg} ${_split_debug_arg})
 
   file(RELATIVE_PATH _relative "${CMAKE_SOURCE_DIR}" "${CMAKE_CURRENT_SOURCE_DIR}")
   if(_relative STREQUAL "")
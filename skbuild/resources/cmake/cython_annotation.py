@@ -0,0 +1,236 @@
+"""
+Summaries of the annotated HTML written by ``cython --annotate``.
+
+``UseCython.cmake`` runs this script after each ``cython`` command when
+``CYTHON_ANNOTATE`` is set::
+
+    python cython_annotation.py summarize <module>.html --source <pyx> --output <json>
+
+Cython gives each source line a score, the weighted number of calls to the
+Python C-API in the C code generated for it (5 per ``Py*`` function call, 2 per
+Cython helper, 1 per macro). The summary groups the lines by the function (or
+class, or module body) they belong to, with the number of lines interacting
+with the C-API and the sum of their scores, so that functions can be ranked by
+their likely interpreter overhead.
+
+The ``report`` command aggregates the summaries of a project::
+
+    python cython_annotation.py report <json>... --output <report>
+
+The script only uses the standard library, so it can be run by the interpreter
+found by CMake without installing anything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+__all__ = ["main", "report", "summarize"]
+
+SUMMARY_VERSION = 1
+
+_BLOCK = re.compile(
+    r"""<pre class=(["'])cython (?P<kind>line|code) score-(?P<score>\d+)[^>]*>(?P<body>.*?)</pre>""", re.DOTALL
+)
+_TAG = re.compile(r"<[^>]*>")
+_LINE = re.compile(r"\D*(?P<number>\d+): ?(?P<text>.*)", re.DOTALL)
+_API_CALL = re.compile(r"""<span class=(["'])(?:py|pyx)_(?:c|macro)_api\1>""")
+
+_CLASS = re.compile(r"(?:cdef\s+(?:(?:public|api|extern|final)\s+)*)?class\s+(?P<name>[A-Za-z_]\w*)")
+_FUNCTION = re.compile(r"(?:async\s+def|def|cpdef|cdef)\s[^(=:#]*?(?P<name>[A-Za-z_]\w*)\s*\(")
+
+MODULE_SCOPE = "<module>"
+
+
+class AnnotatedLine:
+    """One source line of an annotated module."""
+
+    def __init__(self, number: int, text: str, score: int) -> None:
+        self.number = number
+        self.text = text
+        self.score = score
+        self.calls = 0
+
+
+def parse_html(content: str) -> list[AnnotatedLine]:
+    """Read the source lines, their score and their number of C-API calls."""
+    lines: list[AnnotatedLine] = []
+    for block in _BLOCK.finditer(content):
+        if block["kind"] == "code":
+            if lines:
+                lines[-1].calls += len(_API_CALL.findall(block["body"]))
+            continue
+        match = _LINE.match(html.unescape(_TAG.sub("", block["body"])))
+        if match is not None:
+            lines.append(AnnotatedLine(int(match["number"]), match["text"].rstrip("\n"), int(block["score"])))
+    return lines
+
+
+class _Scanner:
+    """Tracks the brackets and triple-quoted strings spanning several lines."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.quote = ""
+
+    @property
+    def continued(self) -> bool:
+        return self.depth > 0 or bool(self.quote)
+
+    def feed(self, text: str) -> None:
+        i = 0
+        while i < len(text):
+            if self.quote:
+                end = text.find(self.quote, i)
+                if end < 0:
+                    return
+                i = end + len(self.quote)
+                self.quote = ""
+                continue
+            char = text[i]
+            if char == "#":
+                return
+            if char in "\"'":
+                if text.startswith(char * 3, i):
+                    self.quote = char * 3
+                    i += 3
+                    continue
+                end = i + 1
+                while end < len(text) and text[end] != char:
+                    end += 2 if text[end] == "\\" else 1
+                i = end + 1
+                continue
+            if char in "([{":
+                self.depth += 1
+            elif char in ")]}":
+                self.depth = max(self.depth - 1, 0)
+            i += 1
+
+
+def _scopes(lines: Iterable[AnnotatedLine]) -> Iterator[tuple[str, str, int, AnnotatedLine]]:
+    """Yield the qualified name, kind and line of the scope of each line."""
+    stack: list[tuple[int, str, str, int]] = []
+    scanner = _Scanner()
+    for line in lines:
+        stripped = line.text.strip()
+        if not scanner.continued and stripped and not stripped.startswith("#"):
+            indent = len(line.text) - len(line.text.lstrip())
+            while stack and indent <= stack[-1][0]:
+                stack.pop()
+            match = _CLASS.match(stripped)
+            kind = "class"
+            if match is None:
+                match = _FUNCTION.match(stripped)
+                kind = "function"
+            if match is not None:
+                name = ".".join([*(scope[1] for scope in stack), match["name"]])
+                stack.append((indent, name, kind, line.number))
+        scanner.feed(line.text)
+        if stack:
+            yield stack[-1][1], stack[-1][2], stack[-1][3], line
+        else:
+            yield MODULE_SCOPE, "module", 1, line
+
+
+def summarize(content: str, source: str = "", name: str = "") -> dict[str, Any]:
+    """Summarize the annotated HTML of a module, by function."""
+    scopes: dict[str, dict[str, Any]] = {}
+    for qualname, kind, first_line, line in _scopes(parse_html(content)):
+        scope = scopes.setdefault(
+            qualname, {"name": qualname, "kind": kind, "line": first_line, "lines": 0, "score": 0, "calls": 0}
+        )
+        if line.score:
+            scope["lines"] += 1
+            scope["score"] += line.score
+            scope["calls"] += line.calls
+    functions = sorted(scopes.values(), key=lambda scope: (-scope["score"], scope["line"]))
+    return {
+        "version": SUMMARY_VERSION,
+        "name": name,
+        "source": source,
+        "lines": sum(scope["lines"] for scope in functions),
+        "score": sum(scope["score"] for scope in functions),
+        "calls": sum(scope["calls"] for scope in functions),
+        "functions": functions,
+    }
+
+
+def report(summaries: Iterable[Path]) -> dict[str, Any]:
+    """Aggregate module summaries, ranking modules and functions by score."""
+    modules: list[dict[str, Any]] = []
+    functions: list[dict[str, Any]] = []
+    missing: list[str] = []
+    for path in summaries:
+        try:
+            summary = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            missing.append(str(path))
+            continue
+        module = {key: summary[key] for key in ("name", "source", "lines", "score", "calls")}
+        module["summary"] = str(path)
+        modules.append(module)
+        functions.extend({"module": summary["name"], **function} for function in summary["functions"])
+    modules.sort(key=lambda module: -module["score"])
+    functions.sort(key=lambda function: -function["score"])
+    return {
+        "version": SUMMARY_VERSION,
+        "lines": sum(module["lines"] for module in modules),
+        "score": sum(module["score"] for module in modules),
+        "calls": sum(module["calls"] for module in modules),
+        "modules": modules,
+        "functions": functions,
+        "missing": missing,
+    }
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summarize_parser = commands.add_parser("summarize", help="summarize the annotated HTML of a module")
+    summarize_parser.add_argument("html", type=Path, help="HTML file written by cython --annotate")
+    summarize_parser.add_argument("--output", type=Path, required=True, help="JSON summary to write")
+    summarize_parser.add_argument("--source", default="", help="Cython source of the module")
+    summarize_parser.add_argument("--name", default="", help="name of the module (the add_cython_target name)")
+
+    report_parser = commands.add_parser("report", help="aggregate the summaries of a project")
+    report_parser.add_argument("summaries", type=Path, nargs="*", help="JSON summaries")
+    report_parser.add_argument("--output", type=Path, required=True, help="JSON report to write")
+    report_parser.add_argument("--top", type=int, default=20, help="number of functions to print")
+    args = parser.parse_args(argv)
+
+    if args.command == "summarize":
+        content = args.html.read_text(encoding="utf-8")
+        _write_json(args.output, summarize(content, args.source, args.name or args.html.stem))
+        return 0
+
+    data = report(args.summaries)
+    _write_json(args.output, data)
+    for path in data["missing"]:
+        print(f"warning: {path} does not exist; build the Cython modules first", file=sys.stderr)
+    print(f"{'score':>7} {'lines':>6} {'calls':>6}  function")
+    for function in data["functions"][: args.top]:
+        print(
+            f"{function['score']:>7} {function['lines']:>6} {function['calls']:>6}  "
+            f"{function['module']}:{function['line']} {function['name']}"
+        )
+    print(f"Cython annotation report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,771 @@
+"""
+Build-time driver for the ``cython`` commands created by ``add_cython_target``.
+
+``UseCython.cmake`` prefixes the ``cython`` command line with this script when
+``CYTHON_CACHE_DIR`` or ``CYTHON_COMPILE_SERVER`` is set::
+
+    python cython_driver.py [--cache-dir <dir>] [--server] [options] -- cython <args...>
+
+With ``--cache-dir``, the generated source is looked up in a content-addressed
+cache before running Cython. The lookup works in two steps, like ccache's
+direct mode: a primary key (Cython version, command line and ``.pyx`` contents)
+selects a manifest, and each manifest entry records the ``.pxd``/``.pxi`` files
+the module depended on together with their hashes. An entry whose dependencies
+all still hash the same is a hit, and the generated file is copied from the
+cache. The dependencies of the project are recorded relative to the working
+directory, so that a command line with relative paths (``CYTHON_RELATIVE_PATHS``)
+also hits in another build tree of the same project.
+
+With ``--server``, Cython runs in a compile server instead of a new process.
+The server is started on first use and exits after being idle for a while. It
+imports Cython and compiles a small module once, then forks a process running
+the usual ``cython`` entry point for each request, so that concurrent commands
+run in parallel and cannot affect each other. Parsed ``.pxd`` files are not
+shared between requests: Cython merges every ``.pxd`` of its compilation
+context into the generated module, so reusing them would change the output.
+When the server cannot be reached (or on platforms without ``fork``), the
+command runs Cython directly.
+
+With ``--marker``, a string constant holding the given text is appended to the
+generated source once Cython succeeded, so that it ends up in the compiled
+module. ``CYTHON_PROFILE`` uses it to make traced builds recognizable.
+
+The script only uses the standard library, so it can be run by the interpreter
+found by CMake without installing anything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+__all__ = ["main"]
+
+CACHE_VERSION = "1"
+
+# Options producing side outputs (annotated HTML, cygdb information) that the
+# cache does not track; commands using them always run Cython.
+UNCACHEABLE_OPTIONS = frozenset({"-a", "--annotate", "--annotate-fullc", "--gdb", "--gdb-outdir"})
+
+MAX_MANIFEST_ENTRIES = 16
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _output_file(cython_args: list[str]) -> Path:
+    for flag in ("--output-file", "-o"):
+        if flag in cython_args:
+            return Path(cython_args[cython_args.index(flag) + 1])
+    msg = "the cython command line must name its output with --output-file"
+    raise SystemExit(msg)
+
+
+def _source_index(cython_args: list[str]) -> int:
+    # add_cython_target always passes the source right before --output-file.
+    for flag in ("--output-file", "-o"):
+        if flag in cython_args:
+            return cython_args.index(flag) - 1
+    msg = "the cython command line must name its source before --output-file"
+    raise SystemExit(msg)
+
+
+def _key_arguments(cython_args: list[str]) -> list[str]:
+    """Command line arguments that influence the generated source."""
+    arguments = []
+    skip_next = False
+    for argument in cython_args[1:]:
+        if skip_next:
+            skip_next = False
+            continue
+        if argument in {"--output-file", "-o"}:
+            skip_next = True
+            continue
+        if argument in {"--depfile", "-M"}:
+            continue
+        arguments.append(argument)
+    return arguments
+
+
+def parse_depfile(depfile: Path, base: Path | None = None) -> list[Path]:
+    """Return the dependencies listed in a Makefile-style depfile.
+
+    Relative paths are relative to ``base``, by default the current directory,
+    where Cython writes them from.
+    """
+    content = depfile.read_text(encoding="utf-8").replace("\\\n", " ")
+    _, _, dependencies = content.partition(": ")
+    paths: list[str] = []
+    current = ""
+    escaped = False
+    for character in dependencies:
+        if escaped:
+            current += character
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character.isspace():
+            if current:
+                paths.append(current)
+            current = ""
+        else:
+            current += character
+    if current:
+        paths.append(current)
+    return [((base or Path()) / path).absolute() for path in paths]
+
+
+def _manifest_dependency(path: Path, base: Path) -> Path:
+    """Path of a dependency as recorded in a manifest: relative to the working
+    directory when it is under ``base``, so that the entries of a build tree
+    match in another one with the same layout, and absolute otherwise."""
+    path = path.resolve()
+    if base == Path(base.anchor) or not path.is_relative_to(base):
+        return path
+    try:
+        return Path(os.path.relpath(path))
+    except ValueError:  # Different drive on Windows
+        return path
+
+
+def write_depfile(depfile: Path, output: Path, dependencies: list[Path]) -> None:
+    """Write a depfile in the format ``cython --depfile`` uses."""
+
+    def _relative(path: Path) -> str:
+        try:
+            relative = os.path.relpath(path)
+        except ValueError:  # Different drive on Windows
+            relative = str(path)
+        return relative.replace(" ", "\\ ")
+
+    lines = [f"{_relative(output)}: \\"]
+    lines.extend(f"  {_relative(path)} \\" for path in dependencies[:-1])
+    if dependencies:
+        lines.append(f"  {_relative(dependencies[-1])}")
+    depfile.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+MARKER_SYMBOL = "__pyx_skbuild_marker"
+
+
+def append_marker(output: Path, text: str) -> None:
+    """Append a string constant holding ``text`` to a generated source."""
+    literal = json.dumps(text)
+    output.write_text(
+        output.read_text(encoding="utf-8")
+        + f"""
+/* Appended by cython_driver.py --marker */
+/* retain keeps the marker when the module is linked with --gc-sections. */
+#if defined(__has_attribute)
+#if __has_attribute(retain)
+#define __PYX_SKBUILD_MARKER_ATTRIBUTES __attribute__((used, retain))
+#endif
+#endif
+#if !defined(__PYX_SKBUILD_MARKER_ATTRIBUTES) && defined(__GNUC__)
+#define __PYX_SKBUILD_MARKER_ATTRIBUTES __attribute__((used))
+#endif
+#if !defined(__PYX_SKBUILD_MARKER_ATTRIBUTES)
+#define __PYX_SKBUILD_MARKER_ATTRIBUTES
+#endif
+__PYX_SKBUILD_MARKER_ATTRIBUTES
+static const char {MARKER_SYMBOL}[] = {literal};
+""",
+        encoding="utf-8",
+    )
+
+
+class CythonCache:
+    """Content-addressed store of generated sources with LRU eviction."""
+
+    def __init__(self, root: Path, max_size: int) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.objects = root / "objects"
+        self.manifests = root / "manifests"
+        self.stats_file = root / "stats.log"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.manifests / key[:2] / f"{key}.json"
+
+    def primary_key(self, cython_version: str, cython_args: list[str], source: Path, marker: str | None = None) -> str:
+        parts = [CACHE_VERSION, cython_version, *_key_arguments(cython_args), _file_digest(source)]
+        if marker is not None:
+            parts.append(f"--marker={marker}")
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _read_manifest(self, key: str) -> list[dict[str, object]]:
+        try:
+            entries = json.loads(self._manifest_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+        return entries if isinstance(entries, list) else []
+
+    def lookup(self, key: str) -> tuple[str, list[Path]] | None:
+        """Return the object digest and dependencies of a matching entry."""
+        for entry in self._read_manifest(key):
+            dependencies = entry.get("dependencies")
+            digest = entry.get("output")
+            if not isinstance(dependencies, dict) or not isinstance(digest, str):
+                continue
+            try:
+                matches = all(_file_digest(Path(path)) == value for path, value in dependencies.items())
+            except OSError:
+                continue
+            if matches and self._object_path(digest).is_file():
+                return digest, [Path(path) for path in dependencies]
+        return None
+
+    def store(self, key: str, output: Path, dependencies: list[Path]) -> None:
+        digest = _file_digest(output)
+        object_path = self._object_path(digest)
+        if not object_path.is_file():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=object_path.parent, delete=False) as blob:
+                with output.open("rb") as f:
+                    shutil.copyfileobj(f, blob)
+            os.replace(blob.name, object_path)
+
+        entry = {
+            "dependencies": {str(path): _file_digest(path) for path in dependencies},
+            "output": digest,
+        }
+        entries = [entry, *(e for e in self._read_manifest(key) if e != entry)]
+        manifest_path = self._manifest_path(key)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(mode="w", dir=manifest_path.parent, delete=False, encoding="utf-8") as tmp:
+            json.dump(entries[:MAX_MANIFEST_ENTRIES], tmp)
+        os.replace(tmp.name, manifest_path)
+        self.evict()
+
+    def retrieve(self, digest: str, output: Path) -> None:
+        object_path = self._object_path(digest)
+        # Mark as recently used for the LRU eviction.
+        os.utime(object_path)
+        # Copy rather than hard-link: touching a shared inode would change the
+        # timestamps seen by every other build tree using the object.
+        tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+        shutil.copyfile(object_path, tmp)
+        os.replace(tmp, output)
+
+    def evict(self) -> None:
+        """Remove the least recently used objects once over ``max_size``."""
+        objects = [(path.stat(), path) for path in self.objects.glob("*/*") if path.is_file()]
+        total = sum(stat.st_size for stat, _ in objects)
+        if total <= self.max_size:
+            return
+        for stat, path in sorted(objects, key=lambda item: item[0].st_mtime):
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= stat.st_size
+            if total <= self.max_size * 0.9:
+                break
+
+    def record(self, event: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Appends of a single short line are atomic, so concurrent commands
+        # run by the build tool can share the log without locking.
+        with self.stats_file.open("a", encoding="utf-8") as f:
+            f.write(f"{event}\n")
+
+    def stats(self) -> dict[str, int]:
+        counts = {"hit": 0, "miss": 0, "uncacheable": 0}
+        with contextlib.suppress(OSError), self.stats_file.open(encoding="utf-8") as f:
+            for line in f:
+                event = line.strip()
+                if event in counts:
+                    counts[event] += 1
+        sizes = [path.stat().st_size for path in self.objects.glob("*/*") if path.is_file()]
+        counts["objects"] = len(sizes)
+        counts["size"] = sum(sizes)
+        return counts
+
+    def zero_stats(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            self.stats_file.unlink()
+
+
+def _major_version(version: str) -> int:
+    major = version.split(".", 1)[0]
+    return int(major) if major.isdigit() else 0
+
+
+def run_cached(
+    cache: CythonCache,
+    cython_version: str,
+    cython_args: list[str],
+    extra_dependencies: list[Path],
+    run: Callable[[list[str]], int] = subprocess.call,
+    marker: str | None = None,
+) -> int:
+    """Run ``cython_args`` through ``cache``, returning the exit code.
+
+    Cython is invoked with ``run`` on a miss. The ``marker`` is appended to the
+    generated source before it is stored, and is part of the key.
+    """
+    if UNCACHEABLE_OPTIONS.intersection(cython_args):
+        cache.record("uncacheable")
+        result = run(cython_args)
+        if result == 0 and marker:
+            append_marker(_output_file(cython_args), marker)
+        return result
+
+    output = _output_file(cython_args)
+    source = Path(cython_args[_source_index(cython_args)])
+    wants_depfile = "--depfile" in cython_args or "-M" in cython_args
+    depfile = output.with_name(output.name + ".dep")
+
+    previous_digest = None
+    previous_stat = None
+    if output.is_file():
+        previous_digest = _file_digest(output)
+        previous_stat = output.stat()
+
+    key = cache.primary_key(cython_version, cython_args, source, marker)
+    found = cache.lookup(key)
+    if found is not None:
+        digest, dependencies = found
+        if digest != previous_digest:
+            cache.retrieve(digest, output)
+        if wants_depfile:
+            write_depfile(depfile, output, dependencies)
+        cache.record("hit")
+        return 0
+
+    command = list(cython_args)
+    if not wants_depfile and _major_version(cython_version) >= 3:
+        # Ask Cython for the exact dependencies even when the build tool
+        # does not consume the depfile.
+        command.insert(_source_index(command), "--depfile")
+    result = run(command)
+    if result != 0:
+        return result
+    if marker:
+        append_marker(output, marker)
+
+    dependencies = [source, *extra_dependencies]
+    if depfile.is_file():
+        dependencies.extend(parse_depfile(depfile))
+        if not wants_depfile:
+            depfile.unlink()
+    # Dependencies under the common root of the source and of the working
+    # directory (the project) are recorded relative to the working directory.
+    base = Path(os.path.commonpath([Path.cwd().resolve(), source.resolve().parent]))
+    dependencies = sorted({_manifest_dependency(path, base) for path in dependencies})
+
+    cache.record("miss")
+    cache.store(key, output, dependencies)
+
+    if previous_stat is not None and _file_digest(output) == previous_digest:
+        # Unchanged output: keep the old timestamp so nothing downstream rebuilds.
+        os.utime(output, ns=(previous_stat.st_atime_ns, previous_stat.st_mtime_ns))
+    return 0
+
+
+# Compile server.
+SERVER_PROTOCOL = "1"
+SERVER_IDLE_TIMEOUT = 900
+SERVER_REQUEST_TIMEOUT = 10
+
+# Compiled by the server before forking the first request, so that the
+# compiler modules imported lazily and the utility code used by most modules
+# are loaded once.
+WARM_UP_SOURCE = """\
+from libc.math cimport sqrt
+
+
+cdef class Vector:
+    cdef double x, y
+
+    def __init__(self, double x, double y):
+        self.x = x
+        self.y = y
+
+    def norm(self):
+        return sqrt(self.x * self.x + self.y * self.y)
+
+
+def total(double[:] values):
+    cdef double result = 0
+    cdef Py_ssize_t i
+    for i in range(values.shape[0]):
+        result += values[i]
+    return [result, "{}".format(result)]
+"""
+
+
+def _import_cython(name: str) -> Any:
+    # Only the server imports Cython: clients must start fast.
+    return importlib.import_module(name)
+
+
+def server_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(os, "fork")
+
+
+def server_address(cython_version: str) -> Path | None:
+    """Default socket of the compile server, in a directory private to the user.
+
+    Each interpreter and Cython version gets its own server.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        directory = Path(runtime_dir)
+    else:
+        directory = Path(tempfile.gettempdir()) / f"skbuild-cython-{os.getuid()}"
+        try:
+            directory.mkdir(mode=0o700, exist_ok=True)
+            stat = directory.stat()
+        except OSError:
+            return None
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            return None
+    tag = hashlib.sha256(f"{sys.executable}\0{cython_version}".encode()).hexdigest()[:16]
+    return directory / f"skbuild-cython-{tag}.sock"
+
+
+def start_server(address: Path, cython_version: str, idle_timeout: float = SERVER_IDLE_TIMEOUT) -> None:
+    """Start a detached compile server listening on ``address``."""
+    command = [sys.executable, os.path.abspath(__file__), "--serve", "--server-address", str(address)]
+    command += ["--server-idle-timeout", str(idle_timeout)]
+    if cython_version:
+        command += ["--cython-version", cython_version]
+    # Fork twice so that the server is neither a child of the build tool nor
+    # holding its output pipes, which the build tool waits on.
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.setsid()
+            if os.fork() == 0:
+                devnull = os.open(os.devnull, os.O_RDWR)
+                for fd in (0, 1, 2):
+                    os.dup2(devnull, fd)
+                os.execv(sys.executable, command)
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+
+class CompileServerClient:
+    """Runs cython command lines in a compile server, starting it on demand."""
+
+    def __init__(
+        self,
+        address: Path | None,
+        cython_version: str,
+        autostart: bool = True,
+        idle_timeout: float = SERVER_IDLE_TIMEOUT,
+    ) -> None:
+        self.address = address
+        self.cython_version = cython_version
+        self.autostart = autostart
+        self.idle_timeout = idle_timeout
+
+    def request(self, cython_args: list[str]) -> int | None:
+        """Compile in the server, returning ``None`` when the server cannot be used."""
+        if self.address is None or not server_supported():
+            return None
+        message = {
+            "protocol": SERVER_PROTOCOL,
+            "cython_version": self.cython_version,
+            "cwd": os.getcwd(),
+            "args": cython_args[1:],
+        }
+        try:
+            response = self._send(self.address, message)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if self.autostart:
+                start_server(self.address, self.cython_version, self.idle_timeout)
+            return None
+        except (OSError, ValueError):
+            return None
+        returncode = response.get("returncode")
+        if not isinstance(returncode, int):
+            return None
+        sys.stdout.write(response.get("stdout", ""))
+        sys.stderr.write(response.get("stderr", ""))
+        return returncode
+
+    def stop(self) -> bool:
+        """Stop the server once its running requests are done."""
+        if self.address is None or not server_supported():
+            return False
+        try:
+            self._send(self.address, {"protocol": SERVER_PROTOCOL, "stop": True})
+        except (OSError, ValueError):
+            return False
+        return True
+
+    @staticmethod
+    def _send(address: Path, message: dict[str, Any]) -> dict[str, Any]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(address))
+            sock.sendall(json.dumps(message).encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+            response = json.loads(b"".join(iter(lambda: sock.recv(1 << 16), b"")))
+        return response if isinstance(response, dict) else {}
+
+    def __call__(self, cython_args: list[str]) -> int:
+        returncode = self.request(cython_args)
+        if returncode is None:
+            return subprocess.call(cython_args)
+        return returncode
+
+
+class CompileServer:
+    """Runs the requests of ``CompileServerClient``, each in a forked process."""
+
+    def __init__(self, address: Path, cython_version: str, idle_timeout: float = SERVER_IDLE_TIMEOUT) -> None:
+        self.address = address
+        self.cython_version = cython_version
+        self.idle_timeout = idle_timeout
+        self.available = False
+        self.children: set[int] = set()
+
+    def serve(self) -> int:
+        import fcntl  # noqa: PLC0415  # POSIX only
+
+        lock_path = self.address.with_name(self.address.name + ".lock")
+        with lock_path.open("a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Another server already listens on this address.
+                return 0
+            with contextlib.suppress(FileNotFoundError):
+                self.address.unlink()
+            signal.signal(signal.SIGTERM, _exit_on_signal)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+                listener.bind(str(self.address))
+                try:
+                    # Listen before warming up: early clients wait in the backlog.
+                    listener.listen(128)
+                    self.available = self._warm_up()
+                    self._loop(listener)
+                finally:
+                    with contextlib.suppress(FileNotFoundError):
+                        self.address.unlink()
+        return 0
+
+    def _warm_up(self) -> bool:
+        try:
+            cython = _import_cython("Cython")
+            main = _import_cython("Cython.Compiler.Main")
+        except ImportError:
+            return False
+        if self.cython_version and cython.__version__ != self.cython_version:
+            # Answer "unavailable" until idle rather than exiting, which would
+            # make every client start a new server.
+            return False
+        with tempfile.TemporaryDirectory() as tmpdir, _preserve_compiler_options():
+            source = Path(tmpdir) / "_skbuild_warm_up.pyx"
+            source.write_text(WARM_UP_SOURCE, encoding="utf-8")
+            options, _ = main.parse_command_line(["-3", str(source)])
+            main.compile_single(str(source), options, None)
+        # Lookups cached while warming up would hide files created later.
+        _import_cython("Cython.Utils").clear_function_caches()
+        return True
+
+    def _loop(self, listener: socket.socket) -> None:
+        last_activity = time.monotonic()
+        while True:
+            readable, _, _ = select.select([listener], [], [], 1.0)
+            if readable:
+                connection, _ = listener.accept()
+                with connection:
+                    stop = self._dispatch(listener, connection)
+                if stop:
+                    for pid in self.children:
+                        os.waitpid(pid, 0)
+                    return
+            self._reap()
+            now = time.monotonic()
+            if readable or self.children:
+                last_activity = now
+            elif now - last_activity > self.idle_timeout:
+                return
+
+    def _dispatch(self, listener: socket.socket, connection: socket.socket) -> bool:
+        """Handle a request, returning whether the server should stop."""
+        request = _read_request(connection)
+        if request is not None and request.get("stop"):
+            _send(connection, {"returncode": 0})
+            return True
+        if request is None or not self.available or request["cython_version"] not in {"", self.cython_version}:
+            _send(connection, {"returncode": None})
+            return False
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _run_request(connection, request)
+            finally:
+                os._exit(0)
+        self.children.add(pid)
+        return False
+
+    def _reap(self) -> None:
+        for pid in list(self.children):
+            with contextlib.suppress(ChildProcessError):
+                if os.waitpid(pid, os.WNOHANG)[0] == 0:
+                    continue
+            self.children.discard(pid)
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:  # noqa: ARG001
+    raise SystemExit(0)
+
+
+@contextlib.contextmanager
+def _preserve_compiler_options() -> Iterator[None]:
+    """Restore the module-level options set when parsing a command line."""
+    options = _import_cython("Cython.Compiler.Options")
+    saved = dict(vars(options))
+    try:
+        yield
+    finally:
+        for name in set(vars(options)) - set(saved):
+            delattr(options, name)
+        vars(options).update(saved)
+
+
+def _read_request(connection: socket.socket) -> dict[str, Any] | None:
+    connection.settimeout(SERVER_REQUEST_TIMEOUT)
+    try:
+        request = json.loads(b"".join(iter(lambda: connection.recv(1 << 16), b"")))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(request, dict) or request.get("protocol") != SERVER_PROTOCOL:
+        return None
+    if request.get("stop"):
+        return request
+    if not isinstance(request.get("args"), list) or not isinstance(request.get("cwd"), str):
+        return None
+    request.setdefault("cython_version", "")
+    return request
+
+
+def _send(connection: socket.socket, response: dict[str, Any]) -> None:
+    with contextlib.suppress(OSError):
+        connection.sendall(json.dumps(response).encode("utf-8"))
+
+
+def _run_request(connection: socket.socket, request: dict[str, Any]) -> None:
+    """Run the cython command line of ``request`` in a forked server process."""
+    main = _import_cython("Cython.Compiler.Main")
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            os.chdir(request["cwd"])
+            sys.argv = ["cython", *request["args"]]
+            main.main(command_line=1)
+            returncode = 0
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else int(e.code is not None)
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+        except OSError as e:
+            print(e, file=sys.stderr)
+            returncode = 1
+    _send(connection, {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()})
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cache-dir", type=Path, help="cache directory")
+    parser.add_argument("--cache-max-size", type=float, default=512, help="maximum cache size in megabytes")
+    parser.add_argument("--cython-version", default="", help="version of the cython program")
+    parser.add_argument(
+        "--dep", type=Path, action="append", default=[], help="dependency known at configure time (repeatable)"
+    )
+    parser.add_argument("--show-stats", action="store_true", help="print the cache statistics and exit")
+    parser.add_argument("--zero-stats", action="store_true", help="reset the cache statistics and exit")
+    parser.add_argument("--server", action="store_true", help="compile in the compile server, starting it if needed")
+    parser.add_argument("--server-address", type=Path, help="socket of the compile server")
+    parser.add_argument("--serve", action="store_true", help="run the compile server in the foreground")
+    parser.add_argument("--stop-server", action="store_true", help="stop the compile server and exit")
+    parser.add_argument(
+        "--server-idle-timeout", type=float, default=SERVER_IDLE_TIMEOUT, help="seconds before an idle server exits"
+    )
+    parser.add_argument("--marker", help="text of a string constant appended to the generated source")
+    parser.add_argument("cython_args", nargs=argparse.REMAINDER, help="-- followed by the cython command line")
+    args = parser.parse_args(argv)
+
+    address = args.server_address
+    if address is None and (args.server or args.serve or args.stop_server) and server_supported():
+        address = server_address(args.cython_version)
+    if args.serve or args.stop_server:
+        if address is None:
+            parser.error("the compile server is not supported on this platform")
+        if args.stop_server:
+            return 0 if CompileServerClient(address, args.cython_version, autostart=False).stop() else 1
+        return CompileServer(address, args.cython_version, args.server_idle_timeout).serve()
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = CythonCache(args.cache_dir, int(args.cache_max_size * 1024 * 1024))
+    elif args.show_stats or args.zero_stats:
+        parser.error("--show-stats and --zero-stats require --cache-dir")
+    if cache is not None and args.show_stats:
+        stats = cache.stats()
+        lookups = stats["hit"] + stats["miss"]
+        rate = 100.0 * stats["hit"] / lookups if lookups else 0.0
+        print(f"cython cache directory: {args.cache_dir}")
+        print(f"  hits:        {stats['hit']}")
+        print(f"  misses:      {stats['miss']}")
+        print(f"  uncacheable: {stats['uncacheable']}")
+        print(f"  hit rate:    {rate:.1f}%")
+        print(f"  cache size:  {stats['size'] / (1024 * 1024):.1f} MB in {stats['objects']} files")
+        return 0
+    if cache is not None and args.zero_stats:
+        cache.zero_stats()
+        return 0
+
+    cython_args = args.cython_args
+    if cython_args[:1] == ["--"]:
+        cython_args = cython_args[1:]
+    if not cython_args:
+        parser.error("missing cython command line")
+
+    run: Callable[[list[str]], int] = subprocess.call
+    if args.server:
+        run = CompileServerClient(address, args.cython_version, idle_timeout=args.server_idle_timeout)
+    if cache is not None:
+        return run_cached(cache, args.cython_version, cython_args, args.dep, run, args.marker)
+    returncode = run(cython_args)
+    if returncode == 0 and args.marker:
+        append_marker(_output_file(cython_args), args.marker)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
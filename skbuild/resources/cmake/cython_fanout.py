@@ -0,0 +1,191 @@
+"""
+Rebuild fan-out of the ``.pxd`` and ``.pxi`` files of a build tree.
+
+``add_cython_target`` records each module in ``cython_dependencies.jsonl`` at
+the top of the build tree, with the dependencies found when configuring, or
+the depfile Cython writes when ``CYTHON_USE_DEPFILE`` is on. This script reads
+them and reports, for each ``.pxd``/``.pxi`` file, the modules that are
+re-cythonized and recompiled when it is edited::
+
+    python -m skbuild.resources.cmake.cython_fanout <build-dir> [--json <file>] [--dot <file>]
+
+The dependencies are transitive: a module depends on the files its cimports
+cimport. The recompile cost of a module is the time Cython and the compiler
+took for it in the last build, read from ``.ninja_log`` with the Ninja
+generator. Without timings, it is estimated from the size of the generated
+source, at the rate measured for the other modules when there are any.
+
+The ``cython_dependency_graph`` target runs this script and writes the JSON and
+DOT exports next to ``cython_dependencies.jsonl``. The script only uses the
+standard library, so it can be run by the interpreter found by CMake without
+installing anything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+if __package__:
+    from .cython_driver import parse_depfile
+else:  # Run as a script, next to cython_driver.py
+    from cython_driver import parse_depfile  # type: ignore[import-not-found,no-redef,unused-ignore]
+
+__all__ = ["analyze", "main", "read_ninja_log", "to_dot"]
+
+TARGETS_FILE = "cython_dependencies.jsonl"
+
+DEPENDENCY_SUFFIXES = (".pxd", ".pxi")
+
+
+def read_ninja_log(path: Path) -> dict[str, float]:
+    """Return the duration in seconds of the last run of each output."""
+    durations: dict[str, float] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("#"):
+            continue
+        fields = line.split("\t")
+        if len(fields) < 5:
+            continue
+        start, end, _, output = fields[:4]
+        durations[os.path.normpath(output)] = (int(end) - int(start)) / 1000
+    return durations
+
+
+def _target_dependencies(target: dict[str, Any]) -> list[str]:
+    dependencies = target["dependencies"]
+    depfile = target.get("depfile")
+    if depfile and Path(depfile).is_file():
+        # Cython runs in the directory of the output.
+        dependencies = [str(path) for path in parse_depfile(Path(depfile), Path(target["output"]).parent)]
+    return sorted(
+        {os.path.normpath(path) for path in dependencies if path.endswith(DEPENDENCY_SUFFIXES)}
+        - {os.path.normpath(target["source"])}
+    )
+
+
+def _measured_cost(target: dict[str, Any], build_dir: Path, durations: dict[str, float]) -> float | None:
+    output = Path(target["output"])
+    try:
+        relative = os.path.normpath(os.path.relpath(output, build_dir))
+    except ValueError:  # Different drive on Windows
+        return None
+    cython = durations.get(relative, durations.get(os.path.normpath(output)))
+    if cython is None:
+        return None
+    # Objects are in <dir>/CMakeFiles/<target>.dir/, named after the source.
+    prefix = os.path.join(os.path.dirname(relative), "CMakeFiles", "")
+    objects = [
+        duration
+        for path, duration in durations.items()
+        if path.startswith(prefix.lstrip(os.sep))
+        and os.path.basename(path) in {f"{output.name}.o", f"{output.name}.obj"}
+    ]
+    return cython + sum(objects)
+
+
+def analyze(build_dir: Path) -> dict[str, Any]:
+    """Return the dependency graph of the Cython modules and the fan-out of each file."""
+    targets_file = build_dir / TARGETS_FILE
+    records = [json.loads(line) for line in targets_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    ninja_log = build_dir / ".ninja_log"
+    durations = read_ninja_log(ninja_log) if ninja_log.is_file() else {}
+
+    targets: list[dict[str, Any]] = []
+    for record in records:
+        output = Path(record["output"])
+        cost = _measured_cost(record, build_dir, durations)
+        targets.append(
+            {
+                "name": record["name"],
+                "source": record["source"],
+                "output": record["output"],
+                "dependencies": _target_dependencies(record),
+                "generated_size": output.stat().st_size if output.is_file() else None,
+                "cost": cost,
+                "measured": cost is not None,
+            }
+        )
+
+    # Estimate the missing costs from the generated size.
+    rates = [
+        target["cost"] / target["generated_size"] for target in targets if target["cost"] and target["generated_size"]
+    ]
+    rate = statistics.median(rates) if rates else None
+    for target in targets:
+        if target["cost"] is None and rate is not None and target["generated_size"] is not None:
+            target["cost"] = rate * target["generated_size"]
+
+    dependents: dict[str, list[dict[str, Any]]] = {}
+    for target in targets:
+        for dependency in target["dependencies"]:
+            dependents.setdefault(dependency, []).append(target)
+
+    files: list[dict[str, Any]] = []
+    for path, users in dependents.items():
+        costs = [target["cost"] for target in users]
+        files.append(
+            {
+                "path": path,
+                "fanout": len(users),
+                "targets": sorted(target["name"] for target in users),
+                "cost": sum(costs) if None not in costs else None,
+                "generated_size": sum(target["generated_size"] or 0 for target in users),
+            }
+        )
+    files.sort(key=lambda entry: (-(entry["cost"] or 0), -entry["fanout"], -entry["generated_size"], entry["path"]))
+    return {"build_dir": str(build_dir), "timings": bool(durations), "targets": targets, "files": files}
+
+
+def _dot_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def to_dot(graph: dict[str, Any]) -> str:
+    """Render the graph in the DOT language, with edges from files to modules."""
+    lines = ["digraph cython_dependencies {", "  rankdir=LR;"]
+    for entry in graph["files"]:
+        label = f"{Path(entry['path']).name}\\nfan-out {entry['fanout']}"
+        lines.append(f"  {_dot_string(entry['path'])} [shape=note, label={_dot_string(label)}];")
+    for target in graph["targets"]:
+        lines.append(f"  {_dot_string(target['output'])} [shape=box, label={_dot_string(target['name'])}];")
+        lines.extend(
+            f"  {_dot_string(dependency)} -> {_dot_string(target['output'])};" for dependency in target["dependencies"]
+        )
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("build_dir", type=Path, help="CMake build directory")
+    parser.add_argument("--json", type=Path, help="write the graph and the fan-out as JSON")
+    parser.add_argument("--dot", type=Path, help="write the graph in the DOT language")
+    parser.add_argument("--top", type=int, default=20, help="number of files to print")
+    args = parser.parse_args(argv)
+
+    if not (args.build_dir / TARGETS_FILE).is_file():
+        parser.error(f"{args.build_dir / TARGETS_FILE} does not exist; configure a project using add_cython_target")
+    graph = analyze(args.build_dir.resolve())
+    if args.json is not None:
+        args.json.write_text(json.dumps(graph, indent=2) + "\n", encoding="utf-8")
+    if args.dot is not None:
+        args.dot.write_text(to_dot(graph), encoding="utf-8")
+
+    print(f"{'fan-out':>7} {'cost':>9}  file")
+    for entry in graph["files"][: args.top]:
+        cost = "?" if entry["cost"] is None else f"{entry['cost']:.1f}s"
+        print(f"{entry['fanout']:>7} {cost:>9}  {entry['path']}")
+    if not graph["timings"]:
+        print("No .ninja_log in the build directory: costs are unknown or estimated.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Report the size and the import time of the extension modules of a directory.
+
+The modules are found in a directory where they are importable, such as an
+in-place build or an extracted wheel, and optionally compared with the same
+modules in another one, such as a build without the ``LEAN`` link profile::
+
+    python -m skbuild.resources.cmake.lean_report <directory> [--baseline <directory>] [--repeat <n>]
+
+Each module is imported ``--repeat`` times in new interpreters, and the best
+time is kept.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.machinery
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+__all__ = ["extension_modules", "import_time", "main"]
+
+TIMER = """\
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+
+def extension_modules(directory: Path) -> dict[str, Path]:
+    """Map the names of the extension modules of a directory to their files."""
+    modules = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d.isidentifier())
+        for name in sorted(files):
+            for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+                if name.endswith(suffix):
+                    path = Path(root, name)
+                    parts = path.relative_to(directory).parent.parts
+                    modules[".".join((*parts, name[: -len(suffix)]))] = path
+                    break
+    return modules
+
+
+def import_time(directory: Path, module: str, repeat: int) -> float:
+    """Best time of the import of a module, in new interpreters run from a directory."""
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER, module], cwd=directory, check=True, capture_output=True, text=True
+        )
+        times.append(float(result.stdout))
+    return min(times)
+
+
+def _delta(value: float, baseline: float, unit: str, digits: int) -> str:
+    text = f"{value - baseline:+.{digits}f} {unit}"
+    if baseline:
+        text += f", {(value - baseline) / baseline:+.1%}"
+    return f" ({text})"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", type=Path, help="directory where the modules are importable")
+    parser.add_argument("--baseline", type=Path, help="directory of the modules to compare with")
+    parser.add_argument("--repeat", type=int, default=20, help="number of imports of each module (default: 20)")
+    args = parser.parse_args(argv)
+
+    directory = args.directory.resolve()
+    modules = extension_modules(directory)
+    if not modules:
+        parser.error(f"no extension module in {args.directory}")
+    baseline = args.baseline.resolve() if args.baseline else None
+    baseline_modules = extension_modules(baseline) if baseline else {}
+
+    for name, path in modules.items():
+        size = path.stat().st_size
+        milliseconds = 1000 * import_time(directory, name, args.repeat)
+        if baseline is None or name not in baseline_modules:
+            print(f"{name}: {size} B, import {milliseconds:.3f} ms")
+            continue
+        baseline_size = baseline_modules[name].stat().st_size
+        baseline_milliseconds = 1000 * import_time(baseline, name, args.repeat)
+        print(
+            f"{name}: {size} B{_delta(size, baseline_size, 'B', 0)}, "
+            f"import {milliseconds:.3f} ms{_delta(milliseconds, baseline_milliseconds, 'ms', 3)}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Check that an OpenMP extension scales with the number of threads.
+
+A statement is timed in new interpreters, with one OpenMP thread and then with
+more of them::
+
+    python -m skbuild.resources.cmake.openmp_scaling [--setup <code>] [--threads <n>] [--min-speedup <x>] <statement>
+
+The number of threads is set with ``OMP_NUM_THREADS`` (by default, the number
+of CPUs available to the process, up to 4). The best time of ``--repeat`` runs
+is kept for each of them. The command fails if the speedup is lower than
+``--min-speedup`` (by default, as if each extra thread did half the work of
+the first one), such as when the extension is built without OpenMP.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+__all__ = ["available_cpus", "main", "time_statement"]
+
+TIMER = """\
+import sys, timeit
+setup, statement, repeat = sys.argv[1], sys.argv[2], int(sys.argv[3])
+print(min(timeit.repeat(statement, setup, number=1, repeat=repeat)))
+"""
+
+
+def available_cpus() -> int:
+    """Number of CPUs the process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def time_statement(statement: str, setup: str, threads: int, repeat: int) -> float:
+    """Best time of a statement in a new interpreter with ``threads`` OpenMP threads."""
+    env = {**os.environ, "OMP_NUM_THREADS": str(threads)}
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER, setup, statement, str(repeat)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(result.stdout)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("statement", help="Python statement calling the extension")
+    parser.add_argument("--setup", default="pass", help="code run once before the timing, such as imports")
+    parser.add_argument("--threads", type=int, default=min(available_cpus(), 4), help="number of threads")
+    parser.add_argument("--min-speedup", type=float, help="minimum speedup (default: (threads + 1) / 2)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs (default: 5)")
+    args = parser.parse_args(argv)
+
+    if args.threads < 2:
+        parser.error("at least 2 threads are needed to measure a speedup")
+    min_speedup = args.min_speedup if args.min_speedup is not None else (args.threads + 1) / 2
+
+    serial = time_statement(args.statement, args.setup, 1, args.repeat)
+    parallel = time_statement(args.statement, args.setup, args.threads, args.repeat)
+    speedup = serial / parallel
+    print(f"1 thread: {serial:.6f} s")
+    print(f"{args.threads} threads: {parallel:.6f} s")
+    print(f"speedup: {speedup:.2f} (minimum: {min_speedup:.2f})")
+    if speedup < min_speedup:
+        print("openmp_scaling: the extension does not scale with the number of threads", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Profile-guided optimization of the extensions of a ``setup.py`` project.
+
+The targets of ``add_python_library`` and ``add_python_extension`` are built
+according to the ``PYTHON_EXTENSION_PGO`` cache variable. This script runs the
+three steps of the workflow from the project directory::
+
+    python -m skbuild.resources.cmake.pgo --train "<command>" [--profile-dir <dir>] [-- <setup.py arguments>]
+
+1. The extensions are built in place and instrumented
+   (``setup.py build_ext --inplace`` with ``PYTHON_EXTENSION_PGO=GENERATE``).
+2. The training command runs in a shell, in the project directory, where it
+   imports the instrumented extensions. The profiles are merged with
+   ``llvm-profdata`` when they come from Clang (found on the ``PATH``, or set
+   with the ``LLVM_PROFDATA`` environment variable).
+3. ``setup.py`` runs with the given arguments (``build_ext --inplace`` by
+   default) and ``PYTHON_EXTENSION_PGO=USE``.
+
+The profiles are stored in ``<dir>/data`` (``build/pgo`` by default) with a
+fingerprint of the sources of the project, the compiler environment variables
+and ``CMAKE_ARGS``. The first two steps are skipped while the fingerprint is
+unchanged, unless ``--force`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+__all__ = ["fingerprint", "main"]
+
+SOURCE_SUFFIXES = (
+    ".c",
+    ".cc",
+    ".cpp",
+    ".cxx",
+    ".h",
+    ".hh",
+    ".hpp",
+    ".hxx",
+    ".pyx",
+    ".pxd",
+    ".pxi",
+    ".f",
+    ".f90",
+    ".pyf",
+    ".src",
+    ".in",
+    ".cmake",
+)
+
+SOURCE_NAMES = ("CMakeLists.txt", "setup.py", "pyproject.toml")
+
+SKIPPED_DIRS = ("build", "_skbuild", "dist", ".git", ".tox", ".nox", "__pycache__")
+
+ENVIRONMENT = ("CC", "CXX", "FC", "CFLAGS", "CXXFLAGS", "FFLAGS", "LDFLAGS", "CMAKE_ARGS", "CMAKE_GENERATOR")
+
+
+def fingerprint(project_dir: Path) -> str:
+    """Hash the sources of a project and the environment they are built with."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(project_dir):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS and not d.endswith(".egg-info"))
+        for name in sorted(files):
+            if name in SOURCE_NAMES or name.endswith(SOURCE_SUFFIXES):
+                path = Path(root, name)
+                digest.update(path.relative_to(project_dir).as_posix().encode())
+                digest.update(b"\0")
+                digest.update(hashlib.sha256(path.read_bytes()).digest())
+    for name in ENVIRONMENT:
+        digest.update(f"{name}={os.environ.get(name, '')}\0".encode())
+    return digest.hexdigest()
+
+
+def _setup(setup_args: list[str], mode: str, data_dir: Path) -> None:
+    cmake_args = os.environ.get("CMAKE_ARGS", "")
+    pgo_args = f"-DPYTHON_EXTENSION_PGO:STRING={mode} -DPYTHON_EXTENSION_PGO_DIR:PATH={data_dir.as_posix()}"
+    env = {**os.environ, "CMAKE_ARGS": f"{cmake_args} {pgo_args}".strip()}
+    print(f"pgo: setup.py {' '.join(setup_args)} ({mode})", flush=True)
+    subprocess.run([sys.executable, "setup.py", *setup_args], env=env, check=True)
+
+
+def _merge_clang_profiles(data_dir: Path) -> None:
+    raw_profiles = sorted(data_dir.glob("*.profraw"))
+    if not raw_profiles:
+        return
+    llvm_profdata = os.environ.get("LLVM_PROFDATA") or shutil.which("llvm-profdata")
+    if llvm_profdata is None:
+        msg = "llvm-profdata is needed to merge the Clang profiles: add it to the PATH or set LLVM_PROFDATA"
+        raise FileNotFoundError(msg)
+    output = data_dir / "default.profdata"
+    subprocess.run([llvm_profdata, "merge", f"-output={output}", *map(str, raw_profiles)], check=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--train", required=True, help="shell command exercising the in-place extensions")
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path(os.environ.get("SKBUILD_PYTHON_EXTENSION_PGO_DIR") or Path("build", "pgo")),
+        help="directory of the profiles (default: build/pgo)",
+    )
+    parser.add_argument("--force", action="store_true", help="train again even if the sources did not change")
+    parser.add_argument("setup_args", nargs="*", help="arguments of the optimized setup.py run")
+    args = parser.parse_args(argv)
+
+    if not Path("setup.py").is_file():
+        parser.error("run from the directory of setup.py")
+    setup_args = args.setup_args or ["build_ext", "--inplace"]
+    profile_dir = args.profile_dir.resolve()
+    data_dir = profile_dir / "data"
+    stamp = profile_dir / "fingerprint"
+
+    current = fingerprint(Path.cwd())
+    if args.force or not stamp.is_file() or stamp.read_text(encoding="utf-8").strip() != current:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        stamp.unlink(missing_ok=True)
+        data_dir.mkdir(parents=True)
+        _setup(["build_ext", "--inplace"], "GENERATE", data_dir)
+        print(f"pgo: {args.train}", flush=True)
+        subprocess.run(args.train, shell=True, check=True)
+        _merge_clang_profiles(data_dir)
+        stamp.write_text(current + "\n", encoding="utf-8")
+    else:
+        print(f"pgo: reusing the profiles of {data_dir}", flush=True)
+
+    _setup(setup_args, "USE", data_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
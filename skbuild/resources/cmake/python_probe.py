@@ -0,0 +1,138 @@
+"""
+Introspection of a Python interpreter for the CMake modules of scikit-build.
+
+``PythonProbe.cmake`` runs this script once per interpreter to gather what
+``FindPythonExtensions``, ``FindNumPy``, ``FindF2PY`` and ``FindCython`` need::
+
+    python python_probe.py <output.cmake>
+
+The values are written as ``set(PYTHON_PROBE_<NAME> "<value>")`` commands.
+NumPy is located without being imported when possible, since importing it is
+the slowest part of the probe.
+
+The script runs in the interpreter found by CMake, so it only uses the
+standard library.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import itertools
+import os
+import site
+import sys
+import sysconfig
+from collections.abc import Iterable
+from importlib import metadata
+
+__all__ = ["main", "probe"]
+
+
+def _site_packages() -> tuple[str, str]:
+    candidate_lists: list[Iterable[str]] = [(sysconfig.get_paths()["purelib"],)]
+    with contextlib.suppress(AttributeError):  # Missing in virtualenv < 20
+        candidate_lists.append(site.getsitepackages())
+    with contextlib.suppress(AttributeError):
+        candidate_lists.append((site.getusersitepackages(),))
+
+    for candidate in itertools.chain.from_iterable(candidate_lists):
+        relative = os.path.relpath(candidate, sys.prefix)
+        if not relative.startswith(".."):
+            return candidate, relative
+    return "", ""
+
+
+def _distribution_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _numpy(values: dict[str, str]) -> None:
+    spec = importlib.util.find_spec("numpy")
+    if spec is None or not spec.submodule_search_locations:
+        return
+    package = next(iter(spec.submodule_search_locations))
+
+    include_dir = ""
+    for core in ("_core", "core"):
+        candidate = os.path.join(package, core, "include")
+        if os.path.isfile(os.path.join(candidate, "numpy", "arrayobject.h")):
+            include_dir = candidate
+            break
+    version = _distribution_version("numpy")
+    if not include_dir or not version:
+        import numpy as np  # noqa: PLC0415
+
+        include_dir = include_dir or np.get_include()
+        version = version or np.__version__
+
+    values["NUMPY_VERSION"] = version
+    values["NUMPY_INCLUDE_DIR"] = include_dir
+    values["F2PY_INCLUDE_DIR"] = os.path.join(package, "f2py", "src")
+    # numpy.distutils provides the template programs of NumPy < 1.15.0.
+    for name in ("conv_template", "from_template"):
+        path = os.path.join(package, "distutils", name + ".py")
+        values["NUMPY_" + name.upper()] = path if os.path.isfile(path) else ""
+
+
+def _search_path() -> list[str]:
+    # The user site is listed even when it does not exist yet, so that the
+    # packages installed there later invalidate the cached probe.
+    paths = [path for path in sys.path if path and os.path.isdir(path)]
+    if site.ENABLE_USER_SITE:
+        user_site = site.getusersitepackages()
+        if user_site not in paths:
+            paths.append(user_site)
+    return paths
+
+
+def probe() -> dict[str, str]:
+    """Gather the values of the interpreter running this script."""
+    site_packages, relative_site_packages = _site_packages()
+    values = {
+        "SEPARATOR": os.sep,
+        "PATH_SEPARATOR": os.pathsep,
+        "PREFIX": sys.prefix,
+        "SITE_PACKAGES_DIR": site_packages,
+        "RELATIVE_SITE_PACKAGES_DIR": relative_site_packages,
+        "EXT_SUFFIX": sysconfig.get_config_var("EXT_SUFFIX") or "",
+        "SCRIPTS_DIR": sysconfig.get_paths()["scripts"],
+        "INCLUDE_DIR": sysconfig.get_paths()["include"],
+        "GIL_DISABLED": "1" if sysconfig.get_config_var("Py_GIL_DISABLED") else "0",
+        "PATH": ";".join(_search_path()),
+        "NUMPY_VERSION": "",
+        "NUMPY_INCLUDE_DIR": "",
+        "NUMPY_CONV_TEMPLATE": "",
+        "NUMPY_FROM_TEMPLATE": "",
+        "F2PY_INCLUDE_DIR": "",
+        "CYTHON_VERSION": _distribution_version("Cython"),
+    }
+    _numpy(values)
+    return values
+
+
+def _cmake_string(value: str) -> str:
+    for character, escaped in (("\\", "\\\\"), ('"', '\\"'), ("$", "\\$"), ("\n", "\\n")):
+        value = value.replace(character, escaped)
+    return '"' + value + '"'
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        sys.stderr.write("usage: python python_probe.py <output.cmake>\n")
+        return 2
+    lines = [f"set(PYTHON_PROBE_{name} {_cmake_string(value)})\n" for name, value in sorted(probe().items())]
+    directory = os.path.dirname(args[0])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args[0], "w", encoding="utf-8") as output:
+        output.writelines(lines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
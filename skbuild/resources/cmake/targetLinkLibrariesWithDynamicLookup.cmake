@@ -76,6 +76,16 @@
 # of CMake's linker flag list changes; ``CMAKE_STATIC_LINKER_FLAGS`` if
 # ``<TargetType>`` is "STATIC", and ``CMAKE_SHARED_LINKER_FLAGS`` otherwise.
 #
+# The answer is known for the GNU and Clang compilers targeting Linux, which
+# link with GNU ld, gold, lld or mold: the test project is only built when
+# cross compiling, when the linker flags mention undefined symbols, or when
+# ``DYNAMIC_LOOKUP_VERIFY`` is set.
+#
+# Otherwise, the results are also stored in ``DYNAMIC_LOOKUP_CACHE_DIR``, to be
+# reused by the other build trees using the same C compiler, linker, target
+# platform, ``<TargetType>``, ``<LibType>`` and flags, instead of building the
+# test project again.
+#
 #
 # Defined variables:
 #
@@ -96,6 +106,20 @@
 #   Cached, global alias for ``<LinkFlagsVar>``
 #
 #
+# Cache variables:
+#
+# ``DYNAMIC_LOOKUP_CACHE_DIR``
+#   The directory of the results shared by the build trees. It defaults to the
+#   value of the ``SKBUILD_DYNAMIC_LOOKUP_CACHE_DIR`` environment variable, or
+#   to the ``scikit-build`` directory of the user cache directory. Set it to an
+#   empty string to only cache the results in the build tree.
+#
+# ``DYNAMIC_LOOKUP_VERIFY``
+#   Build the test project even when the answer is known or stored in
+#   ``DYNAMIC_LOOKUP_CACHE_DIR``, and store its result. It defaults to the value
+#   of the ``SKBUILD_DYNAMIC_LOOKUP_VERIFY`` environment variable, or ``OFF``.
+#
+#
 # Private Functions
 # ^^^^^^^^^^^^^^^^^
 #
@@ -131,6 +155,23 @@
 #   The abbreviated version of the ``<Target>``'s type.
 #
 #
+# .. cmake:command:: _known_dynamic_lookup
+#
+# ::
+#
+#     _known_dynamic_lookup(<TargetType>
+#                           <LibType>
+#                           <LinkerFlags>
+#                           <KnownVar>
+#                           <ResultVar>
+#                           <LinkFlagsVar>)
+#
+#
+# Look up the result of ``_test_weak_link_project`` for the current toolchain
+# in the table of the toolchains where it does not vary. ``<KnownVar>`` is set
+# to false if the toolchain is not in the table.
+#
+#
 # .. cmake:command:: _test_weak_link_project
 #
 # ::
@@ -160,6 +201,36 @@
 #   target of type ``<LibType>``.
 #
 
+if(NOT DEFINED DYNAMIC_LOOKUP_CACHE_DIR)
+  # Same default as PYTHON_PROBE_CACHE_DIR
+  if(DEFINED ENV{SKBUILD_DYNAMIC_LOOKUP_CACHE_DIR})
+    set(_dynamic_lookup_cache_dir "$ENV{SKBUILD_DYNAMIC_LOOKUP_CACHE_DIR}")
+  elseif(DEFINED ENV{XDG_CACHE_HOME})
+    set(_dynamic_lookup_cache_dir "$ENV{XDG_CACHE_HOME}/scikit-build")
+  elseif(WIN32 AND DEFINED ENV{LOCALAPPDATA})
+    set(_dynamic_lookup_cache_dir "$ENV{LOCALAPPDATA}/scikit-build/Cache")
+  elseif(APPLE AND DEFINED ENV{HOME})
+    set(_dynamic_lookup_cache_dir "$ENV{HOME}/Library/Caches/scikit-build")
+  elseif(DEFINED ENV{HOME})
+    set(_dynamic_lookup_cache_dir "$ENV{HOME}/.cache/scikit-build")
+  else()
+    set(_dynamic_lookup_cache_dir "")
+  endif()
+  file(TO_CMAKE_PATH "${_dynamic_lookup_cache_dir}" _dynamic_lookup_cache_dir)
+  set(DYNAMIC_LOOKUP_CACHE_DIR "${_dynamic_lookup_cache_dir}" CACHE PATH
+    "Directory of the dynamic lookup checks shared by the build trees")
+  mark_as_advanced(DYNAMIC_LOOKUP_CACHE_DIR)
+endif()
+
+set(_dynamic_lookup_verify_default OFF)
+if("$ENV{SKBUILD_DYNAMIC_LOOKUP_VERIFY}")
+  set(_dynamic_lookup_verify_default ON)
+endif()
+option(DYNAMIC_LOOKUP_VERIFY
+  "Check dynamic lookup with a test project even when the result is known"
+  ${_dynamic_lookup_verify_default})
+mark_as_advanced(DYNAMIC_LOOKUP_VERIFY)
+
 function(_get_target_type result_var target)
   set(target_type "SHARED_LIBRARY")
   if(TARGET ${target})
@@ -188,6 +259,36 @@ function(_get_target_type result_var target)
 endfunction()
 
 
+function(_known_dynamic_lookup
+         target_type
+         lib_type
+         linker_flags
+         known_var
+         can_weak_link_var
+         link_flags_var)
+
+  set(${known_var} FALSE PARENT_SCOPE)
+
+  # GNU ld, gold, lld and mold all accept --unresolved-symbols. The test project
+  # loads ./counter.so, so only MODULE targets and executables pass.
+  if(     CMAKE_CROSSCOMPILING
+       OR NOT CMAKE_SYSTEM_NAME STREQUAL "Linux"
+       OR NOT CMAKE_C_COMPILER_ID MATCHES "^(GNU|Clang)$"
+       OR linker_flags MATCHES "undefined|unresolved|defs|-static")
+    return()
+  endif()
+
+  if("${target_type}" STREQUAL "MODULE" OR "${target_type}" STREQUAL "EXE")
+    set(${can_weak_link_var} TRUE PARENT_SCOPE)
+    set(${link_flags_var} "-Wl,--unresolved-symbols=ignore-all" PARENT_SCOPE)
+  else()
+    set(${can_weak_link_var} FALSE PARENT_SCOPE)
+    set(${link_flags_var} "" PARENT_SCOPE)
+  endif()
+  set(${known_var} TRUE PARENT_SCOPE)
+endfunction()
+
+
 function(_test_weak_link_project
          target_type
          lib_type
@@ -514,11 +615,72 @@ function(_check_dynamic_lookup
   endif()
 
   if(NOT DEFINED ${cache_var})
+    if("${target_type}" STREQUAL "STATIC")
+      set(linker_flags "${CMAKE_STATIC_LINKER_FLAGS} ${CMAKE_SHARED_LINKER_FLAGS}")
+    else()
+      set(linker_flags "${CMAKE_SHARED_LINKER_FLAGS}")
+    endif()
+    set(linker_flags "${linker_flags} ${CMAKE_EXE_LINKER_FLAGS} $ENV{LDFLAGS}")
+    set(test_description "Weak Link ${target_type} -> ${lib_type}")
+
+    # The results stored for other build trees are keyed on everything that
+    # goes into the test project.
+    set(persistent_file "")
+    if(DYNAMIC_LOOKUP_CACHE_DIR AND CMAKE_C_COMPILER_ID)
+      string(SHA256 persistent_key
+        "${CMAKE_VERSION}|${CMAKE_GENERATOR}|${CMAKE_SYSTEM_NAME}|${CMAKE_SYSTEM_PROCESSOR}|\
+${CMAKE_C_COMPILER}|${CMAKE_C_COMPILER_ID}|${CMAKE_C_COMPILER_VERSION}|${CMAKE_LINKER}|\
+${CMAKE_CROSSCOMPILING_EMULATOR}|${CMAKE_OSX_SYSROOT}|${CMAKE_OSX_ARCHITECTURES}|\
+${CMAKE_OSX_DEPLOYMENT_TARGET}|${CMAKE_MACOSX_RPATH}|${target_type}|${lib_type}|\
+${linker_flags}|${CMAKE_C_FLAGS}|$ENV{CFLAGS}|${SKBUILD_LINK_LIBRARIES_KEYWORD}")
+      string(SUBSTRING "${persistent_key}" 0 16 persistent_key)
+      set(persistent_file "${DYNAMIC_LOOKUP_CACHE_DIR}/dynamic-lookup-${persistent_key}.cmake")
+    endif()
 
-    _test_weak_link_project(${target_type}
+    set(known FALSE)
+    if(NOT DYNAMIC_LOOKUP_VERIFY)
+      _known_dynamic_lookup(${target_type}
                             ${lib_type}
+                            "${linker_flags}"
+                            known
                             has_dynamic_lookup
                             link_flags)
+      if(known)
+        message(STATUS "Performing Test ${test_description} - ${has_dynamic_lookup} (known toolchain)")
+      elseif(persistent_file AND EXISTS "${persistent_file}")
+        include("${persistent_file}")
+        set(has_dynamic_lookup "${_dynamic_lookup_result}")
+        set(link_flags "${_dynamic_lookup_flags}")
+        set(known TRUE)
+        message(STATUS "Performing Test ${test_description} - ${has_dynamic_lookup} (cached in ${DYNAMIC_LOOKUP_CACHE_DIR})")
+      endif()
+    endif()
+
+    if(NOT known)
+      _test_weak_link_project(${target_type}
+                              ${lib_type}
+                              has_dynamic_lookup
+                              link_flags)
+
+      if(persistent_file)
+        # Written next to the final file and renamed, so that concurrent
+        # configures never read a partial file. The directory may not be
+        # writable, in which case the result is only cached in the build tree.
+        string(RANDOM LENGTH 8 suffix)
+        set(temporary_file "${persistent_file}.${suffix}.tmp")
+        execute_process(COMMAND ${CMAKE_COMMAND} -E make_directory "${DYNAMIC_LOOKUP_CACHE_DIR}"
+                        OUTPUT_QUIET ERROR_QUIET)
+        execute_process(COMMAND ${CMAKE_COMMAND} -E touch "${temporary_file}"
+                        RESULT_VARIABLE persistent_result
+                        OUTPUT_QUIET ERROR_QUIET)
+        if(persistent_result EQUAL 0)
+          file(WRITE "${temporary_file}"
+            "set(_dynamic_lookup_result ${has_dynamic_lookup})\n"
+            "set(_dynamic_lookup_flags \"${link_flags}\")\n")
+          file(RENAME "${temporary_file}" "${persistent_file}")
+        endif()
+      endif()
+    endif()
 
     set(caveat " (when linking ${target_type} against ${lib_type})")
 
@@ -9,6 +9,7 @@ except ImportError:
     import distutils  # Python < 3.10
 
 import contextlib
+import glob
 import os
 import pathlib
 import re
@@ -16,6 +17,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import zipfile
 from contextlib import contextmanager
 
 import requests
@@ -24,6 +26,7 @@ SAMPLES_DIR = pathlib.Path(__file__).resolve().parent / "samples"
 
 __all__ = [
     "SAMPLES_DIR",
+    "built_wheel",
     "cmake_build_dir",
     "execute_setup_py",
     "get_cmakecache_variables",
@@ -32,6 +35,7 @@ __all__ = [
     "prepare_project",
     "push_dir",
     "push_env",
+    "run_python",
     "to_platform_path",
     "to_unix_path",
 ]
@@ -82,6 +86,31 @@ def cmake_build_dir(base="."):
     return candidates[0] if candidates else None
 
 
+@contextmanager
+def built_wheel(project_setup_py_test, project, directory):
+    """Context manager building a wheel of the sample ``project`` with the
+    ``project_setup_py_test`` fixture and extracting it into ``directory``.
+
+    It yields the CMake build directory, with the project directory as the
+    current working directory.
+    """
+    with project_setup_py_test(project, ["bdist_wheel"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        (wheel,) = glob.glob("dist/*.whl")
+        with zipfile.ZipFile(wheel) as archive:
+            archive.extractall(directory)
+        yield build_dir
+
+
+def run_python(directory: os.PathLike[str] | str, *args: str, env: dict[str, str] | None = None) -> str:
+    """Run the Python interpreter with ``args`` in ``directory``, such as an
+    extracted wheel, and return its standard output."""
+    return subprocess.run(
+        [sys.executable, *args], cwd=directory, env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+
 @contextmanager
 def push_argv(argv):
     old_argv = sys.argv
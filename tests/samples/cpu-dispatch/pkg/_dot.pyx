@@ -0,0 +1,17 @@
+cdef extern from "kernel.h":
+    double kernel_dot(const double *x, const double *y, long n) nogil
+    const char *kernel_target()
+
+
+def dot(const double[::1] x, const double[::1] y):
+    """Dot product of two vectors of the same length."""
+    if x.shape[0] != y.shape[0]:
+        raise ValueError("the vectors must have the same length")
+    if x.shape[0] == 0:
+        return 0.0
+    return kernel_dot(&x[0], &y[0], x.shape[0])
+
+
+def target():
+    """Name of the CPU target of the kernel."""
+    return kernel_target().decode()
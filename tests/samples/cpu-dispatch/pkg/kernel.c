@@ -0,0 +1,10 @@
+#include "kernel.h"
+#include "skbuild_cpu_dispatch.h"
+
+SKBUILD_CPU_DISPATCH_DECLARE(double, kernel_dot, (const double *x, const double *y, long n));
+
+double kernel_dot(const double *x, const double *y, long n) {
+  return SKBUILD_CPU_DISPATCH_CALL(kernel_dot, (x, y, n));
+}
+
+const char *kernel_target(void) { return SKBUILD_CPU_DISPATCH_NAME(); }
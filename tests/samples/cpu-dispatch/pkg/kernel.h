@@ -0,0 +1,7 @@
+#ifndef KERNEL_H
+#define KERNEL_H
+
+double kernel_dot(const double *x, const double *y, long n);
+const char *kernel_target(void);
+
+#endif
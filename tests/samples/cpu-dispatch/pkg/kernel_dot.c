@@ -0,0 +1,10 @@
+#include "skbuild_cpu_dispatch.h"
+
+double SKBUILD_CPU_DISPATCH_CURFX(kernel_dot)(const double *x, const double *y, long n) {
+  double total = 0.0;
+  long i;
+  for (i = 0; i < n; ++i) {
+    total += x[i] * y[i];
+  }
+  return total;
+}
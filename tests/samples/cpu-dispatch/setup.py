@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="cpu-dispatch",
+    version="1.2.3",
+    description="a package whose C kernel is compiled for several CPU targets",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
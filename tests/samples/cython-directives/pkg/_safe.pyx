@@ -0,0 +1,2 @@
+def divide(int a, int b):
+    return a // b
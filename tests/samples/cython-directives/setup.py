@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="cython-directives",
+    version="1.2.3",
+    description="a package using Cython directives presets",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
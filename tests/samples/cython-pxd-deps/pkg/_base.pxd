@@ -0,0 +1 @@
+ctypedef double real_t
@@ -0,0 +1,5 @@
+from _types cimport scale
+
+
+def twice(double x):
+    return scale(x)
@@ -0,0 +1,5 @@
+from _base cimport real_t
+
+
+def half(real_t x):
+    return x / 2
@@ -0,0 +1,5 @@
+from _base cimport real_t
+
+
+cdef inline real_t scale(real_t x):
+    return 2 * x
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="cython-pxd-deps",
+    version="1.2.3",
+    description="a cython package whose extension cimports a chain of .pxd files",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
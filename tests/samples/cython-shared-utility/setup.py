@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="cython-shared-utility",
+    version="1.2.3",
+    description="a package whose Cython modules share their utility code",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
@@ -0,0 +1,6 @@
+def spin(long n):
+    cdef long i
+    cdef double total = 0
+    for i in range(n):
+        total += (i % 7) * 0.5
+    return total
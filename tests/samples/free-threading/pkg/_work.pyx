@@ -0,0 +1,7 @@
+def spin(long n):
+    cdef long i
+    cdef double total = 0
+    with nogil:
+        for i in range(n):
+            total += (i % 7) * 0.5
+    return total
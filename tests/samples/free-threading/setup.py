@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="free-threading",
+    version="1.2.3",
+    description="a package whose Cython module does not need the GIL",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
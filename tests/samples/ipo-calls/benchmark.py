@@ -0,0 +1,26 @@
+"""Time the calls of ``pkg._calls.run`` to the C kernel.
+
+Build the package with and without interprocedural optimization, e.g.::
+
+    CMAKE_ARGS=-DPYTHON_EXTENSION_IPO:BOOL=ON pip install .
+    python benchmark.py
+
+and compare the time per call: with IPO, the kernel is inlined in the loop.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+
+import pkg._calls
+
+
+def main(n: int) -> None:
+    assert pkg._calls.run(n) > 0
+    best = min(timeit.repeat(lambda: pkg._calls.run(n), number=1, repeat=5))
+    print(f"{best / n * 1e9:.3f} ns/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000_000)
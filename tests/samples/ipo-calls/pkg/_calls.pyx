@@ -0,0 +1,11 @@
+cdef extern from "kernel.h":
+    long kernel_step(long i) nogil
+
+
+def run(long n):
+    """Sum the C kernel over ``range(n)``, with one call per item."""
+    cdef long i
+    cdef long total = 0
+    for i in range(n):
+        total += kernel_step(i)
+    return total
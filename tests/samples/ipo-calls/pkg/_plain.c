@@ -0,0 +1,9 @@
+#include <Python.h>
+
+static struct PyModuleDef module = {
+  PyModuleDef_HEAD_INIT, "_plain", NULL, -1, NULL, NULL, NULL, NULL, NULL
+};
+
+PyMODINIT_FUNC PyInit__plain(void) {
+  return PyModule_Create(&module);
+}
@@ -0,0 +1,5 @@
+#include "kernel.h"
+
+long kernel_step(long i) {
+  return (i * 7) ^ (i >> 3);
+}
@@ -0,0 +1,6 @@
+#ifndef KERNEL_H
+#define KERNEL_H
+
+long kernel_step(long i);
+
+#endif
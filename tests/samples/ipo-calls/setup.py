@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="ipo-calls",
+    version="1.2.3",
+    description="a package whose Cython module calls a C function in a tight loop",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
@@ -0,0 +1,79 @@
+"""Time the link of the _large module with each linker.
+
+    python benchmark.py [--files N] [--functions N] [--repeat N] [linker ...]
+
+Each linker gets its own build tree in ``build/link-<linker>``, configured with
+``PYTHON_EXTENSION_LINKER``. The module is linked again ``--repeat`` times,
+and the best time is printed. By default, the installed linkers among bfd,
+gold, lld and mold are compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.machinery
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from skbuild.resources import cmake
+
+LINKERS = {"bfd": "ld.bfd", "gold": "ld.gold", "lld": "ld.lld", "mold": "mold"}
+
+
+def configure(build_dir: Path, linker: str, files: int, functions: int) -> None:
+    generator = ["-G", "Ninja"] if shutil.which("ninja") else []
+    subprocess.run(
+        [
+            "cmake",
+            "-S",
+            str(Path(__file__).parent),
+            "-B",
+            str(build_dir),
+            *generator,
+            "-DCMAKE_BUILD_TYPE=RelWithDebInfo",
+            f"-DCMAKE_MODULE_PATH={Path(cmake.__file__).parent.as_posix()}",
+            f"-DPython_EXECUTABLE={sys.executable}",
+            f"-DPYTHON_EXTENSION_LINKER={linker}",
+            f"-DLARGE_EXTENSION_FILES={files}",
+            f"-DLARGE_EXTENSION_FUNCTIONS={functions}",
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+def link_time(build_dir: Path) -> float:
+    """Time the build of the module once it is removed, so that only the link runs."""
+    for path in build_dir.rglob("_large*"):
+        if path.name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)):
+            path.unlink()
+    start = time.perf_counter()
+    subprocess.run(["cmake", "--build", str(build_dir), "--target", "_large"], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("linkers", nargs="*", help="linkers to compare (default: the installed ones)")
+    parser.add_argument("--files", type=int, default=8, help="number of generated C files")
+    parser.add_argument("--functions", type=int, default=2000, help="number of functions per file")
+    parser.add_argument("--repeat", type=int, default=3, help="number of links")
+    args = parser.parse_args()
+
+    linkers = args.linkers or [linker for linker, program in LINKERS.items() if shutil.which(program)]
+    for linker in linkers:
+        build_dir = Path("build", f"link-{linker}")
+        configure(build_dir, linker, args.files, args.functions)
+        subprocess.run(["cmake", "--build", str(build_dir)], check=True, capture_output=True)
+        cache = (build_dir / "CMakeCache.txt").read_text()
+        used = f"_PYTHON_EXTENSION_LINKER_{linker.upper()}:INTERNAL=TRUE" in cache
+        best = min(link_time(build_dir) for _ in range(args.repeat))
+        print(f"{linker}: {best:.3f} s{'' if used else ' (not supported, default linker)'}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
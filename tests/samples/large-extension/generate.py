@@ -0,0 +1,29 @@
+"""Generate the C files of the _large module: generate.py <dir> <files> <functions>."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+directory, files, functions = Path(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+for index in range(1, files + 1):
+    lines = ['#include "large.h"', ""]
+    for function in range(functions):
+        lines.append(f"long large_{index}_{function}(long x) {{ return x * {function} + {index}; }}")
+    lines.append("")
+    lines.append(f"long large_{index}(long x) {{")
+    lines.append("  long total = 0;")
+    lines.extend(f"  total += large_{index}_{function}(x);" for function in range(functions))
+    lines.append("  return total;")
+    lines.append("}")
+    if index == 1:
+        lines.append("")
+        lines.extend(f"long large_{other}(long x);" for other in range(2, files + 1))
+        lines.append("")
+        lines.append("long large_sum(long x) {")
+        lines.append(f"  return {' + '.join(f'large_{other}(x)' for other in range(1, files + 1))};")
+        lines.append("}")
+    path = directory / f"large_{index}.c"
+    content = "\n".join(lines) + "\n"
+    if not path.is_file() or path.read_text() != content:
+        path.write_text(content)
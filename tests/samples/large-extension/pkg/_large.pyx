@@ -0,0 +1,7 @@
+cdef extern from "large.h":
+    long large_sum(long x) nogil
+
+
+def total(long x):
+    """Sum of all the generated functions at ``x``."""
+    return large_sum(x)
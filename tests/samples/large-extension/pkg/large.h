@@ -0,0 +1,6 @@
+#ifndef LARGE_H
+#define LARGE_H
+
+long large_sum(long x);
+
+#endif
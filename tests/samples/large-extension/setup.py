@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="large-extension",
+    version="1.2.3",
+    description="a package whose extension module has many generated functions",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
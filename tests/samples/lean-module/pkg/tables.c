@@ -0,0 +1,26 @@
+#include "tables.h"
+
+/* Only the first table is used by the module. */
+static const long used_table[16] = {0, 1, 4, 9, 16, 25, 36, 49, 64, 81, 100, 121, 144, 169, 196, 225};
+
+const long unused_table[4096] = {1};
+
+long table_lookup(long i) { return used_table[i & 15]; }
+
+long unused_sum(long n) {
+  long total = 0;
+  long i;
+  for (i = 0; i < n; ++i) {
+    total += unused_table[i & 4095] * i;
+  }
+  return total;
+}
+
+long unused_product(long n) {
+  long total = 1;
+  long i;
+  for (i = 1; i < n; ++i) {
+    total *= unused_table[i & 4095] + i;
+  }
+  return total;
+}
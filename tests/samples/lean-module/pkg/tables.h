@@ -0,0 +1,6 @@
+#ifndef TABLES_H
+#define TABLES_H
+
+long table_lookup(long i);
+
+#endif
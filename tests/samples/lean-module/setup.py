@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="lean-module",
+    version="1.2.3",
+    description="a package whose extension module links unused code and data",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
@@ -0,0 +1,6 @@
+def fib(int n):
+    cdef int i
+    a, b = 0, 1
+    for i in range(n):
+        a, b = b, a + b
+    return a
@@ -0,0 +1,20 @@
+#include <Python.h>
+
+static PyObject *hello(PyObject *self, PyObject *args) {
+  (void)self;
+  (void)args;
+  return PyUnicode_FromString("hello");
+}
+
+static PyMethodDef methods[] = {
+  {"hello", hello, METH_NOARGS, NULL},
+  {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef module = {
+  PyModuleDef_HEAD_INIT, "_hello", NULL, -1, methods, NULL, NULL, NULL, NULL
+};
+
+PyMODINIT_FUNC PyInit__hello(void) {
+  return PyModule_Create(&module);
+}
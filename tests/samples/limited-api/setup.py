@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="limited-api",
+    version="1.2.3",
+    description="a package whose extension modules use the Python limited API",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
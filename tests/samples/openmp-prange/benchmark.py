@@ -0,0 +1,10 @@
+"""Compare the time of ``pkg._prange.work`` with one thread and more."""
+
+from __future__ import annotations
+
+import sys
+
+from skbuild.resources.cmake import openmp_scaling
+
+n = sys.argv[1] if len(sys.argv) > 1 else "20_000_000"
+sys.exit(openmp_scaling.main(["--setup", "import pkg._prange", f"pkg._prange.work({n})", *sys.argv[2:]]))
@@ -0,0 +1,20 @@
+from cython.parallel cimport prange
+from libc.math cimport sqrt
+
+
+cdef extern from "kernel.h":
+    int kernel_max_threads() nogil
+
+
+def max_threads():
+    """Number of OpenMP threads of the parallel loops."""
+    return kernel_max_threads()
+
+
+def work(long n):
+    """Sum ``sqrt(i)`` over ``range(n)`` in parallel."""
+    cdef long i
+    cdef double total = 0.0
+    for i in prange(n, nogil=True, schedule="static"):
+        total += sqrt(<double>i)
+    return total
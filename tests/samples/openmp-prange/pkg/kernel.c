@@ -0,0 +1,13 @@
+#include "kernel.h"
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+int kernel_max_threads(void) {
+#ifdef _OPENMP
+  return omp_get_max_threads();
+#else
+  return 1;
+#endif
+}
@@ -0,0 +1,6 @@
+#ifndef KERNEL_H
+#define KERNEL_H
+
+int kernel_max_threads(void);
+
+#endif
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from skbuild import setup
+
+setup(
+    name="openmp-prange",
+    version="1.2.3",
+    description="a package whose Cython module runs a prange loop with OpenMP",
+    author="The scikit-build team",
+    license="MIT",
+    packages=["pkg"],
+)
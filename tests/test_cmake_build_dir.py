@@ -0,0 +1,149 @@
+"""test_cmake_build_dir
+----------------------------------
+
+Tests for the persistent CMake build trees of the ``cmake_build_dir`` keyword
+of `skbuild.setup` and its ``SKBUILD_CMAKE_BUILD_DIR`` environment variable.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import shutil
+from pathlib import Path
+
+import pytest
+from scikit_build_core.cmake import CMake, CMaker
+from scikit_build_core.setuptools import build_cmake
+from scikit_build_core.setuptools.build_cmake import BuildCMake
+
+from skbuild import _build_tree
+from skbuild._build_tree import _CMakerInTree, _try_lock, build_cmake_in_tree, build_tree_root, locked
+
+from . import execute_setup_py, get_ext_suffix
+
+
+def test_build_tree_root(monkeypatch, tmp_path):
+    monkeypatch.delenv("SKBUILD_CMAKE_BUILD_DIR", raising=False)
+    assert build_tree_root(None) is None
+    assert build_tree_root(tmp_path / "trees") == tmp_path / "trees"
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_DIR", str(tmp_path / "env"))
+    assert build_tree_root(tmp_path / "trees") == tmp_path / "env"
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_DIR", "")
+    assert build_tree_root(tmp_path / "trees") is None
+
+
+def test_locked(tmp_path):
+    tree = tmp_path / "tree"
+    with locked(tree), (tree / "build.lock").open("a+b") as other:
+        assert not _try_lock(other, blocking=False)
+    with (tree / "build.lock").open("a+b") as other:
+        assert _try_lock(other, blocking=False)
+
+
+@pytest.mark.parametrize(
+    ("module", "hook"),
+    [(build_cmake, "shutil"), (build_cmake, "CMaker"), (CMaker, "_compute_cmake_args")],
+)
+def test_missing_hooks(monkeypatch, tmp_path, module, hook):
+    monkeypatch.delattr(module, hook)
+    with pytest.warns(UserWarning, match=f"lacks {module.__name__.rsplit('.', 1)[-1]}.{hook}"):
+        assert build_cmake_in_tree(BuildCMake, tmp_path) is BuildCMake
+
+
+@pytest.mark.skipif(
+    platform.python_implementation() == "PyPy", reason="PyPy is reporting an empty linker, doesn't seem to be our fault"
+)
+def test_missing_hooks_build(project_setup_py_test, monkeypatch, tmp_path):
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_DIR", str(tmp_path / "trees"))
+    monkeypatch.setattr(_build_tree, "_missing_hooks", lambda _: ["CMaker.removed_hook"])
+
+    with pytest.warns(UserWarning, match="lacks CMaker.removed_hook: the CMake build tree is not kept"):
+        with project_setup_py_test("issue-284-build-ext-inplace", ["build_ext", "--inplace"]):
+            assert Path(f"hello/_hello_sk{get_ext_suffix()}").exists()
+    assert not (tmp_path / "trees").exists()
+
+
+def test_skipped_configure_state(tmp_path, capfd):
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "CMakeLists.txt").write_text("cmake_minimum_required(VERSION 3.15)\nproject(test NONE)\n")
+    cmake = CMake.default_search()
+
+    def configure():
+        cmaker = _CMakerInTree(cmake, source_dir=source_dir, build_dir=tmp_path / "build", build_type="Release")
+        cmaker.init_cache({"SOME_ENTRY": "value"})
+        cmaker.configure(defines={"SOME_DEFINE": "ON"})
+        return vars(cmaker)
+
+    configured = configure()
+    assert "configuring CMake: no CMake cache" in capfd.readouterr().out
+    skipped = configure()
+    assert "CMake configuration unchanged, skipping the configure step" in capfd.readouterr().out
+    assert configured["file_api"] is not None
+    assert skipped == configured
+
+
+@pytest.mark.skipif(
+    platform.python_implementation() == "PyPy", reason="PyPy is reporting an empty linker, doesn't seem to be our fault"
+)
+def test_tree_deleted(project_setup_py_test, monkeypatch, tmp_path):
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_DIR", str(tmp_path / "trees"))
+    monkeypatch.setattr(_build_tree._KeepTree, "rmtree", lambda _, path, *args, **kwargs: shutil.rmtree(path))
+
+    with project_setup_py_test("issue-284-build-ext-inplace", ["build_ext", "--inplace"]) as project_dir:
+        pass
+    with pytest.warns(UserWarning, match="deleted the CMake build tree"):
+        with execute_setup_py(project_dir, ["build_ext", "--inplace"]):
+            pass
+
+
+@pytest.mark.skipif(
+    platform.python_implementation() == "PyPy", reason="PyPy is reporting an empty linker, doesn't seem to be our fault"
+)
+def test_build_ext_inplace_incremental(project_setup_py_test, monkeypatch, tmp_path, capfd):
+    trees = tmp_path / "trees"
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_DIR", str(trees))
+    monkeypatch.delenv("CMAKE_ARGS", raising=False)
+    extension = Path(f"hello/_hello_sk{get_ext_suffix()}")
+
+    with project_setup_py_test("issue-284-build-ext-inplace", ["build_ext", "--inplace"]) as project_dir:
+        assert extension.exists()
+        (tree,) = trees.iterdir()
+        assert json.loads((tree / "fingerprint.json").read_text())["source_dir"] == str(project_dir.resolve())
+        (obj,) = (tree / "_skbuild").rglob("_hello_sk.cxx.o")
+        mtime = obj.stat().st_mtime_ns
+    out, _ = capfd.readouterr()
+    assert "configuring CMake: no CMake cache" in out
+    (project_dir / extension).unlink()
+    untouched = tree / "_skbuild" / "untouched"
+    untouched.touch()
+
+    with execute_setup_py(project_dir, ["build_ext", "--inplace"]):
+        assert extension.exists()
+        assert Path(f"hello/_hello_ext{get_ext_suffix()}").exists()
+    assert untouched.exists()
+    assert obj.stat().st_mtime_ns == mtime
+    out, _ = capfd.readouterr()
+    assert f"using the CMake build tree {tree}" in out
+    assert "CMake configuration unchanged, skipping the configure step" in out
+
+    cmake_lists = project_dir / "CMakeLists.txt"
+    os.utime(cmake_lists, ns=(cmake_lists.stat().st_atime_ns, cmake_lists.stat().st_mtime_ns + 10**9))
+    with execute_setup_py(project_dir, ["build_ext", "--inplace"]):
+        pass
+    out, _ = capfd.readouterr()
+    assert f"configuring CMake: {cmake_lists} changed" in out
+
+    monkeypatch.setenv("CFLAGS", "-DSOME_DEFINE")
+    with execute_setup_py(project_dir, ["build_ext", "--inplace"]):
+        pass
+    out, _ = capfd.readouterr()
+    assert "configuring CMake: environment variable(s) CFLAGS changed" in out
+    assert len(list(trees.iterdir())) == 1
+
+    monkeypatch.setenv("CMAKE_ARGS", "-DSOME_OPTION:BOOL=ON")
+    with execute_setup_py(project_dir, ["build_ext", "--inplace"]):
+        pass
+    assert len(list(trees.iterdir())) == 2
@@ -0,0 +1,147 @@
+"""test_compiler_cache
+----------------------------------
+
+Tests for the ``compiler_cache`` keyword of `skbuild.setup`, with a fake
+``ccache`` logging the compilations it launches.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import textwrap
+
+import pytest
+
+from skbuild._compiler_cache import compiler_cache_launcher, launcher_environment
+
+from . import _tmpdir, execute_setup_py
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="POSIX shell compiler cache")
+
+FAKE_CCACHE = """\
+#!/bin/sh
+log="$(dirname "$0")/ccache.log"
+if [ "$1" = "--print-stats" ]; then
+  printf 'direct_cache_hit\\t0\\ncache_miss\\t%s\\n' "$(cat "$log" 2>/dev/null | wc -l)"
+  exit 0
+fi
+echo "$*" >> "$log"
+exec "$@"
+"""
+
+
+@pytest.fixture
+def fake_ccache(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ccache = bin_dir / "ccache"
+    ccache.write_text(FAKE_CCACHE)
+    ccache.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("SKBUILD_COMPILER_CACHE", raising=False)
+    monkeypatch.delenv("SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT", raising=False)
+    monkeypatch.delenv("CCACHE_BASEDIR", raising=False)
+    for language in ("C", "CXX", "Fortran"):
+        monkeypatch.delenv(f"CMAKE_{language}_COMPILER_LAUNCHER", raising=False)
+    return ccache
+
+
+@pytest.mark.parametrize(
+    ("value", "env", "expected"),
+    [
+        (None, None, False),
+        (True, None, True),
+        ("ccache", None, True),
+        ("auto", None, True),
+        (False, None, False),
+        (None, "ON", True),
+        (True, "off", False),
+        ("ccache", "", False),
+    ],
+)
+def test_compiler_cache_launcher(fake_ccache, monkeypatch, value, env, expected):
+    if env is not None:
+        monkeypatch.setenv("SKBUILD_COMPILER_CACHE", env)
+    launcher = compiler_cache_launcher(value)
+    if expected:
+        assert launcher is not None
+        assert os.path.samefile(launcher, fake_ccache)
+    else:
+        assert launcher is None
+
+
+def test_compiler_cache_not_found(fake_ccache):
+    with pytest.warns(UserWarning, match="compiler cache 'sccache' not found"):
+        assert compiler_cache_launcher("sccache") is None
+    launcher = compiler_cache_launcher(str(fake_ccache))
+    assert launcher is not None
+    assert os.path.samefile(launcher, fake_ccache)
+
+
+@pytest.mark.parametrize("path_independent", [False, True])
+def test_launcher_environment(fake_ccache, monkeypatch, tmp_path, path_independent):
+    if path_independent:
+        monkeypatch.setenv("SKBUILD_PYTHON_EXTENSION_PATH_INDEPENDENT", "ON")
+    monkeypatch.setenv("CMAKE_CXX_COMPILER_LAUNCHER", "other")
+    monkeypatch.chdir(tmp_path)
+    with launcher_environment(str(fake_ccache)):
+        assert os.environ["CMAKE_C_COMPILER_LAUNCHER"] == str(fake_ccache)
+        assert os.environ["CMAKE_CXX_COMPILER_LAUNCHER"] == "other"
+        assert os.environ.get("CCACHE_BASEDIR") == (str(tmp_path) if path_independent else None)
+    assert "CMAKE_C_COMPILER_LAUNCHER" not in os.environ
+    assert "CCACHE_BASEDIR" not in os.environ
+
+
+@pytest.mark.skipif(shutil.which("cc") is None, reason="C compiler is needed")
+def test_compiler_cache_keyword(fake_ccache, capfd):
+    tmp_dir = _tmpdir("compiler_cache_keyword")
+    (tmp_dir / "pyproject.toml").write_text("")
+    (tmp_dir / "cmake_lib.c").write_text("int cmake_lib(void) { return 42; }\n")
+    (tmp_dir / "plain.c").write_text(
+        textwrap.dedent(
+            """
+        #include <Python.h>
+        static struct PyModuleDef plain = {PyModuleDef_HEAD_INIT, "plain"};
+        PyMODINIT_FUNC PyInit_plain(void) { return PyModuleDef_Init(&plain); }
+        """
+        )
+    )
+    (tmp_dir / "CMakeLists.txt").write_text(
+        textwrap.dedent(
+            """
+        cmake_minimum_required(VERSION 3.17...3.26)
+        project(test C)
+        add_library(cmake_lib STATIC cmake_lib.c)
+        install(TARGETS cmake_lib DESTINATION lib)
+        """
+        )
+    )
+    (tmp_dir / "setup.py").write_text(
+        textwrap.dedent(
+            """
+        from setuptools import Extension
+        from skbuild import setup
+        setup(
+            name="test_compiler_cache_keyword",
+            version="1.2.3",
+            description="a package built with a compiler cache",
+            author='The scikit-build team',
+            license="MIT",
+            ext_modules=[Extension("plain", ["plain.c"])],
+            compiler_cache=True,
+        )
+        """
+        )
+    )
+
+    with execute_setup_py(tmp_dir, ["build"]):
+        pass
+
+    log = (fake_ccache.parent / "ccache.log").read_text().splitlines()
+    assert [line for line in log if "cmake_lib.c" in line]
+    assert [line for line in log if "plain.c" in line]
+    out, _ = capfd.readouterr()
+    assert f"compiler cache (ccache): 0 hits, {len(log)} misses (0.0% hit rate)" in out
+    assert "CMAKE_C_COMPILER_LAUNCHER" not in os.environ
@@ -0,0 +1,83 @@
+"""test_cpu_dispatch
+----------------------------------
+
+Builds a wheel of the `cpu-dispatch` sample project, whose C kernel is compiled
+for the baseline and for the x86-64-v2, v3 and v4 levels, and checks that the
+best variant supported by the CPU is selected, and that all of them agree.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+
+import pytest
+
+from . import built_wheel, run_python
+
+X86_64 = platform.machine().lower() in ("x86_64", "amd64")
+
+SCRIPT = """\
+from array import array
+import pkg._dot
+x = array("d", range(1000))
+print(pkg._dot.target(), pkg._dot.dot(x, x))
+"""
+
+# The /proc/cpuinfo flags of the x86-64 micro-architecture levels.
+LEVELS = {
+    "x86-64-v2": {"pni", "ssse3", "sse4_1", "sse4_2", "popcnt", "cx16", "lahf_lm"},
+    "x86-64-v3": {"avx", "avx2", "fma", "f16c", "bmi1", "bmi2", "abm", "movbe"},
+    "x86-64-v4": {"avx512f", "avx512cd", "avx512bw", "avx512dq", "avx512vl"},
+}
+
+
+def _expected_target() -> str:
+    if not X86_64:
+        return "baseline"
+    for line in Path("/proc/cpuinfo").read_text().splitlines():
+        if line.startswith("flags"):
+            flags = set(line.split(":", 1)[1].split())
+            break
+    target = "baseline"
+    for level, required in LEVELS.items():
+        if not required <= flags:
+            break
+        target = level
+    return target
+
+
+def _run(directory: Path, dispatch: str | None = None) -> list[str]:
+    env = dict(os.environ)
+    env.pop("SKBUILD_CPU_DISPATCH", None)
+    if dispatch is not None:
+        env["SKBUILD_CPU_DISPATCH"] = dispatch
+    return run_python(directory, "-c", SCRIPT, env=env).split()
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="GCC and Clang flags")
+def test_cpu_dispatch_wheel(project_setup_py_test, monkeypatch, tmp_path):
+    pytest.importorskip("Cython")
+    monkeypatch.setenv("CMAKE_ARGS", "-DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON")
+    with built_wheel(project_setup_py_test, "cpu-dispatch", tmp_path) as build_dir:
+        commands = json.loads((build_dir / "compile_commands.json").read_text())
+        kernel_commands = [command["command"] for command in commands if command["file"].endswith("kernel_dot.c")]
+        if X86_64:
+            assert len(kernel_commands) == 4
+            assert sum("-mavx512f" in command for command in kernel_commands) == 1
+            assert sum("-mavx2" in command for command in kernel_commands) == 2
+        else:
+            assert len(kernel_commands) == 1
+        assert any("-DSKBUILD_CPU_DISPATCH_SUFFIX=_baseline" in command for command in kernel_commands)
+
+    expected = _expected_target()
+    target, result = _run(tmp_path)
+    assert target == expected
+    assert float(result) == sum(float(i) * i for i in range(1000))
+
+    assert _run(tmp_path, "baseline") == ["baseline", result]
+    if expected != "baseline":
+        assert _run(tmp_path, "x86-64-v2") == ["x86-64-v2", result]
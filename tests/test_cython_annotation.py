@@ -0,0 +1,109 @@
+"""test_cython_annotation
+----------------------------------
+
+Exercises ``cython_annotation.py``, which summarizes the annotated HTML of the
+modules built with ``CYTHON_ANNOTATE``.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import cython_annotation
+
+from . import cmake_build_dir, push_dir
+
+pytest.importorskip("Cython")
+
+CYTHON = shutil.which("cython")
+
+SOURCE = '''\
+import math
+
+cdef double twice(double x):
+    return 2 * x
+
+def norm(values):
+    """Sum of the square roots,
+computed with Python objects."""
+    total = 0
+    for v in values:
+        total += math.sqrt(v)
+    return total
+
+cpdef double typed_norm(double[:] values):
+    cdef double total = 0
+    cdef Py_ssize_t i
+    for i in range(values.shape[0]):
+        total += twice(values[i])
+    return total
+
+cdef class Vector:
+    cdef double x
+
+    def scaled(self, factor):
+        return [self.x * factor,
+                factor]
+'''
+
+
+@pytest.mark.skipif(CYTHON is None, reason="requires the cython program")
+def test_summarize(tmp_path):
+    assert CYTHON is not None
+    (tmp_path / "_norm.pyx").write_text(SOURCE)
+    with push_dir(str(tmp_path)):
+        subprocess.run([CYTHON, "--annotate", "_norm.pyx", "--output-file", "_norm.c"], check=True)
+        assert cython_annotation.main(["summarize", "_norm.html", "--output", "_norm.json"]) == 0
+        summary = json.loads(Path("_norm.json").read_text())
+
+    functions = {function["name"]: function for function in summary["functions"]}
+    assert set(functions) == {"<module>", "twice", "norm", "typed_norm", "Vector", "Vector.scaled"}
+    assert functions["norm"]["line"] == 6
+    assert functions["Vector.scaled"]["line"] == 24
+    assert functions["twice"]["score"] == 0
+    assert functions["norm"]["score"] > functions["typed_norm"]["score"] > 0
+    assert 0 < functions["norm"]["lines"] <= 7
+    assert functions["norm"]["calls"] > 0
+    assert summary["functions"][0]["name"] == "norm"
+    assert summary["score"] == sum(function["score"] for function in summary["functions"])
+
+
+def test_report(tmp_path):
+    for name, score in (("_a", 3), ("_b", 10)):
+        summary = {"name": name, "source": f"{name}.pyx", "lines": 1, "score": score, "calls": 1}
+        summary["functions"] = [{"name": "f", "kind": "function", "line": 1, "lines": 1, "score": score, "calls": 1}]
+        (tmp_path / f"{name}.json").write_text(json.dumps(summary))
+
+    data = cython_annotation.report([tmp_path / "_a.json", tmp_path / "_b.json", tmp_path / "_c.json"])
+    assert [module["name"] for module in data["modules"]] == ["_b", "_a"]
+    assert [function["module"] for function in data["functions"]] == ["_b", "_a"]
+    assert data["score"] == 13
+    assert data["missing"] == [str(tmp_path / "_c.json")]
+
+
+def test_cmake_build(project_setup_py_test, monkeypatch):
+    monkeypatch.setenv("CMAKE_ARGS", "-DCYTHON_ANNOTATE:BOOL=ON")
+    with project_setup_py_test("hello-cython", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        generated = build_dir / "hello" / "_hello.cxx"
+        summary_file = build_dir / "hello" / "_hello.cxx.annotation.json"
+        summary = json.loads(summary_file.read_text())
+        assert summary["name"] == "_hello"
+        assert {function["name"] for function in summary["functions"]} >= {"hello", "size"}
+
+        # Nothing is re-cythonized when the sources are unchanged.
+        mtimes = generated.stat().st_mtime_ns, summary_file.stat().st_mtime_ns
+        subprocess.run(["cmake", "--build", str(build_dir)], check=True)
+        assert (generated.stat().st_mtime_ns, summary_file.stat().st_mtime_ns) == mtimes
+
+        subprocess.run(["cmake", "--build", str(build_dir), "--target", "cython_annotation_report"], check=True)
+        report = json.loads((build_dir / "cython_annotation_report.json").read_text())
+        assert [module["name"] for module in report["modules"]] == ["_hello"]
+        assert report["functions"][0]["module"] == "_hello"
+        assert not report["missing"]
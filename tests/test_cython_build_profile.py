@@ -0,0 +1,32 @@
+"""test_cython_build_profile
+----------------------------------
+
+Builds the `hello-cython` sample project with each ``CYTHON_BUILD_PROFILE``
+and checks that the Cython debug output no longer follows the build type.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from . import cmake_build_dir, get_cmakecache_variables
+
+
+@pytest.mark.parametrize(
+    ("profile", "debug_output", "comments"),
+    [("", True, True), ("DEBUG", True, True), ("RELEASE", False, True), ("FAST", False, False)],
+)
+def test_build_profile(project_setup_py_test, monkeypatch, profile, debug_output, comments):
+    monkeypatch.setenv("SKBUILD_CMAKE_BUILD_TYPE", "RelWithDebInfo")
+    monkeypatch.setenv("CMAKE_ARGS", f"-DCYTHON_BUILD_PROFILE:STRING={profile}")
+    with project_setup_py_test("hello-cython", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        cache = get_cmakecache_variables(str(build_dir / "CMakeCache.txt"))
+        assert cache["CMAKE_BUILD_TYPE"][1] == "RelWithDebInfo"
+
+        generated = (build_dir / "hello" / "_hello.cxx").read_text()
+        assert (build_dir / "hello" / "cython_debug").is_dir() == debug_output
+        assert ("#line " in generated) == debug_output
+        assert ('print("Hello, {}! :)".format(strArg))' in generated) == comments
+        assert ("Returns elevation of Nevado Sajama." in generated) == comments
@@ -0,0 +1,142 @@
+"""test_cython_cache
+----------------------------------
+
+Exercises the content-addressed cache of ``cython_driver.py``, the script
+``UseCython.cmake`` routes ``cython`` commands through when
+``CYTHON_CACHE_DIR`` is set.
+"""
+
+from __future__ import annotations
+
+import importlib.metadata
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import cython_driver
+
+from . import push_dir
+
+pytest.importorskip("Cython")
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "_base.pxd").write_text("ctypedef double real_t\n")
+    (source / "_core.pyx").write_text("from _base cimport real_t\n\n\ndef twice(real_t x):\n    return 2 * x\n")
+    build = tmp_path / "build"
+    build.mkdir()
+    with push_dir(str(build)):
+        yield source
+
+
+def _run(cache_dir, source, *extra, marker=None):
+    return cython_driver.main(
+        [
+            "--cache-dir",
+            str(cache_dir),
+            "--cython-version",
+            importlib.metadata.version("Cython"),
+            *(["--marker", marker] if marker else []),
+            "--",
+            sys.executable,
+            "-m",
+            "cython",
+            "--include-dir",
+            str(source),
+            *extra,
+            str(source / "_core.pyx"),
+            "--output-file",
+            "_core.c",
+        ]
+    )
+
+
+def _stats(cache_dir):
+    return cython_driver.CythonCache(cache_dir, 0).stats()
+
+
+def test_hit_after_miss(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir) == 0
+    generated = Path("_core.c").read_text()
+    os.remove("_core.c")
+
+    assert _run(cache_dir, module_dir) == 0
+    assert Path("_core.c").read_text() == generated
+
+    stats = _stats(cache_dir)
+    assert (stats["hit"], stats["miss"]) == (1, 1)
+
+
+def test_cimported_pxd_is_part_of_the_key(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir, "--depfile") == 0
+    assert os.path.exists("_core.c.dep")
+
+    (module_dir / "_base.pxd").write_text("ctypedef float real_t\n")
+    assert _run(cache_dir, module_dir, "--depfile") == 0
+    assert "typedef float" in Path("_core.c").read_text()
+
+    (module_dir / "_base.pxd").write_text("ctypedef double real_t\n")
+    os.remove("_core.c.dep")
+    assert _run(cache_dir, module_dir, "--depfile") == 0
+    assert "typedef double" in Path("_core.c").read_text()
+    # The depfile is written on hits too.
+    assert "_base.pxd" in Path("_core.c.dep").read_text()
+
+    stats = _stats(cache_dir)
+    assert (stats["hit"], stats["miss"]) == (1, 2)
+
+
+def test_unchanged_output_keeps_timestamp(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir) == 0
+    os.utime("_core.c", ns=(0, 0))
+
+    assert _run(cache_dir, module_dir) == 0
+    assert os.stat("_core.c").st_mtime_ns == 0
+
+
+def test_marker_is_cached(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir, marker="traced") == 0
+    os.utime("_core.c", ns=(0, 0))
+
+    # The stored object holds the marker, so the output is unchanged on a hit.
+    assert _run(cache_dir, module_dir, marker="traced") == 0
+    assert os.stat("_core.c").st_mtime_ns == 0
+    assert Path("_core.c").read_text().count(cython_driver.MARKER_SYMBOL) == 1
+
+    # Another marker is another key.
+    assert _run(cache_dir, module_dir, marker="other") == 0
+    assert '"other"' in Path("_core.c").read_text()
+    assert _run(cache_dir, module_dir) == 0
+    assert cython_driver.MARKER_SYMBOL not in Path("_core.c").read_text()
+
+    stats = _stats(cache_dir)
+    assert (stats["hit"], stats["miss"]) == (1, 3)
+
+
+def test_annotate_is_not_cached(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir, "--annotate") == 0
+    assert _run(cache_dir, module_dir, "--annotate") == 0
+    assert _stats(cache_dir)["uncacheable"] == 2
+
+
+def test_eviction(tmp_path, module_dir):
+    cache_dir = tmp_path / "cache"
+    assert _run(cache_dir, module_dir) == 0
+    assert _stats(cache_dir)["objects"] == 1
+
+    cython_driver.CythonCache(cache_dir, 1).evict()
+    assert _stats(cache_dir)["objects"] == 0
+
+    # A manifest pointing to an evicted object is a miss.
+    assert _run(cache_dir, module_dir) == 0
+    assert _stats(cache_dir)["miss"] == 2
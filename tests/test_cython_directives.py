@@ -0,0 +1,40 @@
+"""test_cython_directives
+----------------------------------
+
+Builds the `cython-directives` sample project, whose modules use directives
+presets, ``DIRECTIVES`` and source file properties, then checks the
+directives passed to Cython and the report written for each module.
+"""
+
+from __future__ import annotations
+
+import json
+
+from . import cmake_build_dir
+
+
+def test_directives_precedence_and_report(project_setup_py_test):
+    with project_setup_py_test("cython-directives", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        pkg_dir = build_dir / "pkg"
+
+        fast = json.loads((pkg_dir / "_fast.c.directives.json").read_text())
+        assert fast["source"].endswith("_fast.pyx")
+        assert fast["output"] == str(pkg_dir / "_fast.c")
+        assert fast["preset"] == "FAST"
+        assert fast["source_preset"] is None
+        assert fast["directives"]["boundscheck"] == {"value": "False", "origin": "preset FAST"}
+        assert fast["directives"]["wraparound"] == {"value": "True", "origin": "target"}
+        assert fast["directives"]["cdivision"] == {"value": "True", "origin": "preset FAST"}
+
+        safe = json.loads((pkg_dir / "_safe.c.directives.json").read_text())
+        assert safe["preset"] == "FAST"
+        assert safe["source_preset"] == "UNCHECKED_INDEXING"
+        assert safe["directives"]["wraparound"] == {"value": "False", "origin": "source preset UNCHECKED_INDEXING"}
+        assert safe["directives"]["cdivision"] == {"value": "False", "origin": "source"}
+        assert safe["directives"]["initializedcheck"] == {"value": "False", "origin": "preset FAST"}
+
+        # C division semantics skip the division by zero check.
+        assert "integer division or modulo by zero" not in (pkg_dir / "_fast.c").read_text()
+        assert "integer division or modulo by zero" in (pkg_dir / "_safe.c").read_text()
@@ -0,0 +1,54 @@
+"""test_cython_fanout
+----------------------------------
+
+Builds the `cython-pxd-deps` sample project, then checks the dependency graph
+and the rebuild fan-out of its .pxd files reported by ``cython_fanout.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import cython_fanout
+
+from . import cmake_build_dir
+
+
+@pytest.mark.parametrize("use_depfile", ["ON", "OFF"])
+def test_fanout(project_setup_py_test, monkeypatch, use_depfile):
+    monkeypatch.setenv("CMAKE_ARGS", f"-DCYTHON_USE_DEPFILE:BOOL={use_depfile}")
+    with project_setup_py_test("cython-pxd-deps", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        subprocess.run(["cmake", "--build", str(build_dir), "--target", "cython_dependency_graph"], check=True)
+
+        graph = json.loads((build_dir / "cython_dependency_graph.json").read_text())
+        fanout = {Path(entry["path"]).name: entry for entry in graph["files"]}
+        assert fanout["_base.pxd"]["targets"] == ["_core", "_plain"]
+        assert fanout["_types.pxd"]["targets"] == ["_core"]
+        assert [entry["fanout"] for entry in graph["files"]] == [2, 1]
+
+        targets = {target["name"]: target for target in graph["targets"]}
+        assert len(targets["_core"]["dependencies"]) == 2
+        if graph["timings"]:
+            assert targets["_core"]["measured"]
+            assert fanout["_base.pxd"]["cost"] >= fanout["_types.pxd"]["cost"] > 0
+
+        dot = (build_dir / "cython_dependency_graph.dot").read_text()
+        assert dot.startswith("digraph cython_dependencies {")
+        assert dot.count(" -> ") == 3
+
+
+def test_ninja_log(tmp_path):
+    log = tmp_path / ".ninja_log"
+    log.write_text(
+        "# ninja log v5\n"
+        "0\t900\t1\tpkg/_core.c\t1\n"
+        "0\t1000\t1\tpkg/_core.c\t2\n"
+        "1000\t3000\t1\tpkg/CMakeFiles/_core.dir/_core.c.o\t3\n"
+    )
+    assert cython_fanout.read_ninja_log(log) == {"pkg/_core.c": 1.0, "pkg/CMakeFiles/_core.dir/_core.c.o": 2.0}
@@ -0,0 +1,73 @@
+"""test_cython_profile
+----------------------------------
+
+Builds the `hello-cython` sample project with and without ``CYTHON_PROFILE``
+and checks that only the traced module is profiled and marked as such, also
+when the ``LEAN`` link profile discards the unused sections.
+"""
+
+from __future__ import annotations
+
+import importlib.machinery
+import importlib.util
+import json
+import sys
+
+import pytest
+
+from . import cmake_build_dir
+
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location("_hello", path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _profiled_calls(function):
+    calls = []
+
+    def profiler(frame, event, arg):  # noqa: ARG001
+        if frame.f_code.co_filename.endswith("_hello.pyx") and event == "call":
+            calls.append(frame.f_code.co_name)
+
+    sys.setprofile(profiler)
+    try:
+        function()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+@pytest.mark.parametrize(("profile", "lean"), [(True, False), (False, False), (True, True)])
+def test_profile(project_setup_py_test, monkeypatch, profile, lean):
+    monkeypatch.setenv(
+        "CMAKE_ARGS",
+        f"-DCYTHON_PROFILE:BOOL={'ON' if profile else 'OFF'} -DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON "
+        f"-DPYTHON_EXTENSION_LEAN:BOOL={'ON' if lean else 'OFF'}",
+    )
+    with project_setup_py_test("hello-cython", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        directives = json.loads((build_dir / "hello" / "_hello.cxx.directives.json").read_text())
+        traced_directives = {"profile": "True", "linetrace": "True", "binding": "True"}
+        if profile:
+            assert {name: value["value"] for name, value in directives["directives"].items()} == traced_directives
+            assert {value["origin"] for value in directives["directives"].values()} == {"profile"}
+        else:
+            assert directives["directives"] == {}
+
+        (command,) = json.loads((build_dir / "compile_commands.json").read_text())
+        assert ("-DCYTHON_TRACE=1" in command["command"]) == profile
+        assert ("-DCYTHON_TRACE_NOGIL=1" in command["command"]) == profile
+
+        (module_path,) = (
+            path
+            for path in (build_dir / "hello").glob("_hello*")
+            if path.name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES))
+        )
+        assert (b"skbuild-cython-trace:_hello" in module_path.read_bytes()) == profile
+        assert _profiled_calls(_load(module_path).size) == (["size"] if profile else [])
@@ -0,0 +1,42 @@
+"""test_cython_pxd_deps
+----------------------------------
+
+Builds the `cython-pxd-deps` sample project, then checks that editing a
+transitively cimported .pxd file regenerates the Cython output when the
+CMake build tree is rebuilt, with and without the depfile-based scan.
+"""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from . import cmake_build_dir, get_cmakecache_variables
+
+
+@pytest.mark.parametrize("use_depfile", ["ON", "OFF", None])
+def test_transitive_pxd_edit_triggers_rebuild(project_setup_py_test, monkeypatch, use_depfile):
+    monkeypatch.delenv("SKBUILD_CYTHON_USE_DEPFILE", raising=False)
+    if use_depfile is None:
+        # The depfile is opt-in.
+        monkeypatch.delenv("CMAKE_ARGS", raising=False)
+        use_depfile = "OFF"
+    else:
+        monkeypatch.setenv("CMAKE_ARGS", f"-DCYTHON_USE_DEPFILE:BOOL={use_depfile}")
+    with project_setup_py_test("cython-pxd-deps", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        cache = get_cmakecache_variables(str(build_dir / "CMakeCache.txt"))
+        assert cache["CYTHON_USE_DEPFILE"][1] == use_depfile
+
+        generated = build_dir / "pkg" / "_core.c"
+        assert "typedef double" in generated.read_text()
+        assert (build_dir / "pkg" / "_core.c.dep").exists() == (use_depfile == "ON")
+
+        base_pxd = Path(project_dir) / "pkg" / "_base.pxd"
+        base_pxd.write_text("ctypedef float real_t\n")
+        subprocess.run(["cmake", "--build", str(build_dir)], check=True)
+
+        assert "typedef float" in generated.read_text()
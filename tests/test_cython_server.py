@@ -0,0 +1,154 @@
+"""test_cython_server
+----------------------------------
+
+Exercises the compile server of ``cython_driver.py``, which ``UseCython.cmake``
+routes ``cython`` commands through when ``CYTHON_COMPILE_SERVER`` is enabled.
+"""
+
+from __future__ import annotations
+
+import importlib.metadata
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import cython_driver
+
+from . import cmake_build_dir, get_cmakecache_variables, push_dir
+
+pytest.importorskip("Cython")
+
+pytestmark = pytest.mark.skipif(not cython_driver.server_supported(), reason="requires fork and Unix sockets")
+
+CYTHON = shutil.which("cython")
+
+
+@pytest.fixture
+def cython_version():
+    return importlib.metadata.version("Cython")
+
+
+@pytest.fixture
+def module_dir(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "_base.pxd").write_text("ctypedef double real_t\n")
+    (source / "_core.pyx").write_text("from _base cimport real_t\n\n\ndef twice(real_t x):\n    return 2 * x\n")
+    build = tmp_path / "build"
+    build.mkdir()
+    with push_dir(str(build)):
+        yield source
+
+
+@pytest.fixture
+def server(tmp_path, cython_version):
+    address = tmp_path / "server.sock"
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            cython_driver.__file__,
+            "--serve",
+            "--server-address",
+            str(address),
+            "--cython-version",
+            cython_version,
+        ]
+    )
+    deadline = time.monotonic() + 30
+    while not address.exists() and process.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    yield address
+    cython_driver.CompileServerClient(address, cython_version, autostart=False).stop()
+    assert process.wait(timeout=60) == 0
+    assert not address.exists()
+
+
+def _command(source, output):
+    assert CYTHON is not None
+    return [CYTHON, "--include-dir", str(source), str(source / "_core.pyx"), "--output-file", output]
+
+
+@pytest.mark.skipif(CYTHON is None, reason="requires the cython program")
+def test_output_matches_cython(server, module_dir, cython_version):
+    client = cython_driver.CompileServerClient(server, cython_version, autostart=False)
+    assert client.request(_command(module_dir, "_core.c")) == 0
+    subprocess.run(_command(module_dir, "_expected.c"), check=True)
+    assert Path("_core.c").read_text() == Path("_expected.c").read_text()
+
+    # Requests do not share state: a .pxd edit is seen by the next one.
+    (module_dir / "_base.pxd").write_text("ctypedef float real_t\n")
+    assert client.request(_command(module_dir, "_core.c")) == 0
+    assert "typedef float" in Path("_core.c").read_text()
+
+
+@pytest.mark.skipif(CYTHON is None, reason="requires the cython program")
+def test_errors_are_reported(server, module_dir, cython_version, capsys):
+    (module_dir / "_core.pyx").write_text("def broken(:\n")
+    client = cython_driver.CompileServerClient(server, cython_version, autostart=False)
+    assert client.request(_command(module_dir, "_core.c")) == 1
+    assert "Error compiling Cython file" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(CYTHON is None, reason="requires the cython program")
+def test_version_mismatch_is_not_served(server, module_dir):
+    client = cython_driver.CompileServerClient(server, "0.1", autostart=False)
+    assert client.request(_command(module_dir, "_core.c")) is None
+
+
+@pytest.mark.skipif(CYTHON is None, reason="requires the cython program")
+def test_fallback_without_server(tmp_path, module_dir, cython_version):
+    address = tmp_path / "missing.sock"
+    assert (
+        cython_driver.main(
+            [
+                "--server",
+                "--server-address",
+                str(address),
+                "--cython-version",
+                cython_version,
+                "--server-idle-timeout",
+                "1",
+                "--",
+                *_command(module_dir, "_core.c"),
+            ]
+        )
+        == 0
+    )
+    assert "twice" in Path("_core.c").read_text()
+
+    # The first command started a server, which exits once idle.
+    deadline = time.monotonic() + 60
+    while not address.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert address.exists()
+    while address.exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not address.exists()
+
+
+def test_cmake_build(project_setup_py_test, monkeypatch, tmp_path, cython_version):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setenv("CMAKE_ARGS", "-DCYTHON_COMPILE_SERVER:BOOL=ON")
+    try:
+        with project_setup_py_test("cython-pxd-deps", ["build"]) as project_dir:
+            build_dir = cmake_build_dir(project_dir)
+            assert build_dir is not None
+            cache = get_cmakecache_variables(str(build_dir / "CMakeCache.txt"))
+            assert cache["CYTHON_COMPILE_SERVER"][1] == "ON"
+
+            # The build started a server for the following builds.
+            deadline = time.monotonic() + 60
+            while not list(tmp_path.glob("skbuild-cython-*.sock")) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert list(tmp_path.glob("skbuild-cython-*.sock"))
+
+            (Path(project_dir) / "pkg" / "_base.pxd").write_text("ctypedef float real_t\n")
+            subprocess.run(["cmake", "--build", str(build_dir)], check=True)
+            assert "typedef float" in (build_dir / "pkg" / "_core.c").read_text()
+    finally:
+        for address in tmp_path.glob("skbuild-cython-*.sock"):
+            cython_driver.CompileServerClient(address, cython_version, autostart=False).stop()
@@ -0,0 +1,33 @@
+"""test_cython_shared_utility
+----------------------------------
+
+Builds a wheel of the `cython-shared-utility` sample project, whose C or C++
+modules import the Cython utility code from a shared module, and checks that
+the modules work once installed.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from . import built_wheel, get_ext_suffix, run_python
+
+
+@pytest.mark.parametrize("cxx", [False, True])
+def test_shared_utility_wheel(project_setup_py_test, monkeypatch, tmp_path, cxx):
+    monkeypatch.setenv("CMAKE_ARGS", f"-DSHARED_UTILITY_CXX:BOOL={'ON' if cxx else 'OFF'}")
+    extension = "cxx" if cxx else "c"
+    with built_wheel(project_setup_py_test, "cython-shared-utility", tmp_path) as build_dir:
+        pkg_dir = build_dir / "pkg"
+        assert (pkg_dir / f"_cyutility.{extension}").is_file()
+        shared = (pkg_dir / f"_sum.{extension}").read_text()
+        standalone = (pkg_dir / f"_standalone.{extension}").read_text()
+        assert "pkg._cyutility" in shared
+        assert "pkg._cyutility" not in standalone
+        assert len(shared) < len(standalone)
+    assert (tmp_path / "pkg" / f"_cyutility{get_ext_suffix()}").is_file()
+
+    script = "import array, pkg._sum, pkg._standalone\n"
+    script += "values = array.array('d', [1, 2, 3])\n"
+    script += "print(pkg._sum.total(values), pkg._standalone.total(values))\n"
+    assert run_python(tmp_path, "-c", script).split() == ["6.0", "6.0"]
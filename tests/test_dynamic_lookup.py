@@ -0,0 +1,79 @@
+"""test_dynamic_lookup
+----------------------------------
+
+Exercises the known results and the results shared by the build trees in
+``targetLinkLibrariesWithDynamicLookup``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources import cmake as cmake_modules
+
+CMAKE_MODULE_DIR = Path(cmake_modules.__file__).parent
+
+CMAKELISTS = f"""\
+cmake_minimum_required(VERSION 3.15)
+project(dynamic_lookup C)
+list(APPEND CMAKE_MODULE_PATH "{CMAKE_MODULE_DIR.as_posix()}")
+include(targetLinkLibrariesWithDynamicLookup)
+foreach(target_type MODULE EXE SHARED)
+  check_dynamic_lookup(${{target_type}} SHARED result flags)
+  message(STATUS "RESULT ${{target_type}} ${{result}} [${{flags}}]")
+endforeach()
+"""
+
+EXPECTED = [
+    "RESULT MODULE TRUE [-Wl,--unresolved-symbols=ignore-all]",
+    "RESULT EXE TRUE [-Wl,--unresolved-symbols=ignore-all]",
+    "RESULT SHARED FALSE []",
+]
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux-only results")
+
+
+def _configure(tmp_path: Path, build: str, *args: str) -> tuple[list[str], bool]:
+    (tmp_path / "CMakeLists.txt").write_text(CMAKELISTS)
+    env = {**os.environ, "SKBUILD_DYNAMIC_LOOKUP_CACHE_DIR": str(tmp_path / "cache")}
+    result = subprocess.run(
+        ["cmake", "-S", str(tmp_path), "-B", str(tmp_path / build), *args],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    lines = [line[3:] for line in result.stdout.splitlines() if line.startswith("-- ")]
+    tested = (tmp_path / build / "CMakeTmp" / "link_flags").is_dir()
+    return lines, tested
+
+
+def test_known_toolchain(tmp_path):
+    lines, tested = _configure(tmp_path, "build")
+    assert [line for line in lines if line.startswith("RESULT")] == EXPECTED
+    assert "Performing Test Weak Link MODULE -> SHARED - TRUE (known toolchain)" in lines
+    assert not tested
+
+    # The test project agrees with the table.
+    lines, tested = _configure(tmp_path, "verify", "-DDYNAMIC_LOOKUP_VERIFY:BOOL=ON")
+    assert [line for line in lines if line.startswith("RESULT")] == EXPECTED
+    assert tested
+
+
+def test_shared_results(tmp_path):
+    # Flags about undefined symbols are not in the table.
+    flags = "-DCMAKE_SHARED_LINKER_FLAGS=-Wl,--allow-shlib-undefined"
+    lines, tested = _configure(tmp_path, "first", flags)
+    assert [line for line in lines if line.startswith("RESULT")] == EXPECTED
+    assert tested
+    assert len(list((tmp_path / "cache").glob("dynamic-lookup-*.cmake"))) == 3
+
+    lines, tested = _configure(tmp_path, "second", flags)
+    assert [line for line in lines if line.startswith("RESULT")] == EXPECTED
+    assert any(line.endswith(f"(cached in {(tmp_path / 'cache').as_posix()})") for line in lines)
+    assert not tested
@@ -0,0 +1,66 @@
+"""test_find_python_extensions
+----------------------------------
+
+Checks the ``PYTHON_*`` variables defined by ``FindPythonExtensions``, with and
+without the interpreter passed by scikit-build.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import sysconfig
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources import cmake as cmake_modules
+
+CMAKE_MODULE_DIR = Path(cmake_modules.__file__).parent
+
+VARIABLES = (
+    "PYTHON_EXECUTABLE",
+    "PYTHON_VERSION_STRING",
+    "PYTHON_VERSION_MAJOR",
+    "PYTHON_INCLUDE_DIRS",
+    "PYTHON_LIBRARIES",
+    "PYTHON_EXTENSION_MODULE_SUFFIX",
+    "PYTHON_PREFIX",
+)
+
+CMAKELISTS = f"""\
+cmake_minimum_required(VERSION 3.5...3.26)
+project(find_python_extensions NONE)
+list(APPEND CMAKE_MODULE_PATH "{CMAKE_MODULE_DIR.as_posix()}")
+find_package(PythonExtensions REQUIRED)
+foreach(name {" ".join(VARIABLES)})
+  message(STATUS "${{name}}=${{${{name}}}}")
+endforeach()
+"""
+
+
+@pytest.mark.parametrize("hint", [True, False], ids=["hint", "no-hint"])
+def test_variables(tmp_path, hint):
+    (tmp_path / "CMakeLists.txt").write_text(CMAKELISTS)
+    args = [f"-DPYTHON_EXECUTABLE:FILEPATH={Path(sys.executable).as_posix()}"] if hint else []
+    result = subprocess.run(
+        ["cmake", "-S", str(tmp_path), "-B", str(tmp_path / "build"), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    values = dict(line[3:].split("=", 1) for line in result.stdout.splitlines() if line[3:].startswith("PYTHON_"))
+
+    assert values["PYTHON_EXTENSION_MODULE_SUFFIX"]
+    if not hint:
+        # Some interpreter of the PATH
+        assert Path(values["PYTHON_EXECUTABLE"]).exists()
+        return
+    assert Path(values["PYTHON_EXECUTABLE"]) == Path(sys.executable)
+    assert values["PYTHON_VERSION_STRING"] == ".".join(map(str, sys.version_info[:3]))
+    assert values["PYTHON_VERSION_MAJOR"] == "3"
+    assert Path(values["PYTHON_INCLUDE_DIRS"]) == Path(sysconfig.get_paths()["include"])
+    assert values["PYTHON_EXTENSION_MODULE_SUFFIX"] == sysconfig.get_config_var("EXT_SUFFIX")
+    assert Path(values["PYTHON_PREFIX"]) == Path(sys.prefix)
+    if not sys.platform.startswith("win"):
+        assert values["PYTHON_LIBRARIES"] == ""
@@ -0,0 +1,61 @@
+"""test_free_threading
+----------------------------------
+
+Builds the `free-threading` sample project, whose ``_work`` module is declared
+free-threading compatible, and checks that a free-threaded interpreter keeps
+the GIL disabled once it is imported, so that the module scales across threads.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sysconfig
+
+import pytest
+
+from . import built_wheel, cmake_build_dir, run_python
+
+BENCHMARK = """\
+import sys, threading, time
+import pkg._work
+
+assert not sys._is_gil_enabled()
+
+def run(threads, n=2_000_000):
+    workers = [threading.Thread(target=pkg._work.spin, args=(n,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+run(1)
+print(min(run(1) for _ in range(3)), min(run(4) for _ in range(3)))
+"""
+
+
+def test_freethreading_compatible(project_setup_py_test):
+    pytest.importorskip("Cython", minversion="3.1")
+    with project_setup_py_test("free-threading", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        work = json.loads((build_dir / "pkg" / "_work.c.directives.json").read_text())
+        assert work["directives"] == {"freethreading_compatible": {"value": "True", "origin": "freethreading"}}
+        plain = json.loads((build_dir / "pkg" / "_plain.c.directives.json").read_text())
+        assert plain["directives"] == {}
+        assert "Py_MOD_GIL_NOT_USED" in (build_dir / "pkg" / "_work.c").read_text()
+
+
+@pytest.mark.skipif(not sysconfig.get_config_var("Py_GIL_DISABLED"), reason="Free-threaded Python only")
+def test_gil_stays_disabled(project_setup_py_test, tmp_path):
+    pytest.importorskip("Cython", minversion="3.1")
+    with built_wheel(project_setup_py_test, "free-threading", tmp_path):
+        pass
+
+    output = run_python(tmp_path, "-W", "error::RuntimeWarning", "-c", BENCHMARK)
+    one, four = map(float, output.split())
+    # With the GIL, four threads would take four times as long as one.
+    if (os.cpu_count() or 1) >= 4:
+        assert four < 2.5 * one
@@ -0,0 +1,42 @@
+"""test_ipo
+----------------------------------
+
+Builds the `ipo-calls` sample project with and without
+``PYTHON_EXTENSION_IPO`` and checks that only the modules asking for it are
+compiled with interprocedural optimization, then runs its benchmark.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from . import built_wheel, run_python
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="GCC and Clang flags")
+
+
+def _compile_commands(build_dir: Path) -> dict[str, str]:
+    commands = json.loads((build_dir / "compile_commands.json").read_text())
+    return {Path(command["file"]).name: command["command"] for command in commands}
+
+
+@pytest.mark.parametrize("ipo", [True, False])
+def test_ipo(project_setup_py_test, monkeypatch, tmp_path, ipo):
+    pytest.importorskip("Cython")
+    monkeypatch.setenv(
+        "CMAKE_ARGS",
+        f"-DPYTHON_EXTENSION_IPO:BOOL={'ON' if ipo else 'OFF'} -DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON",
+    )
+    with built_wheel(project_setup_py_test, "ipo-calls", tmp_path) as build_dir:
+        commands = _compile_commands(build_dir)
+        assert ("-flto" in commands["_calls.c"]) is ipo
+        assert ("-flto" in commands["kernel.c"]) is ipo
+        assert "-flto" not in commands["_plain.c"]
+        shutil.copy("benchmark.py", tmp_path)
+
+    assert run_python(tmp_path, "benchmark.py", "1000").endswith(" ns/call\n")
@@ -0,0 +1,76 @@
+"""test_lean
+----------------------------------
+
+Builds the `lean-module` sample project with and without
+``PYTHON_EXTENSION_LEAN``, checks that the unused code and data of the LEAN
+module are removed, and reports its size and import time with
+``skbuild.resources.cmake.lean_report``.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import lean_report
+
+from . import built_wheel, run_python
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="GNU linker flags")
+
+
+def _build(
+    project_setup_py_test: Callable[..., AbstractContextManager[Path]],
+    monkeypatch: pytest.MonkeyPatch,
+    directory: Path,
+    lean: bool,
+) -> str:
+    monkeypatch.setenv(
+        "CMAKE_ARGS",
+        f"-DPYTHON_EXTENSION_LEAN:BOOL={'ON' if lean else 'OFF'} -DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON",
+    )
+    with built_wheel(project_setup_py_test, "lean-module", directory) as build_dir:
+        commands = json.loads((build_dir / "compile_commands.json").read_text())
+    return " ".join(command["command"] for command in commands)
+
+
+def test_lean_module(project_setup_py_test, monkeypatch, tmp_path):
+    pytest.importorskip("Cython")
+    plain_commands = _build(project_setup_py_test, monkeypatch, tmp_path / "plain", lean=False)
+    lean_commands = _build(project_setup_py_test, monkeypatch, tmp_path / "lean", lean=True)
+    assert "-ffunction-sections" not in plain_commands
+    assert "-ffunction-sections" in lean_commands
+    assert "-fvisibility=hidden" in lean_commands
+
+    (plain,) = lean_report.extension_modules(tmp_path / "plain").items()
+    (lean,) = lean_report.extension_modules(tmp_path / "lean").items()
+    assert plain[0] == lean[0] == "pkg._lean"
+    # The 32 kB unused table is removed.
+    assert lean[1].stat().st_size < plain[1].stat().st_size - 30000
+
+    assert run_python(tmp_path / "lean", "-c", "import pkg._lean; print(pkg._lean.lookup(19))") == "9\n"
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "skbuild.resources.cmake.lean_report",
+            str(tmp_path / "lean"),
+            "--baseline",
+            str(tmp_path / "plain"),
+            "--repeat",
+            "3",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.startswith("pkg._lean: ")
+    assert " B (-" in result.stdout
+    assert " ms (" in result.stdout
@@ -0,0 +1,35 @@
+"""test_limited_api
+----------------------------------
+
+Builds a wheel of the `limited-api` sample project, whose Cython and C
+extension modules are built against the Python limited API, and checks their
+compile definitions, their suffix, and that they work once installed.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+from . import built_wheel, run_python
+
+ABI3_SUFFIX = ".pyd" if sys.platform.startswith("win") else ".abi3.so"
+
+
+def test_limited_api_wheel(project_setup_py_test, monkeypatch, tmp_path):
+    pytest.importorskip("Cython", minversion="3.0")
+    monkeypatch.setenv("CMAKE_ARGS", "-DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON")
+    with built_wheel(project_setup_py_test, "limited-api", tmp_path) as build_dir:
+        commands = json.loads((build_dir / "compile_commands.json").read_text())
+        for command in commands:
+            assert "-DPy_LIMITED_API=0x03090000" in command["command"]
+        (fib_command,) = (command for command in commands if command["file"].endswith("_fib.c"))
+        assert "-DCYTHON_LIMITED_API=1" in fib_command["command"]
+    assert (tmp_path / "pkg" / f"_fib{ABI3_SUFFIX}").is_file()
+    assert (tmp_path / "pkg" / f"_hello{ABI3_SUFFIX}").is_file()
+
+    script = "import pkg._fib, pkg._hello\n"
+    script += "print(pkg._fib.fib(10), pkg._hello.hello())\n"
+    assert run_python(tmp_path, "-c", script).split() == ["55", "hello"]
@@ -0,0 +1,97 @@
+"""test_linker
+----------------------------------
+
+Builds a small version of the `large-extension` sample project with
+``PYTHON_EXTENSION_LINKER``, and checks that the module is linked with the
+selected linker, or the default one, and that its version script still hides
+all the symbols but the module init function.  Also checks that the linkers
+are checked with the compiler flags of the build.
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources import cmake as cmake_modules
+
+from . import built_wheel, run_python
+
+pytestmark = [
+    pytest.mark.skipif(not sys.platform.startswith("linux"), reason="ELF linkers"),
+    pytest.mark.skipif(shutil.which("readelf") is None, reason="readelf is needed"),
+]
+
+
+def _exported_functions(path: Path) -> list[str]:
+    symbols = subprocess.run(
+        ["readelf", "--dyn-syms", "-W", str(path)], check=True, capture_output=True, text=True
+    ).stdout
+    return [
+        fields[7]
+        for fields in (line.split() for line in symbols.splitlines())
+        if len(fields) >= 8 and fields[3] == "FUNC" and fields[4] == "GLOBAL" and fields[6] != "UND"
+    ]
+
+
+@pytest.mark.parametrize("linker", ["AUTO", "gold"])
+def test_linker(project_setup_py_test, monkeypatch, tmp_path, linker):
+    pytest.importorskip("Cython")
+    if linker == "gold" and shutil.which("ld.gold") is None:
+        pytest.skip("ld.gold is not installed")
+    monkeypatch.setenv(
+        "CMAKE_ARGS",
+        f"-DPYTHON_EXTENSION_LINKER:STRING={linker} -DLARGE_EXTENSION_FILES=2 -DLARGE_EXTENSION_FUNCTIONS=10",
+    )
+    with built_wheel(project_setup_py_test, "large-extension", tmp_path) as build_dir:
+        cache = (build_dir / "CMakeCache.txt").read_text()
+        # Without the projects of the linker checks.
+        build_files = [
+            path
+            for path in build_dir.rglob("*")
+            if path.name in ("build.ninja", "link.txt") and "PythonExtensionLinker" not in path.parts
+        ]
+        link_commands = " ".join(path.read_text() for path in build_files)
+        for candidate in ("mold", "lld", "gold"):
+            used = f"_PYTHON_EXTENSION_LINKER_{candidate.upper()}:INTERNAL=TRUE" in cache
+            assert (f"-fuse-ld={candidate}" in link_commands) is used
+        if linker == "gold":
+            assert "-fuse-ld=gold" in link_commands
+
+    (module,) = (tmp_path / "pkg").glob("_large*.so")
+    assert _exported_functions(module) == ["PyInit__large"]
+    output = run_python(tmp_path, "-c", "import pkg._large; print(pkg._large.total(1))")
+    # sum(x * function + index) for x = 1, 10 functions and 2 files
+    assert int(output) == sum(function + index for index in (1, 2) for function in range(10))
+
+
+def test_linker_check_flags(tmp_path):
+    if shutil.which("ld.gold") is None:
+        pytest.skip("ld.gold is not installed")
+    modules = Path(cmake_modules.__file__).parent.as_posix()
+    (tmp_path / "CMakeLists.txt").write_text(
+        "cmake_minimum_required(VERSION 3.15)\n"
+        "project(linker_check C)\n"
+        f'list(APPEND CMAKE_MODULE_PATH "{modules}")\n'
+        "find_package(PythonExtensions REQUIRED)\n"
+        "_python_extension_linker_supported(gold _supported)\n"
+        'message(STATUS "gold supported: ${_supported}")\n'
+    )
+
+    def supported(*args: str) -> bool:
+        output = subprocess.run(
+            ["cmake", "-S", str(tmp_path), "-B", str(tmp_path / "build"), *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return "gold supported: TRUE" in output
+
+    assert supported()
+    # The cached result is checked again when the flags change.
+    assert not supported("-DCMAKE_C_FLAGS=-Wl,--no-such-option")
+    assert supported("-DCMAKE_C_FLAGS=")
@@ -0,0 +1,53 @@
+"""test_openmp
+----------------------------------
+
+Builds a wheel of the `openmp-prange` sample project, whose Cython ``prange``
+loop and C source are compiled with OpenMP, and checks the flags, the number
+of threads, and that the loop scales with them when there are enough CPUs.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from skbuild.resources.cmake import openmp_scaling
+
+from . import built_wheel, run_python
+
+SCRIPT = """\
+import pkg._prange
+print(pkg._prange.max_threads(), pkg._prange.work(1000))
+"""
+
+
+def test_openmp_scaling_fails_without_speedup(capsys):
+    assert openmp_scaling.main(["--threads", "4", "--repeat", "1", "sum(range(1000))"]) == 1
+    assert "does not scale" in capsys.readouterr().err
+    assert openmp_scaling.main(["--threads", "2", "--repeat", "1", "--min-speedup", "0", "sum(range(1000))"]) == 0
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="GCC and Clang flags")
+def test_openmp_wheel(project_setup_py_test, monkeypatch, tmp_path):
+    pytest.importorskip("Cython")
+    monkeypatch.setenv("CMAKE_ARGS", "-DCMAKE_EXPORT_COMPILE_COMMANDS:BOOL=ON")
+    with built_wheel(project_setup_py_test, "openmp-prange", tmp_path) as build_dir:
+        commands = json.loads((build_dir / "compile_commands.json").read_text())
+        assert len(commands) == 2
+        for command in commands:
+            assert "openmp" in command["command"]
+        shutil.copy("benchmark.py", tmp_path)
+
+    env = {**os.environ, "OMP_NUM_THREADS": "3"}
+    threads, total = run_python(tmp_path, "-c", SCRIPT, env=env).split()
+    assert threads == "3"
+    assert math.isclose(float(total), sum(math.sqrt(i) for i in range(1000)))
+
+    if openmp_scaling.available_cpus() >= 2:
+        subprocess.run([sys.executable, "benchmark.py"], cwd=tmp_path, check=True)
@@ -0,0 +1,58 @@
+"""test_path_independent
+----------------------------------
+
+Builds the `hello-cython` sample project with debug information in two
+directories, with and without ``PYTHON_EXTENSION_PATH_INDEPENDENT``, and
+checks that the objects are identical and that the Cython cache hits across
+the build trees when it is on.
+"""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from skbuild.resources.cmake import cython_driver
+
+from . import cmake_build_dir
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="GCC and Clang prefix maps")
+
+
+def _build(project_setup_py_test, project_dir):
+    with project_setup_py_test("hello-cython", ["bdist_wheel"], tmp_dir=project_dir):
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        commands = "".join(path.read_text() for path in build_dir.rglob("build.ninja"))
+        commands += "".join(path.read_text() for path in build_dir.rglob("build.make"))
+        objects = {path.relative_to(build_dir): path.read_bytes() for path in build_dir.rglob("*.o")}
+        assert objects
+        return commands, objects
+
+
+@pytest.mark.parametrize("path_independent", [False, True])
+def test_path_independent(project_setup_py_test, monkeypatch, tmp_path, path_independent):
+    pytest.importorskip("Cython")
+    cache_dir = tmp_path / "cython-cache"
+    monkeypatch.setenv("CFLAGS", "-g")
+    monkeypatch.setenv("CXXFLAGS", "-g")
+    monkeypatch.setenv("SKBUILD_CYTHON_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("CMAKE_ARGS", f"-DPYTHON_EXTENSION_PATH_INDEPENDENT:BOOL={'ON' if path_independent else 'OFF'}")
+
+    first_dir = tmp_path / "first" / "hello-cython"
+    second_dir = tmp_path / "second-tree" / "hello-cython"
+    first_commands, first_objects = _build(project_setup_py_test, first_dir)
+    _, second_objects = _build(project_setup_py_test, second_dir)
+    stats = cython_driver.CythonCache(cache_dir, 0).stats()
+
+    if path_independent:
+        assert "-ffile-prefix-map=" in first_commands or "-fdebug-prefix-map=" in first_commands
+        assert f"{first_dir}/hello/_hello.pyx --output-file" not in first_commands
+        assert "../hello/_hello.pyx --output-file _hello.cxx" in first_commands
+        assert not [path for path, content in first_objects.items() if str(first_dir).encode() in content]
+        assert first_objects == second_objects
+        assert (stats["hit"], stats["miss"]) == (1, 1)
+    else:
+        assert [path for path, content in first_objects.items() if str(first_dir).encode() in content]
+        assert (stats["hit"], stats["miss"]) == (0, 2)
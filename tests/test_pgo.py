@@ -0,0 +1,62 @@
+"""test_pgo
+----------------------------------
+
+Runs the profile-guided optimization workflow of
+``skbuild.resources.cmake.pgo`` on the `ipo-calls` sample project, and checks
+that the profiles are reused until the sources change.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from skbuild.resources.cmake import pgo
+
+from . import cmake_build_dir, prepare_project
+
+
+def test_fingerprint(tmp_path):
+    prepare_project("ipo-calls", tmp_path)
+    fingerprint = pgo.fingerprint(tmp_path)
+
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "generated.c").write_text("int x;\n")
+    assert pgo.fingerprint(tmp_path) == fingerprint
+
+    kernel = tmp_path / "pkg" / "kernel.c"
+    kernel.write_text(kernel.read_text() + "\n")
+    assert pgo.fingerprint(tmp_path) != fingerprint
+
+
+def _pgo(project_dir, train):
+    return subprocess.run(
+        [sys.executable, "-m", "skbuild.resources.cmake.pgo", "--train", train],
+        cwd=project_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="GCC profiles")
+def test_pgo_workflow(tmp_path, monkeypatch):
+    pytest.importorskip("Cython")
+    monkeypatch.delenv("CMAKE_ARGS", raising=False)
+    prepare_project("ipo-calls", tmp_path)
+
+    output = _pgo(tmp_path, f"{sys.executable} benchmark.py 1000")
+    assert "(GENERATE)" in output
+    assert "(USE)" in output
+    assert list((tmp_path / "build" / "pgo" / "data").glob("*_calls.c.gcda"))
+    build_dir = cmake_build_dir(tmp_path)
+    assert build_dir is not None
+    build_files = [path for path in build_dir.rglob("*") if path.name in ("build.ninja", "flags.make")]
+    assert any("-fprofile-use=" in path.read_text() for path in build_files)
+
+    # The training command does not run again.
+    output = _pgo(tmp_path, "false")
+    assert "reusing the profiles" in output
+    assert "(GENERATE)" not in output
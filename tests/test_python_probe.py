@@ -0,0 +1,97 @@
+"""test_python_probe
+----------------------------------
+
+Exercises ``python_probe.py`` and the ``PythonProbe`` CMake module, which
+introspects the Python interpreter once for the ``Find*`` modules and reuses
+the result until the interpreter or its NumPy and Cython change.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import sysconfig
+from pathlib import Path
+
+import pytest
+
+from skbuild.resources.cmake import python_probe
+
+from . import cmake_build_dir, get_cmakecache_variables
+
+CMAKE_MODULE_DIR = Path(python_probe.__file__).parent
+
+SCRIPT = f"""\
+list(APPEND CMAKE_MODULE_PATH "{CMAKE_MODULE_DIR.as_posix()}")
+include(PythonProbe)
+python_probe("${{PYTHON}}")
+message("${{PYTHON_PROBE_FOUND}}|${{PYTHON_PROBE_EXT_SUFFIX}}|${{PYTHON_PROBE_NUMPY_VERSION}}")
+"""
+
+
+def test_probe():
+    values = python_probe.probe()
+    assert values["EXT_SUFFIX"] == sysconfig.get_config_var("EXT_SUFFIX")
+    assert values["PREFIX"] == sys.prefix
+    assert values["GIL_DISABLED"] == ("1" if sysconfig.get_config_var("Py_GIL_DISABLED") else "0")
+    assert os.path.join(sys.prefix, values["RELATIVE_SITE_PACKAGES_DIR"]) == os.path.normpath(
+        values["SITE_PACKAGES_DIR"]
+    )
+    try:
+        import numpy as np
+    except ImportError:
+        assert values["NUMPY_VERSION"] == ""
+    else:
+        assert values["NUMPY_VERSION"] == np.__version__
+        assert Path(values["NUMPY_INCLUDE_DIR"]) == Path(np.get_include())
+
+
+def _run_probe(tmp_path: Path, env: dict[str, str]) -> str:
+    script = tmp_path / "probe.cmake"
+    script.write_text(SCRIPT)
+    result = subprocess.run(
+        ["cmake", f"-DPYTHON={Path(sys.executable).as_posix()}", "-P", str(script)],
+        cwd=tmp_path,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stderr.strip()
+
+
+def test_cached_probe(tmp_path):
+    cache_dir = tmp_path / "cache"
+    site_dir = tmp_path / "site"
+    site_dir.mkdir()
+    env = {**os.environ, "SKBUILD_PYTHON_PROBE_CACHE_DIR": str(cache_dir), "PYTHONPATH": str(site_dir)}
+
+    output = _run_probe(tmp_path, env)
+    assert output.split("|")[:2] == ["TRUE", sysconfig.get_config_var("EXT_SUFFIX")]
+    (probe_file,) = cache_dir.glob("python-probe-*.cmake")
+    content = probe_file.read_text()
+
+    # Reused while nothing changes.
+    probe_file.write_text(content.replace(sysconfig.get_config_var("EXT_SUFFIX"), ".cached"))
+    assert _run_probe(tmp_path, env).split("|")[1] == ".cached"
+
+    # Installing NumPy or Cython in sys.path invalidates the probe.
+    (site_dir / "numpy-0.0.dist-info").mkdir()
+    assert _run_probe(tmp_path, env) == output
+    assert probe_file.read_text() != content
+
+    # So does a change of PYTHONPATH.
+    probe_file.write_text(content.replace(sysconfig.get_config_var("EXT_SUFFIX"), ".cached"))
+    assert _run_probe(tmp_path, {**env, "PYTHONPATH": str(tmp_path)}) == output
+
+
+def test_find_modules(project_setup_py_test, monkeypatch, tmp_path):
+    pytest.importorskip("Cython")
+    monkeypatch.setenv("SKBUILD_PYTHON_PROBE_CACHE_DIR", str(tmp_path))
+    with project_setup_py_test("hello-cython", ["build"]) as project_dir:
+        build_dir = cmake_build_dir(project_dir)
+        assert build_dir is not None
+        cache = get_cmakecache_variables(str(build_dir / "CMakeCache.txt"))
+        assert Path(cache["PYTHON_PROBE_CACHE_DIR"][1]) == tmp_path
+    assert len(list(tmp_path.glob("python-probe-*.cmake"))) == 1
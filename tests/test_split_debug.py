@@ -0,0 +1,50 @@
+"""test_split_debug
+----------------------------------
+
+Builds a wheel of the `hello-cython` sample project with debug information and
+``PYTHON_EXTENSION_SPLIT_DEBUG``, and checks that the installed module is
+stripped and linked to its debug file, written to ``PYTHON_EXTENSION_DEBUG_DIR``.
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from . import built_wheel, run_python
+
+pytestmark = [
+    pytest.mark.skipif(not sys.platform.startswith("linux"), reason="objcopy and ELF modules"),
+    pytest.mark.skipif(shutil.which("readelf") is None, reason="readelf is needed"),
+]
+
+
+def _sections(path: Path) -> str:
+    return subprocess.run(["readelf", "-S", "-W", str(path)], check=True, capture_output=True, text=True).stdout
+
+
+@pytest.mark.parametrize("split_dwarf", [False, True])
+def test_split_debug(project_setup_py_test, monkeypatch, tmp_path, split_dwarf):
+    pytest.importorskip("Cython")
+    debug_dir = tmp_path / "debug"
+    monkeypatch.setenv("CXXFLAGS", "-g")
+    monkeypatch.setenv(
+        "CMAKE_ARGS",
+        f"-DPYTHON_EXTENSION_SPLIT_DEBUG:BOOL=ON -DPYTHON_EXTENSION_DEBUG_DIR:PATH={debug_dir.as_posix()} "
+        f"-DPYTHON_EXTENSION_SPLIT_DWARF:BOOL={'ON' if split_dwarf else 'OFF'}",
+    )
+    with built_wheel(project_setup_py_test, "hello-cython", tmp_path / "wheel") as build_dir:
+        assert bool(list(build_dir.rglob("*.dwo"))) is split_dwarf
+
+    (module,) = (tmp_path / "wheel" / "hello_cython").glob("_hello*.so")
+    (debug_file,) = (debug_dir / "hello").glob("_hello*.so.debug")
+    assert debug_file.name == f"{module.name}.debug"
+    assert ".gnu_debuglink" in _sections(module)
+    assert ".debug_info" not in _sections(module)
+    assert ".debug_info" in _sections(debug_file)
+
+    assert "Hello" in run_python(tmp_path / "wheel", "-m", "hello_cython")